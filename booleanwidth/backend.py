@@ -0,0 +1,42 @@
+"""
+This module selects the bitset implementation used by the algorithm modules.
+All of them import their bitset functions from here, such that we can switch
+implementations without touching the algorithms.
+
+The implementation is chosen at import time by the environment variable BOOLEANWIDTH_BITSET:
+- `python`: arbitrary sized python ints (bitset.py), the default
+- `uint64`: single word Cython functions (bitset128.pyx), for at most 64 vertices
+- `multiword`: multi-word Cython kernels (multiword.pyx), for at most 512 vertices
+"""
+
+import os
+from importlib import import_module
+
+
+BACKENDS = {
+    'python': '.bitset',
+    'uint64': '.bitset128',
+    'multiword': '.multiword',
+}
+
+# Largest number of vertices every backend supports
+CAPACITIES = {'python': 512, 'uint64': 64, 'multiword': 512}
+
+FUNCTIONS = ['index', 'domain', 'size', 'bit', 'bits', 'universe', 'subtract', 'contains',
+             'disjoint', 'invert', 'join', 'first', 'iterate', 'subsets', 'subsets_of_size',
+             'subsets_by_size', 'tostring']
+
+
+def load(name):
+    """Return the module implementing the backend with given name."""
+    if name not in BACKENDS:
+        raise ValueError('Unknown bitset backend {}, choose from {}'.format(
+            name, ', '.join(sorted(BACKENDS))))
+    return import_module(BACKENDS[name], __package__)
+
+
+name = os.environ.get('BOOLEANWIDTH_BITSET', 'python')
+implementation = load(name)
+
+for function in FUNCTIONS:
+    globals()[function] = getattr(implementation, function)
@@ -0,0 +1,222 @@
+"""
+Benchmarks comparing alternative implementations on the graphs in input/.
+Every benchmark prints one line per graph with the timings of the compared implementations.
+"""
+
+import glob
+import time
+from random import getrandbits, seed
+
+from .graph import Graph
+from .graph128 import to128_2
+from .bitset import domain, iterate, index, size
+from .heuristic import (get_neighborhood, check_decomposition, greedy_light_single_start,
+                        relative_neighborhood)
+from .dynamicprogramming import (compute_booldim, cut_sides, cut_neighborhoods, ENGINES,
+                                 booldimtable)
+from .relabel import relabel, ORDERINGS
+from .lboolw import compute_lboolw_streaming, stream_layers
+from .parallel import parallel_stream_layers
+from . import backend
+
+
+def timed(function, *args):
+    """Return the result of function and the number of seconds it took."""
+    start_time = time.time()
+    result = function(*args)
+    return result, time.time() - start_time
+
+
+def load_graphs(inputdir='input/', maxsize=64):
+    """Yield the name and graph of every dgf file whose vertices fit in maxsize bits."""
+    for filename in sorted(glob.iglob(inputdir + '*.dgf')):
+        try:
+            graph = Graph.load(filename)
+        except ValueError:
+            print('Skipping unreadable graph ' + filename)
+            continue
+        if domain(graph.vertices) <= maxsize:
+            yield filename.split('/')[-1][:-len('.dgf')], graph
+
+
+def neighborhood_store(inputdir='input/', samples=10000):
+    """Compare the dict neighborhoods with the array indexed neighborhoods of to128_2."""
+    print('graph: get_neighborhood, check_decomposition, compute_booldim (dict / array)')
+    for name, graph in load_graphs(inputdir):
+        graph2 = to128_2(graph)
+        seed(0)
+        subsets = [getrandbits(domain(graph.vertices)) & graph.vertices for _ in range(samples)]
+        decomposition = greedy_light_single_start(graph, relative_neighborhood)
+        prefixes = []
+        left = 0
+        for v in decomposition[:-1]:
+            left |= v
+            prefixes.append(left)
+
+        timings = []
+        for G in (graph, graph2):
+            _, t1 = timed(lambda: [get_neighborhood(G.neighborhoods, s) for s in subsets])
+            width, t2 = timed(check_decomposition, G, decomposition)
+            _, t3 = timed(lambda: [compute_booldim(G, A) for A in prefixes])
+            timings.append((t1, t2, t3))
+
+        print('{}: {}'.format(name, ', '.join('{:.3f}s / {:.3f}s'.format(a, b)
+                                              for a, b in zip(*timings))))
+
+
+def words_spanned(graph):
+    """Return the average number of 64-bit words spanned by the neighborhoods of graph."""
+    total = 0
+    for v in iterate(graph.vertices):
+        N = graph.neighborhoods[v]
+        if N:
+            total += (domain(N) - 1) // 64 - index(N) // 64 + 1
+    return float(total) / size(graph.vertices)
+
+
+def relabelings(inputdir='input/', maxsize=128, cuts=10):
+    """
+    Compare the vertex orderings of relabel.py on the throughput of next_un (via
+    check_decomposition) and of MIS counting (via compute_booldim on cuts of a decomposition).
+    The decomposition is computed once on the original graph and relabeled along.
+    """
+    orderings = ['none'] + sorted(ORDERINGS)
+    print('graph: words spanned, check_decomposition, compute_booldim ({})'.format(
+        ' / '.join(orderings)))
+    for name, graph in load_graphs(inputdir, maxsize):
+        decomposition = greedy_light_single_start(graph, relative_neighborhood)
+        step = max(1, len(decomposition) // cuts)
+        results = []
+        for ordering in orderings:
+            if ordering == 'none':
+                G, order = graph, decomposition
+            else:
+                G = relabel(graph, ordering)
+                order = [G.relabeling.apply(v) for v in decomposition]
+            prefixes = [sum(order[:i]) for i in range(step, len(order), step)]
+
+            G2 = to128_2(G)
+            _, t1 = timed(check_decomposition, G2, order)
+            _, t2 = timed(lambda: [compute_booldim(G2, A) for A in prefixes])
+            results.append('{:.2f} {:.3f}s {:.3f}s'.format(words_spanned(G), t1, t2))
+
+        print('{}: {}'.format(name, ' / '.join(results)))
+
+
+def booldim_engines(inputdir='input/', maxsize=64, cuts=20):
+    """
+    Compare the booldim engines of dynamicprogramming (and the automatic choice between them)
+    on the cuts of a linear decomposition and on random cuts of every graph.
+    After the totals per graph, the totals are broken down by the number k of distinct
+    neighborhoods of the smaller side of the cut, and for larger k by the density of the cut,
+    which shows the crossover points used by choose_engine. On larger graphs, random cuts
+    have booldims in the millions, which takes minutes with the union closure.
+    """
+    engines = sorted(ENGINES)
+    print('graph: {} / auto'.format(' / '.join(engines)))
+    by_side = {}
+    by_density = {}
+    seed(0)
+    for name, graph in load_graphs(inputdir, maxsize):
+        decomposition = greedy_light_single_start(graph, relative_neighborhood)
+        step = max(1, len(decomposition) // cuts)
+        subsets = [sum(decomposition[:i]) for i in range(step, len(decomposition), step)]
+        subsets += [getrandbits(domain(graph.vertices)) & graph.vertices for _ in range(cuts)]
+
+        totals = [0.0] * (len(engines) + 1)
+        for subset in subsets:
+            results = []
+            for i, engine in enumerate(engines):
+                result, t = timed(compute_booldim, graph, subset, -1, engine)
+                results.append(result)
+                totals[i] += t
+            assert len(set(results)) == 1, (name, subset, results)
+            _, t = timed(compute_booldim, graph, subset)
+            totals[-1] += t
+
+            small, large = cut_sides(graph, subset)
+            neighborhoods = cut_neighborhoods(graph, small, large)
+            k = len(neighborhoods)
+            if k:
+                density = float(sum(size(N) for N in neighborhoods)) / (k * size(large))
+                bucket = by_side if k <= 16 else by_density
+                key = k if k <= 16 else round(density, 1)
+                row = bucket.setdefault(key, [0] * (len(engines) + 1))
+                row[-1] += 1
+                for i, engine in enumerate(engines):
+                    row[i] += timed(compute_booldim, graph, subset, -1, engine)[1]
+
+        print('{}: {}'.format(name, ' / '.join('{:.3f}s'.format(t) for t in totals)))
+
+    for title, bucket in (('k', by_side), ('density (k > 16)', by_density)):
+        print('{}: {} (cuts)'.format(title, ' / '.join(engines)))
+        for key in sorted(bucket):
+            row = bucket[key]
+            print('{}: {} ({})'.format(key, ' / '.join('{:.4f}s'.format(t) for t in row[:-1]),
+                                       row[-1]))
+
+
+def booldimtable_processes(n=22, density=0.3, processes=(1, 2, 4, 8, 16, 32)):
+    """
+    Time booldimtable on a random graph with n vertices for several numbers of worker
+    processes. The time should decrease proportionally up to the number of cores.
+    """
+    graph = Graph.generate_random(n, density, seed=0)
+    for p in processes:
+        _, t = timed(booldimtable, graph, p)
+        print('{} processes: {:.2f}s'.format(p, t))
+
+
+def stream_layers_processes(n=22, density=0.3, processes=(2, 4, 8, 16, 32)):
+    """
+    Time the serial stream_layers on a random graph with n vertices against its parallel
+    version for several numbers of worker processes, at the exact linear boolean-width.
+    The parallel version should be faster from about four cores on.
+    """
+    graph = Graph.generate_random(n, density, seed=0)
+    k = compute_lboolw_streaming(graph)[0]
+    result, t = timed(stream_layers, graph, k, False)
+    print('serial: {:.2f}s'.format(t))
+    for p in processes:
+        parallel_result, t = timed(parallel_stream_layers, graph, k, False, None, p)
+        assert parallel_result[0] == result[0]
+        print('{} processes: {:.2f}s'.format(p, t))
+
+
+def random_bitsets(length, samples):
+    return [getrandbits(length) for _ in range(samples)]
+
+
+def bitset_backends(lengths=(16, 32, 64, 128, 256, 512), samples=20000,
+                    functions=('size', 'index', 'domain', 'subtract', 'iterate')):
+    """
+    Time the most used bitset functions of every backend per universe length, one function
+    at a time, since the backends differ per function.
+    """
+    print('length, function: ' + ', '.join(sorted(backend.BACKENDS)))
+    for length in lengths:
+        seed(0)
+        xs = random_bitsets(length, samples)
+        ys = random_bitsets(length, samples)
+        for function in functions:
+            timings = []
+            for name in sorted(backend.BACKENDS):
+                if length > backend.CAPACITIES[name]:
+                    timings.append('-')
+                    continue
+                f = getattr(backend.load(name), function)
+                if function == 'iterate':
+                    def run():
+                        for x in xs:
+                            for _ in f(x):
+                                pass
+                elif function == 'subtract':
+                    def run():
+                        for x, y in zip(xs, ys):
+                            f(x, y)
+                else:
+                    def run():
+                        for x in xs:
+                            f(x | 1)
+                timings.append('{:.3f}s'.format(timed(run)[1]))
+            print('{}, {}: {}'.format(length, function, ', '.join(timings)))
@@ -1,8 +1,10 @@
 from .graph import Graph
-from .bitset import BitSet
+from .bitset import iterate, size, index, bit, bits, contains, disjoint, subtract
 from .utils import DictChain
+from .dgf import towords, fromwords
+from .randomgraph import random_bipartite_edges
 
-from random import randint, choice, random
+import numpy as np
 from copy import deepcopy
 
 
@@ -11,11 +13,11 @@ class Bipartite(Graph):
     def __init__(self, group1=None, group2=None):
         Graph.__init__(self)
 
-        self.group1 = group1 or BitSet()
-        self.group2 = group2 or BitSet()
+        self.group1 = group1 or 0
+        self.group2 = group2 or 0
 
-        for v in self.vertices:
-            self.neighborhoods[v] = BitSet()
+        for v in iterate(self.vertices):
+            self.neighborhoods[v] = 0
 
     @property
     def vertices(self):
@@ -23,7 +25,7 @@ class Bipartite(Graph):
 
     def add(self, vertices, group):
         """Add a new vertex to the graph."""
-        if not self.vertices.disjoint(vertices):
+        if not disjoint(self.vertices, vertices):
             raise ValueError('Graph already contain some of [{}]'.format(vertices))
 
         if group == 1:
@@ -33,32 +35,29 @@ class Bipartite(Graph):
         else:
             raise ValueError
 
-        for v in vertices:
-            self.neighborhoods[v] = BitSet()
+        for v in iterate(vertices):
+            self.neighborhoods[v] = 0
 
     def remove(self, vertices):
         """Remove vertices from the graph."""
-        if not vertices in self.vertices:
+        if not contains(self.vertices, vertices):
             raise ValueError('Graph don\'t contain some of [{}]'.format(vertices))
 
-        for v in vertices:
-            for w in self(v):
+        for v in iterate(vertices):
+            for w in iterate(self(v)):
                 self.disconnect(v, w)
 
-        for v in vertices:
-            if v in self.group1:
-                self.group1 -= v
-            else:
-                self.group2 -= v
+        self.group1 = subtract(self.group1, vertices)
+        self.group2 = subtract(self.group2, vertices)
 
-        for v in vertices:
+        for v in iterate(vertices):
             del self.neighborhoods[v]
 
     def connect(self, v, w):
         """Connect two vertices."""
-        if not ((v in self.group1 and w in self.group2)
+        if not ((contains(self.group1, v) and contains(self.group2, w))
                 or
-                (v in self.group2 and w in self.group1)):
+                (contains(self.group2, v) and contains(self.group1, w))):
             raise ValueError
 
         Graph.connect(self, v, w)
@@ -67,8 +66,8 @@ class Bipartite(Graph):
         """Return a graph which is the subgraph of self induced by given vertex subset."""
         graph = Bipartite(self.group1 & vertices, self.group2 & vertices)
 
-        for v in graph.vertices:
-            graph.neighborhoods[v] &= vertices
+        for v in iterate(graph.vertices):
+            graph.neighborhoods[v] = self.neighborhoods[v] & vertices
 
         return graph
 
@@ -76,36 +75,36 @@ class Bipartite(Graph):
         """Construct a graph representing the bipartite complement of self."""
         graph = Bipartite(self.group1, self.group2)
 
-        for v in graph.group1:
-            for w in graph.group2:
-                if not v in self[w]:
+        for v in iterate(graph.group1):
+            for w in iterate(graph.group2):
+                if not contains(self[w], v):
                     graph.connect(v, w)
 
         return graph
 
     def gridify(self, width=None):
         """TODO"""
+        nr_vertices = size(self.vertices)
         if not width:
-            width = len(self.vertices)
+            width = nr_vertices
 
-        size = len(self.vertices)
-        counter = size
+        counter = nr_vertices
 
         graph = Graph(self.vertices, self.neighborhoods)
 
         for _ in range(width):
-            for _ in self.vertices:
-                new = BitSet.from_identifier(counter)
-                original = BitSet.from_identifier(counter % size)
+            for _ in range(nr_vertices):
+                new = bit(counter)
+                original = bit(counter % nr_vertices)
                 graph.add(new)
-                for original_neighbor in self.neighborhoods[original]:
-                    new_neighbor_id = (original_neighbor.identifier
-                                       + size * (counter // size))
+                for original_neighbor in iterate(self.neighborhoods[original]):
+                    new_neighbor_id = (index(original_neighbor)
+                                       + nr_vertices * (counter // nr_vertices))
                     try:
-                        graph.connect(new, BitSet.from_identifier(new_neighbor_id))
+                        graph.connect(new, bit(new_neighbor_id))
                     except ValueError:
                         try:
-                            graph.connect(new, BitSet.from_identifier(new_neighbor_id - size))
+                            graph.connect(new, bit(new_neighbor_id - nr_vertices))
                         except ValueError:
                             pass
 
@@ -115,52 +114,27 @@ class Bipartite(Graph):
         return graph
 
     @staticmethod
-    def generate_random(nr_vertices, nr_edges=0):
+    def generate_random(nr_vertices, nr_edges=0, seed=None):
         if not 0 <= nr_edges <= (nr_vertices / 2) ** 2:
             raise ValueError
 
         if not nr_edges:
             nr_edges = 0.5
 
-        if nr_edges < 1:
-            # Split the number of vertices on both sides
-            size1 = randint(1, nr_vertices - 1)
-            size2 = nr_vertices - size1
+        rng = np.random.default_rng(seed)
 
-            # For both groups create vertices
-            group1 = range(size1)
-            group2 = range(size1, size1 + size2)
+        # Split the number of vertices on both sides
+        # such that enough edges can be placed
+        while 1:
+            size1 = int(rng.integers(1, nr_vertices))
+            size2 = nr_vertices - size1
+            if nr_edges < 1 or size1 * size2 >= nr_edges:
+                break
 
-            graph = Bipartite(BitSet.from_identifier(*group1), BitSet.from_identifier(*group2))
+        # For both groups create vertices
+        graph = Bipartite(bits(*range(size1)), bits(*range(size1, size1 + size2)))
 
-            # Add random edges between groups
-            for v in graph.group1:
-                for w in graph.group2:
-                    if random() < 0.5:
-                        graph.connect(v, w)
-            return graph
-        else:
-            # Split the number of vertices on both sides
-            # such that enough edges can be placed
-            while 1:
-                size1 = randint(1, nr_vertices - 1)
-                size2 = nr_vertices - size1
-                if size1 * size2 >= nr_edges:
-                    break
-
-            # For both groups create vertices
-            group1 = range(size1)
-            group2 = range(size1, size1 + size2)
-
-            graph = Bipartite(BitSet.from_identifier(*group1), BitSet.from_identifier(*group2))
-
-            # Add random edges between groups
-            for _ in range(nr_edges):
-                while 1:
-                    v = BitSet.from_identifier(choice(group1))
-                    w = BitSet.from_identifier(choice(group2))
-                    if not w in graph[v]:
-                        break
-                graph.connect(v, w)
-
-            return graph
+        # Add random edges between groups
+        edges = random_bipartite_edges(size1, size2, nr_edges, rng)
+        graph.neighborhoods = fromwords(towords(np.arange(nr_vertices), edges)).neighborhoods
+        return graph
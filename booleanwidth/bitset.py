@@ -5,6 +5,7 @@ representation.
 """
 
 from math import log
+from itertools import combinations
 import math
 
 
@@ -17,11 +18,9 @@ def index(x):
     Return position of first element in given bitset, counting from 0.
     Return 128 if bitset is empty.
     """
-    count = 0
-    while not x & 1:
-        x >>= 1
-        count += 1
-    return count
+    if not x:
+        return 128
+    return (x & -x).bit_length() - 1
 
 
 def domain(x):
@@ -29,16 +28,17 @@ def domain(x):
     Return position of last vertex in given bitset.
     Return 0 if bitset is empty.
     """
-    count = 0
-    while x:
-        x >>= 1
-        count += 1
-    return count
+    return int.bit_length(x)
 
 
-def size(x):
-    """Return size of given uint128."""
-    return len(list(iterate(x)))
+if hasattr(int, 'bit_count'):
+    def size(x):
+        """Return size of given bitset."""
+        return int.bit_count(x)
+else:
+    def size(x):
+        """Return size of given bitset."""
+        return bin(x).count('1')
 
 
 def bit(position):
@@ -98,11 +98,8 @@ def subsets(self, minsize=0, maxsize=-1):
     if maxsize < 0:
         maxsize = size(self) + 1 + maxsize
 
-    sets = [0]
-    for v in iterate(self):
-        sets.extend([s | v for s in sets])
-
-    return [s for s in sets if size(s) >= minsize and size(s) <= maxsize]
+    for k in range(minsize, maxsize + 1):
+        yield from subsets_of_size(self, k)
 
 
 def nCr(n, r):
@@ -111,28 +108,17 @@ def nCr(n, r):
 
 
 def subsets_of_size(bitset, subsetsize):
-    table = [[] for k in range(subsetsize + 1)]
-    table[0] = [0]
-    for b in iterate(bitset):
-        for k in range(1, subsetsize + 1):
-            table[k].extend([subset | b for subset in table[k - 1] if not contains(subset, b)])
-
-    #assert len(table[subsetsize]) == nCr(size(bitset), subsetsize)
-    return table[subsetsize]
+    """
+    Yield the subsets of given size one at a time.
+    The combinations are generated by itertools and summed in C.
+    """
+    return map(sum, combinations(list(iterate(bitset)), subsetsize))
 
 
 def subsets_by_size(bitset):
-    s = size(bitset)
-    table = [[] for k in range(s + 1)]
-    table[0] = [0]
-    for b in iterate(bitset):
-        for k in range(1, s + 1):
-            table[k].extend([subset | b for subset in table[k - 1] if not contains(subset, b)])
-
-    # print(table)
-    # for k in range(1, s + 1):
-        #assert len(table[k]) == nCr(s, k)
-    return table
+    """Yield for every size, starting at 0, a generator of the subsets of that size."""
+    for k in range(size(bitset) + 1):
+        yield subsets_of_size(bitset, k)
 
 
 def tostring(self):
@@ -21,9 +21,13 @@ cpdef int index(uint128 x):
     Return position of first element in given bitset, counting from 0.
     Return 128 if bitset is empty.
     """
-    cdef int part1 = __builtin_ctzll(<unsigned long long>x)
-    cdef int part2 = __builtin_ctzll(<unsigned long long>(x >> 64))
-    return part1 if part1 < 64 else 64 + part2
+    cdef unsigned long long low = <unsigned long long>x
+    cdef unsigned long long high = <unsigned long long>(x >> 64)
+    if low:
+        return __builtin_ctzll(low)
+    if high:
+        return 64 + __builtin_ctzll(high)
+    return 128
 
 
 cpdef int domain(uint128 x):
@@ -31,9 +35,13 @@ cpdef int domain(uint128 x):
     Return position of last vertex in given bitset.
     Return 0 if bitset is empty.
     """
-    cdef int part2 = __builtin_clzll(<unsigned long long>(x >> 64))
-    cdef int part1 = __builtin_clzll(<unsigned long long>x)
-    return part2 if x >> 64 else 64 + part1
+    cdef unsigned long long low = <unsigned long long>x
+    cdef unsigned long long high = <unsigned long long>(x >> 64)
+    if high:
+        return 128 - __builtin_clzll(high)
+    if low:
+        return 64 - __builtin_clzll(low)
+    return 0
 
 
 cpdef int size(uint128 x):
@@ -45,6 +53,13 @@ cpdef uint128 bit(int position):
     return (<uint128>1 << position)
 
 
+def bits(*positions):
+    cdef uint128 result = 0
+    for position in positions:
+        result |= bit(position)
+    return result
+
+
 cpdef uint128 universe128 = ((<uint128>1 << 127) - 1) + (<uint128>1 << 127)
 cpdef uint128 universe(int length):
     if length == 128:
@@ -60,6 +75,10 @@ cpdef contains(uint128 self, uint128 other):
     return self | other == self
 
 
+cpdef disjoint(uint128 self, uint128 other):
+    return self & other == 0
+
+
 cpdef uint128 invert(uint128 x, unsigned int l):
     """Return inverse where universe has length l"""
     return subtract(universe(l), x)
@@ -89,11 +108,8 @@ def subsets(uint128 self, int minsize=0, int maxsize=-1):
     if maxsize < 0:
         maxsize = size(self) + 1 + maxsize
 
-    sets = [0L]
-    for v in iterate(self):
-        sets.extend([s | v for s in sets])
-
-    return [s for s in sets if size(s) >= minsize and size(s) <= maxsize]
+    for k in range(minsize, maxsize + 1):
+        yield from subsets_of_size(self, k)
 
 
 import math
@@ -105,28 +121,61 @@ def nCr(n,r):
 
 
 def subsets_of_size(uint128 bitset, int subsetsize):
-    # TODO: make output sensitive
-    table = [[] for k in range(subsetsize + 1)]
-    table[0] = [0L]
-    for b in iterate(bitset):
-        for k in range(1, subsetsize + 1):
-            table[k].extend([subset | b for subset in table[k - 1] if not contains(subset, b)])
+    """
+    Yield the subsets of given size one at a time, using Gosper's hack.
+    We enumerate the combinations c of the positions 0..n-1 and deposit them onto the
+    elements of bitset, using a lookup table for every byte of c.
+    """
+    cdef int n = size(bitset)
+    cdef int i, j, b
+    cdef uint128 table[8][256]
+    cdef uint128 positions[64]
+    cdef uint128 result, rest = bitset
+    cdef unsigned long long c, lowest, ripple
+
+    if subsetsize < 0 or subsetsize > n:
+        return
+    if subsetsize == 0:
+        yield 0L
+        return
+
+    for i in range(64):
+        positions[i] = 0
+    i = 0
+    while rest:
+        positions[i] = rest & (~rest + 1)
+        rest ^= positions[i]
+        i += 1
+
+    for j in range((n + 7) // 8):
+        table[j][0] = 0
+        for b in range(1, 256):
+            table[j][b] = table[j][b & (b - 1)] | positions[j * 8 + __builtin_ctzll(b)]
+
+    c = (<unsigned long long>-1) >> (64 - subsetsize)
+    while 1:
+        result = 0
+        ripple = c
+        j = 0
+        while ripple:
+            result |= table[j][ripple & 255]
+            ripple >>= 8
+            j += 1
+        yield result
+
+        lowest = c & (~c + 1)
+        ripple = c + lowest
+        if ripple == 0:
+            return
+        c = (((ripple ^ c) >> 2) // lowest) | ripple
+        if n < 64 and c >> n:
+            return
 
-    #assert len(table[subsetsize]) == nCr(size(bitset), subsetsize)
-    return table[subsetsize]
 
 def subsets_by_size(uint128 bitset):
-    s = size(bitset)
-    table = [[] for k in range(s + 1)]
-    table[0] = [0L]
-    for b in iterate(bitset):
-        for k in range(1, s + 1):
-            table[k].extend([subset | b for subset in table[k - 1] if not contains(subset, b)])
-
-    #print(table)
-    #for k in range(1, s + 1):
-        #assert len(table[k]) == nCr(s, k)
-    return table
+    """Yield for every size, starting at 0, a generator of the subsets of that size."""
+    for k in range(size(bitset) + 1):
+        yield subsets_of_size(bitset, k)
 
 
 def tostring(self):
@@ -0,0 +1,130 @@
+"""
+Fixed capacity multi-word bitsets.
+A bitset512 consists of MAXWORDS 64-bit words, of which only the first nwords are used.
+The number of words is chosen once per graph (see nwords_for), so that all kernels
+below only touch the words that can actually contain vertices.
+"""
+
+ctypedef unsigned long long word
+
+cdef enum:
+    WORDSIZE = 64
+    MAXWORDS = 8
+
+ctypedef struct bitset512:
+    word words[MAXWORDS]
+
+cdef extern int __builtin_popcountll(unsigned long long x)
+cdef extern int __builtin_ctzll(unsigned long long x)
+
+
+cdef inline void clear(bitset512 *x, int nwords):
+    cdef int i
+    for i in range(nwords):
+        x.words[i] = 0
+
+
+cdef inline bint is_empty(bitset512 *x, int nwords):
+    cdef int i
+    for i in range(nwords):
+        if x.words[i]:
+            return False
+    return True
+
+
+cdef inline int size(bitset512 *x, int nwords):
+    """Return size of given bitset."""
+    cdef int i, result = 0
+    for i in range(nwords):
+        result += __builtin_popcountll(x.words[i])
+    return result
+
+
+cdef inline int index(bitset512 *x, int nwords):
+    """
+    Return position of first element in given bitset, counting from 0.
+    Return nwords * WORDSIZE if bitset is empty.
+    """
+    cdef int i
+    for i in range(nwords):
+        if x.words[i]:
+            return i * WORDSIZE + __builtin_ctzll(x.words[i])
+    return nwords * WORDSIZE
+
+
+cdef inline int next_index(bitset512 *x, int position, int nwords):
+    """
+    Return position of first element in x at or after given position.
+    Return nwords * WORDSIZE if there is none. Used for iterating.
+    """
+    cdef int i = position // WORDSIZE
+    cdef word w
+    if i >= nwords:
+        return nwords * WORDSIZE
+    w = x.words[i] & (~(<word>0) << (position % WORDSIZE))
+    while 1:
+        if w:
+            return i * WORDSIZE + __builtin_ctzll(w)
+        i += 1
+        if i >= nwords:
+            return nwords * WORDSIZE
+        w = x.words[i]
+
+
+cdef inline bint test_bit(bitset512 *x, int position):
+    return (x.words[position // WORDSIZE] >> (position % WORDSIZE)) & 1
+
+
+cdef inline void set_bit(bitset512 *x, int position):
+    x.words[position // WORDSIZE] |= <word>1 << (position % WORDSIZE)
+
+
+cdef inline void clear_bit(bitset512 *x, int position):
+    x.words[position // WORDSIZE] &= ~(<word>1 << (position % WORDSIZE))
+
+
+cdef inline void intersect(bitset512 *result, bitset512 *x, bitset512 *y, int nwords):
+    cdef int i
+    for i in range(nwords):
+        result.words[i] = x.words[i] & y.words[i]
+
+
+cdef inline void join(bitset512 *result, bitset512 *x, bitset512 *y, int nwords):
+    cdef int i
+    for i in range(nwords):
+        result.words[i] = x.words[i] | y.words[i]
+
+
+cdef inline void subtract(bitset512 *result, bitset512 *x, bitset512 *y, int nwords):
+    cdef int i
+    for i in range(nwords):
+        result.words[i] = x.words[i] & ~y.words[i]
+
+
+cdef inline int intersection_size(bitset512 *x, bitset512 *y, int nwords):
+    cdef int i, result = 0
+    for i in range(nwords):
+        result += __builtin_popcountll(x.words[i] & y.words[i])
+    return result
+
+
+cdef inline bint equal(bitset512 *x, bitset512 *y, int nwords):
+    cdef int i
+    for i in range(nwords):
+        if x.words[i] != y.words[i]:
+            return False
+    return True
+
+
+cdef inline bint contains(bitset512 *x, bitset512 *y, int nwords):
+    """Return whether y is a subset of x."""
+    cdef int i
+    for i in range(nwords):
+        if y.words[i] & ~x.words[i]:
+            return False
+    return True
+
+
+cdef int nwords_for(int length) except -1
+cdef void from_int(bitset512 *result, object x, int nwords) except *
+cdef object to_int(bitset512 *x, int nwords)
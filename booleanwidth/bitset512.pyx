@@ -0,0 +1,37 @@
+"""
+This module contains the conversions between python ints and multi-word bitsets.
+The kernels themselves are inlined from bitset512.pxd.
+"""
+
+
+cdef int nwords_for(int length) except -1:
+    """Return the number of words (2, 4 or 8) needed to store a universe of given length."""
+    cdef int nwords = 2
+    while nwords * WORDSIZE < length:
+        nwords *= 2
+    if nwords > MAXWORDS:
+        raise ValueError('Bitsets can contain at most {} vertices, not {}'.format(
+            MAXWORDS * WORDSIZE, length))
+    return nwords
+
+
+cdef void from_int(bitset512 *result, object x, int nwords) except *:
+    cdef int i
+    if x >> (nwords * WORDSIZE):
+        raise OverflowError('{} does not fit in {} words'.format(x, nwords))
+    for i in range(nwords):
+        result.words[i] = <word>(x & 0xFFFFFFFFFFFFFFFF)
+        x >>= WORDSIZE
+
+
+cdef object to_int(bitset512 *x, int nwords):
+    cdef int i
+    result = 0
+    for i in range(nwords - 1, -1, -1):
+        result = (result << WORDSIZE) | x.words[i]
+    return result
+
+
+def words(int length):
+    """Return the number of words a bitset over a universe of given length occupies."""
+    return nwords_for(length)
@@ -1,4 +1,4 @@
-from .bitset128 import iterate, subsets, tostring, size
+from .backend import iterate, subsets, tostring, size
 from .dynamicprogramming import booldimtable
 
 
@@ -0,0 +1,112 @@
+"""
+Caching the booldims of cuts, for heuristics which evaluate the same cuts over and over,
+like the lookahead of greedy_lbw re-evaluating todo - v at every depth.
+Every graph gets one cache, shared by all heuristics. Since booldim(A) = booldim(V - A),
+a cut is stored under its canonical side min(A, V - A), so both sides share an entry.
+Graphs must not be modified while they have a cache, see clear_caches.
+"""
+
+from collections import OrderedDict
+
+from .dynamicprogramming import compute_booldim
+from .graph128 import clear_converted
+
+
+# Maximum number of cuts per cache, and of graphs with a cache
+MAXSIZE = 1 << 18
+MAXGRAPHS = 8
+
+
+class BooldimCache:
+
+    """
+    Least recently used cache of the booldims of the cuts of a graph, with hit and miss counters.
+    An entry is either the booldim, or -L if the booldim is only known to be at least L,
+    because it was computed with a bound.
+    """
+
+    def __init__(self, graph, maxsize=MAXSIZE):
+        self.graph = graph
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return 'BooldimCache(hits={}, misses={}, size={}, maxsize={})'.format(
+            self.hits, self.misses, len(self.entries), self.maxsize)
+
+    def booldim(self, subset, bound=-1):
+        """Return compute_booldim(graph, subset, bound), computing it only if it is not known."""
+        key = min(subset, self.graph.vertices - subset)
+        known = self.entries.get(key)
+        if known is not None:
+            if known >= 0:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return known if bound < 0 or known <= bound else bound + 1
+            if 0 <= bound < -known:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return bound + 1
+
+        self.misses += 1
+        result = compute_booldim(self.graph, key, bound)
+        self.store(key, result if bound < 0 or result <= bound else -result)
+        return result
+
+    def store(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def prefetch(self, subsets, pool):
+        """
+        Compute the booldims of the cuts (A, V - A) for all A in subsets which are not known
+        exactly yet, in one batch by pool, a BooldimPool of the graph (see parallel.py).
+        """
+        from .parallel import batch_booldims
+        keys = OrderedDict()
+        for subset in subsets:
+            key = min(subset, self.graph.vertices - subset)
+            known = self.entries.get(key)
+            if known is None or known < 0:
+                keys[key] = None
+        keys = list(keys)
+        self.misses += len(keys)
+        for key, result in zip(keys, batch_booldims(self.graph, keys, pool=pool)):
+            self.store(key, result)
+
+
+# Caches by id of their graph, least recently used first. A cache keeps its graph alive,
+# so the id can't be reused by another graph while the cache exists.
+caches = OrderedDict()
+
+
+def booldim_cache(graph):
+    """Return the cache of graph, creating it if it doesn't exist."""
+    cache = caches.get(id(graph))
+    if cache is None or cache.graph is not graph:
+        cache = caches[id(graph)] = BooldimCache(graph)
+        if len(caches) > MAXGRAPHS:
+            caches.popitem(last=False)
+    caches.move_to_end(id(graph))
+    return cache
+
+
+def cached_booldim(graph, subset, bound=-1):
+    """Return the booldim of the cut (subset, V - subset), using the cache of graph."""
+    return booldim_cache(graph).booldim(subset, bound)
+
+
+def clear_caches():
+    """
+    Forget all cached booldims and converted graphs (see graph128.pyx), which is needed after
+    modifying a graph.
+    """
+    caches.clear()
+    clear_converted()
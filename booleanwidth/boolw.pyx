@@ -1,12 +1,13 @@
-from .bitset128 import iterate, subsets, tostring, size
-from .dynamicprogramming import booldimtable, compute_booldim
+from .backend import iterate, subsets, tostring, size
+from .dynamicprogramming import booldimtable
+from .booldimcache import cached_booldim
 
-def boolwidthtable(graph):
+def boolwidthtable(graph, processes=1):
     """
     bwtable[A] contains the booleanwidth of the subtree of all cuts inside A.
     The cut which produced A itself is thus not included.
     """
-    booldim = booldimtable(graph)
+    booldim = booldimtable(graph, processes)
 
     # Init table
     bwtable = {}
@@ -46,15 +47,15 @@ def decomposition(table, booldim, long A):
                 break
 
 
-def booleanwidth(graph):
-    bwtable, booldim = boolwidthtable(graph)
+def booleanwidth(graph, processes=1):
+    bwtable, booldim = boolwidthtable(graph, processes)
     return (bwtable[graph.vertices],
             #booldim,
             list(decomposition(bwtable, booldim, graph.vertices)))
 
 
 def bw_from_decomposition(graph, decomposition):
-    return max(max(compute_booldim(graph, A), compute_booldim(graph, B)) for A, B in decomposition)
+    return max(max(cached_booldim(graph, A), cached_booldim(graph, B)) for A, B in decomposition)
 
 
 def greedy_bw(graph, depth=1):
@@ -73,11 +74,20 @@ def greedy_bw_helper(graph, subset, depth):
     # Find a sequence of candidate cuts
     todo = subset
     candidates = []
-    def penalty(A):
-        return max(compute_booldim(graph, A), compute_booldim(graph, subset - A))
+    def penalty(A, bound=-1):
+        # Booldims above bound are not counted exactly
+        result = cached_booldim(graph, A, bound)
+        if bound < 0 or result <= bound:
+            result = max(result, cached_booldim(graph, subset - A, bound))
+        return result
     while size(todo) > 1:
     #while size(todo) >= int(size(subset) / 3):
-        new_candidate = min((penalty(todo - v), todo - v) for v in iterate(todo))
+        new_candidate = None
+        for v in iterate(todo):
+            bound = -1 if new_candidate is None else new_candidate[0]
+            candidate = penalty(todo - v, bound), todo - v
+            if new_candidate is None or candidate < new_candidate:
+                new_candidate = candidate
         candidates.append(new_candidate)
         todo = new_candidate[1]
 
@@ -0,0 +1,106 @@
+"""
+Cheap lower and upper bounds on linear boolean-width and linear boolean-cost, to seed the
+bound search of the exact algorithms in lboolw.pyx and lboolc.pyx.
+
+Every linear decomposition has a prefix of each size t, so the smallest booldim over all cuts
+with t vertices on one side is a lower bound on its width, and the sum of these over all t is
+a lower bound on its cost. It is computed exactly for t in {1, 2, n - 2, n - 1}; all other
+proper cuts of a connected graph have booldim at least 2.
+Upper bounds are the widths and costs of actual decompositions, found by
+greedy_light_single_start and a degeneracy order, and verified by check_decomposition.
+"""
+
+from .backend import iterate, size, subtract, first
+from .components import component
+from .dynamicprogramming import compute_booldim
+from .heuristic import (greedy_light_single_start, relative_neighborhood, check_decomposition,
+                        check_decomposition_cost)
+
+
+def smallest_cut_booldims(G):
+    """
+    Return a list whose t-th entry, for 0 < t < n, is a lower bound on the booldim of every
+    cut of G with t vertices on one side. Entry 0 is the booldim of the cut (0, V), which is 1.
+    """
+    n = size(G.vertices)
+    trivial = 2 if G.vertices and component(G, first(G.vertices)) == G.vertices else 1
+    result = [1] + [trivial] * (n - 1)
+
+    vertices = list(iterate(G.vertices))
+    if n > 1:
+        result[1] = result[n - 1] = min(compute_booldim(G, v) for v in vertices)
+    if n > 2:
+        result[2] = result[n - 2] = min(compute_booldim(G, v | w)
+                                        for i, v in enumerate(vertices)
+                                        for w in vertices[i + 1:])
+    return result
+
+
+def degeneracy_order(G):
+    """Return the vertices of G in the order of repeatedly removing a vertex of minimum degree."""
+    N = G.neighborhoods
+    rest = G.vertices
+    order = []
+    while rest:
+        v = min(iterate(rest), key=lambda v: size(N[v] & rest))
+        order.append(v)
+        rest = subtract(rest, v)
+    return order
+
+
+def candidate_decompositions(G):
+    """Return some linear decompositions of G, as vertex orders, found by cheap heuristics."""
+    order = degeneracy_order(G)
+    if size(G.vertices) < 2:
+        return [order]
+    return [greedy_light_single_start(G, relative_neighborhood), order, order[::-1]]
+
+
+def lboolw_lower_bound(G):
+    return max(smallest_cut_booldims(G))
+
+
+def lboolw_upper_bound(G):
+    """Return (lboolw, decomposition) of the best candidate decomposition of G."""
+    return min((check_decomposition(G, order), order) for order in candidate_decompositions(G))
+
+
+def lboolc_lower_bound(G):
+    return sum(smallest_cut_booldims(G))
+
+
+def lboolc_upper_bound(G):
+    """Return (lboolc, decomposition) of the best candidate decomposition of G."""
+    return min((check_decomposition_cost(G, order), order)
+               for order in candidate_decompositions(G))
+
+
+def search_bound(attempt, lower, upper):
+    """
+    Return the result of the first successful attempt(k) for k in [lower, upper], where attempt
+    returns False on failure, and must succeed for k = upper and fail for k below the exact value.
+    The bound is first set to lower, then the remaining interval is bisected. A successful
+    attempt with any k at least the exact value must yield the exact value, so the search
+    ends at the first success.
+    """
+    k = lower
+    while 1:
+        result = attempt(k)
+        if result is not False:
+            return result
+        lower = k + 1
+        k = (lower + upper) // 2
+
+
+def grow_bound(attempt, lower, upper, factor=1.25):
+    """
+    Like search_bound, but k starts at lower and grows by factor after every failure, up to
+    upper. The successful k is at most factor times the exact value, which suits attempts
+    whose memory grows quickly with k.
+    """
+    k = lower
+    while 1:
+        result = attempt(k)
+        if result is not False:
+            return result
+        k = min(upper, max(k + 1, int(k * factor)))
@@ -1,24 +1,55 @@
-from bitset import iterate, contains, subtract, first
-#from bitset128 import iterate, contains, subtract, first
+from .backend import iterate, contains, subtract, first
+from .bitset128 cimport uint128
+from .graph128 cimport Neighborhoods
 
-def bfs(graph, root):
-    """Return vertices of a component of graph in some bfs order, starting with root."""
-    done = 0L
+
+cdef object expand(N, front):
+    """Return the union of the neighborhoods of the vertices in front."""
+    if isinstance(N, Neighborhoods):
+        return (<Neighborhoods>N).union(front)
+    result = 0L
+    for v in iterate(front):
+        result |= N[v]
+    return result
+
+
+def layers(graph, root):
+    """
+    Return the bfs layers of the component of graph containing root, as a list of bitsets.
+    Every layer is obtained from the previous one by expanding the whole frontier at once.
+    """
+    N = graph.neighborhoods
+    result = []
+    done = root
     front = root
     while front:
-        v = first(front)
-        yield v
-        done |= v
-        front |= graph.neighborhoods[v]
-        front = subtract(front, done)
+        result.append(front)
+        front = subtract(expand(N, front), done)
+        done |= front
+    return result
+
+
+def component(graph, root):
+    """Return the component of graph containing root."""
+    N = graph.neighborhoods
+    done = root
+    front = root
+    while front:
+        front = subtract(expand(N, front), done)
+        done |= front
+    return done
+
+
+def bfs(graph, root):
+    """Return vertices of a component of graph in bfs order, starting with root."""
+    for layer in layers(graph, root):
+        yield from iterate(layer)
+
 
 def components(graph):
     """Return a list of the connected components of in the graph."""
-    done = 0L
-    for v in iterate(graph.vertices):
-        if contains(done, v):
-            continue
-        component = sum(bfs(graph, v))
-        yield component
-        done |= component
-
+    rest = graph.vertices
+    while rest:
+        result = component(graph, first(rest))
+        yield result
+        rest = subtract(rest, result)
@@ -2,7 +2,7 @@ from random import randint, randrange
 from numpy import diff
 
 from .bipartite import Bipartite
-from .bitset import BitSet
+from .bitset import iterate, size, index, bits
 
 
 def random_partition(n, k, limit):
@@ -27,8 +27,8 @@ class ConvexBipartite(Bipartite):
 
     def verify_convexity(self):
         """Check that we are indeed convex."""
-        for v in self.group2:
-            ids = [w.identifier for w in self[v]]
+        for v in iterate(self.group2):
+            ids = [index(w) for w in iterate(self(v))]
             ids.sort()
             differences = diff(ids)
             if differences.size > 0 and max(differences) > 1:
@@ -53,19 +53,18 @@ class ConvexBipartite(Bipartite):
         group1 = range(size1)
         group2 = range(size1, size1 + size2)
 
-        graph = ConvexBipartite(BitSet.from_identifier(*group1),
-                                BitSet.from_identifier(*group2))
+        graph = ConvexBipartite(bits(*group1), bits(*group2))
 
         # For each vertex in group2 we can determine the neighborhood by
         # a starting vertex and the length of the neighborhood.
-        len_group1 = len(graph.group1)
+        len_group1 = size(graph.group1)
         neighborhoodlengths = random_partition(nr_edges,
-                                               len(graph.group2),
+                                               size(graph.group2),
                                                len_group1)
-        for i, v in enumerate(graph.group2):
+        for i, v in enumerate(iterate(graph.group2)):
             length = neighborhoodlengths[i]
             start = randint(0, len_group1 - length)
-            neighbors = BitSet.from_identifier(*range(start, start + length))
-            for w in neighbors:
+            neighbors = bits(*range(start, start + length))
+            for w in iterate(neighbors):
                 graph.connect(w, v)
         return graph
@@ -0,0 +1,152 @@
+"""
+Fast loading of DGF files.
+The edges of a DGF file are parsed in bulk into an array of 64-bit neighborhood words,
+which is stored in a binary cache file next to the DGF file.
+Later loads map the cache file into memory and convert every row of words into a neighborhood,
+so there is no per-edge work left. The cache is rebuilt whenever the DGF file changes.
+
+Cache file layout (little endian):
+    header: magic, mtime and size of the DGF file, length, nwords
+    words:  (length + 1) rows of nwords 64-bit words; row 0 contains the vertices,
+            row i + 1 contains the neighborhood of vertex i
+"""
+
+import os
+import mmap
+import struct
+
+import numpy as np
+
+from .graph import Graph
+from .bitset import domain, iterate, index
+
+MAGIC = b'BWGRAPH1'
+HEADER = struct.Struct('<8sqqii')
+WORD = np.dtype('<u8')
+
+
+def cachename(filename):
+    return filename + '.bin'
+
+
+def parse(filename):
+    """Parse a DGF file into an array of neighborhood words (see module docstring)."""
+    vertices = []
+    edges = []
+    with open(filename, 'r') as f:
+        for line in f:
+            if line[:1] == 'e':
+                edges.append(line.split()[1:3])
+            elif line[:1] == 'n':
+                # Node lines may carry a weight, which we ignore
+                vertices.append(line.split()[1])
+
+    vertices = np.array(vertices, dtype=np.int64)
+    edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+    if np.any(edges[:, 0] == edges[:, 1]):
+        raise ValueError('{} contains a self loop'.format(filename))
+    return towords(vertices, edges)
+
+
+def towords(vertices, edges):
+    """
+    Return the neighborhood words of the graph on given vertex positions and edges.
+    Endpoints of edges are added to the vertices, duplicate edges are merged.
+    """
+    vertices = np.union1d(vertices, edges.ravel())
+    length = int(vertices[-1]) + 1 if len(vertices) else 0
+    nwords = max(1, (length + 63) // 64)
+
+    words = np.zeros((length + 1, nwords), dtype=WORD)
+    setbits(words, np.zeros_like(vertices), vertices)
+    setbits(words, edges[:, 0] + 1, edges[:, 1])
+    setbits(words, edges[:, 1] + 1, edges[:, 0])
+    return words
+
+
+def setbits(words, rows, positions):
+    """Set the bit of every position in the corresponding row of words."""
+    masks = np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64))
+    np.bitwise_or.at(words, (rows, positions >> 6), masks)
+
+
+def tograph(buffer, length, nwords):
+    """Construct a graph from a buffer containing the words of a cache file."""
+    rowsize = nwords * WORD.itemsize
+    vertices = int.from_bytes(buffer[:rowsize], 'little')
+    positions = np.flatnonzero(np.unpackbits(np.frombuffer(buffer[:rowsize], dtype=np.uint8),
+                                             bitorder='little'))
+    neighborhoods = {1 << i: int.from_bytes(buffer[(i + 1) * rowsize:(i + 2) * rowsize], 'little')
+                     for i in positions.tolist()}
+    return Graph(vertices, neighborhoods)
+
+
+def graphwords(graph):
+    """Return the array of neighborhood words of a graph, the inverse of fromwords."""
+    length = domain(graph.vertices)
+    nwords = max(1, (length + 63) // 64)
+    rowsize = nwords * WORD.itemsize
+    buffer = bytearray((length + 1) * rowsize)
+    buffer[:rowsize] = int(graph.vertices).to_bytes(rowsize, 'little')
+    for v in iterate(graph.vertices):
+        i = index(v)
+        buffer[(i + 1) * rowsize:(i + 2) * rowsize] = int(graph.neighborhoods[v]).to_bytes(
+            rowsize, 'little')
+    return np.frombuffer(buffer, dtype=WORD).reshape(length + 1, nwords)
+
+
+def fromwords(words):
+    """Construct a graph from an array of neighborhood words."""
+    return tograph(memoryview(words.tobytes()), words.shape[0] - 1, words.shape[1])
+
+
+def read_cache(filename, stat):
+    """Return the cached graph of filename, or None if the cache is missing or outdated."""
+    try:
+        f = open(cachename(filename), 'rb')
+    except OSError:
+        return None
+
+    with f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        magic, mtime, filesize, length, nwords = HEADER.unpack(header)
+        if (magic, mtime, filesize) != (MAGIC, stat.st_mtime_ns, stat.st_size):
+            return None
+        if os.fstat(f.fileno()).st_size != HEADER.size + (length + 1) * nwords * WORD.itemsize:
+            return None
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            buffer = memoryview(mapped)[HEADER.size:]
+            try:
+                return tograph(buffer, length, nwords)
+            finally:
+                buffer.release()
+
+
+def write_cache(filename, stat, words):
+    """Write the words of filename to its cache file, if the directory is writable."""
+    length, nwords = words.shape[0] - 1, words.shape[1]
+    tmpname = cachename(filename) + '.tmp'
+    try:
+        with open(tmpname, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size, length, nwords))
+            f.write(words.tobytes())
+        os.replace(tmpname, cachename(filename))
+    except OSError:
+        pass
+
+
+def load(filename, cache=True):
+    """Load the graph of a DGF file, using and refreshing its cache file if cache is set."""
+    stat = os.stat(filename)
+    if cache:
+        graph = read_cache(filename, stat)
+        if graph is not None:
+            return graph
+
+    words = parse(filename)
+    if cache:
+        write_cache(filename, stat, words)
+    return fromwords(words)
@@ -0,0 +1,152 @@
+"""
+Keeping the tables of long exact runs on disk, so that they can exceed physical memory and
+survive a crash. See stream_layers in lboolw.pyx, which computes one layer of sets of equal
+size at a time and checkpoints a DPStore after every layer.
+"""
+
+import json
+import os
+import pickle
+
+import numpy as np
+
+from .backend import size
+from .ranktable import RankTable, binomial, smallest_dtype
+
+
+class MappedRankTable(RankTable):
+
+    """RankTable whose layers are the memory-mapped files prefix.i, reopened if they exist."""
+
+    def __init__(self, vertices, dtype, prefix):
+        self.prefix = prefix
+
+    def path(self, i):
+        return '{}.{}'.format(self.prefix, i)
+
+    def allocate(self, i):
+        length = binomial(self.n, i)
+        if os.path.exists(self.path(i)):
+            return np.memmap(self.path(i), dtype=self.dtype, mode='r+', shape=(length,))
+        array = np.memmap(self.path(i), dtype=self.dtype, mode='w+', shape=(length,))
+        array[:] = self.missing
+        return array
+
+    def open(self):
+        """Map all layers which have a file."""
+        for i in range(self.n + 1):
+            if os.path.exists(self.path(i)):
+                self.layer(i)
+
+    def flush(self, i):
+        if self.layers[i] is not None:
+            self.layers[i].flush()
+
+    def remove(self, first):
+        """Drop and delete layers first and up."""
+        for i in range(first, self.n + 1):
+            self.free_layer(i)
+            if os.path.exists(self.path(i)):
+                os.remove(self.path(i))
+
+
+class DPStore:
+
+    """
+    Directory holding a run of stream_layers: the values and booldims of all sets as
+    MappedRankTables, and the back-pointers. After every completed layer i, the UN of its
+    sets are written to un.i (as python sets), followed by checkpoint.json with the graph,
+    the bound and i, from which the run continues after a restart.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.value = None
+        self.booldim = None
+        self.backpointers = None
+        self.run = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def progress(self):
+        """Return the last checkpoint, or None."""
+        try:
+            with open(self.path('checkpoint.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def bound(self, G, cost):
+        """Return the bound of the checkpointed run on G, or None."""
+        progress = self.progress()
+        if progress and progress['vertices'] == G.vertices and progress['cost'] == cost:
+            return progress['bound']
+        return None
+
+    def start(self, G, k, cost, dtype):
+        """
+        Open the tables and back-pointers of a run on G with bound k. Return the last completed
+        layer of this run and the UN of its sets, or None if the run starts from scratch.
+        """
+        V = G.vertices
+        n = size(V)
+        self.close()
+        self.run = {'vertices': V, 'cost': cost, 'bound': k}
+        progress = self.progress()
+        layer = -1
+        if progress and progress['layer'] >= 0 and all(progress[key] == self.run[key]
+                                                       for key in self.run):
+            layer = progress['layer']
+
+        self.value = MappedRankTable(V, dtype, self.path('value'))
+        self.booldim = MappedRankTable(V, smallest_dtype(2 ** (n // 2)), self.path('booldim'))
+        for table in (self.value, self.booldim):
+            table.remove(layer + 1)
+
+        mode = 'r+b' if os.path.exists(self.path('backpointers')) else 'w+b'
+        self.backpointers = open(self.path('backpointers'), mode)
+        self.backpointers.truncate(sum(binomial(n, i) for i in range(layer + 1)))
+        self.backpointers.seek(0, os.SEEK_END)
+
+        if layer < 0:
+            for name in os.listdir(self.directory):
+                if name.startswith('un.'):
+                    os.remove(self.path(name))
+            self.write_progress(-1)
+            return None
+        with open(self.path('un.{}'.format(layer)), 'rb') as f:
+            un = pickle.load(f)
+        self.value.layer(layer)
+        return layer, un
+
+    def checkpoint(self, i, un):
+        """Save layer i, after it has been completed with the given UN of its sets."""
+        self.value.flush(i)
+        self.booldim.flush(i)
+        self.backpointers.flush()
+        os.fsync(self.backpointers.fileno())
+        name = self.path('un.{}'.format(i))
+        with open(name + '.tmp', 'wb') as f:
+            pickle.dump({X: set(un[X]) for X in un}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(name + '.tmp', name)
+        self.write_progress(i)
+        if os.path.exists(self.path('un.{}'.format(i - 1))):
+            os.remove(self.path('un.{}'.format(i - 1)))
+
+    def write_progress(self, i):
+        with open(self.path('checkpoint.json.tmp'), 'w') as f:
+            json.dump(dict(self.run, layer=i), f)
+        os.replace(self.path('checkpoint.json.tmp'), self.path('checkpoint.json'))
+
+    def tables(self):
+        """Return the value and booldim tables of the run, with all layers mapped."""
+        self.value.open()
+        self.booldim.open()
+        return self.value, self.booldim
+
+    def close(self):
+        if self.backpointers is not None:
+            self.backpointers.close()
+            self.backpointers = None
@@ -1,10 +1,26 @@
-from .bitset128 import iterate, subsets, tostring, size
+from libc.stdlib cimport malloc, free
+from libc.limits cimport UINT_MAX
+from .backend import iterate, subsets, tostring, size
 from .bitset128 cimport uint128
-from .mis128 import mis_count
+from .graph128 cimport Neighborhoods
+from .graph128 import packed, neighborhood_array
+from .mis128 import mis_count_bounded
+from .mis128 cimport recursion_array
+from .graph512 import Graph512
+from .bitset512 cimport WORDSIZE
+from . import bitset
+from .mis512 import cut_mis_count
+from .unions import closure_size
+
+
+cdef extern int __builtin_ctzll(unsigned long long x)
 
 
 def cut(uint128 V, N, uint128 vertices):
     """Return the neighborhoods of the cut induced by given vertex subset."""
+    if isinstance(N, Neighborhoods):
+        return cut_array(V, N, vertices)
+
     complement = V - vertices
 
     newN = {}
@@ -18,11 +34,135 @@ def cut(uint128 V, N, uint128 vertices):
     return newN
 
 
-def compute_booldim(graph, subset):
-    return mis_count(cut(graph.vertices, graph.neighborhoods, subset), graph.vertices)
+cdef Neighborhoods cut_array(uint128 V, Neighborhoods N, uint128 vertices):
+    cdef uint128 complement = V - vertices
+    cdef uint128 rest = V
+    cdef int i
+    cdef Neighborhoods newN = Neighborhoods(N.length)
+
+    while rest:
+        i = __builtin_ctzll(rest)
+        if vertices & (rest & (~rest + 1)):
+            newN.N[i] = N.N[i] & complement
+        else:
+            newN.N[i] = N.N[i] & vertices
+        rest &= rest - 1
+
+    return newN
+
+
+def mis_booldim(graph, subset, bound=-1):
+    """
+    Return the booldim of the cut (subset, V - subset), i.e. the number of maximal independent
+    sets of its bipartite graph. If bound is not negative and the booldim exceeds it, stop
+    counting and return bound + 1 instead.
+    """
+    if isinstance(graph, Graph512) or bitset.domain(graph.vertices) > WORDSIZE:
+        # Too large for a single word, use the packed neighborhoods, converted once per graph
+        return cut_mis_count(packed(graph), subset, bound)
+    # The array neighborhoods are converted once per graph as well
+    return mis_count_bounded(cut(graph.vertices, neighborhood_array(graph), subset),
+                             graph.vertices, bound)
+
+
+def closure_booldim(graph, subset, bound=-1):
+    """
+    Return the booldim of the cut (subset, V - subset) as the number of unions of neighborhoods
+    of the smaller side, grown one vertex at a time like compute_next_un. This takes time
+    proportional to the booldim times the size of the smaller side.
+    The unions are packed onto the frontier of the smaller side; if that has more than
+    WORDSIZE vertices, the MIS are counted instead. The bound works like in mis_booldim.
+    """
+    small, large = cut_sides(graph, subset)
+    return closure_size_of(graph, subset, cut_neighborhoods(graph, small, large), bound)
+
+
+def closure_size_of(graph, subset, neighborhoods, bound=-1):
+    """Return closure_booldim of the cut, given the neighborhoods of cut_neighborhoods."""
+    frontier = bitset.join(neighborhoods)
+    if bitset.domain(frontier) > WORDSIZE:
+        if bitset.size(frontier) > WORDSIZE:
+            return mis_booldim(graph, subset, bound)
+        positions = {v: 1 << i for i, v in enumerate(bitset.iterate(frontier))}
+        neighborhoods = [sum(positions[v] for v in bitset.iterate(N)) for N in neighborhoods]
+    return closure_size(neighborhoods, bound)
+
+
+def cut_sides(graph, subset):
+    """Return the sides of the cut (subset, V - subset), the smaller one first."""
+    complement = graph.vertices - subset
+    if bitset.size(subset) <= bitset.size(complement):
+        return subset, complement
+    return complement, subset
+
+
+def cut_neighborhoods(graph, small, large):
+    """Return the distinct nonempty neighborhoods of the vertices of small within large."""
+    neighborhoods = {graph.neighborhoods[v] & large for v in bitset.iterate(small)}
+    neighborhoods.discard(0)
+    return list(neighborhoods)
+
+
+def choose_engine(graph, subset):
+    """
+    Return the name of the engine expected to compute the booldim of given cut fastest.
+    The union closure has at most 2^k unions for a smaller side of k distinct neighborhoods,
+    so it wins up to CLOSURE_MAX_SIDE of them. Beyond that it only wins on dense cuts, which
+    have few unions, while MIS counting is much faster on sparse cuts with a huge booldim.
+    """
+    small, large = cut_sides(graph, subset)
+    return engine_for(cut_neighborhoods(graph, small, large), large)
+
+
+def engine_for(neighborhoods, large):
+    """Return choose_engine of the cut, given the neighborhoods of cut_neighborhoods."""
+    k = len(neighborhoods)
+    if k <= CLOSURE_MAX_SIDE:
+        return 'closure'
+    density = float(sum(bitset.size(N) for N in neighborhoods)) / (k * bitset.size(large))
+    if density >= CLOSURE_MIN_DENSITY:
+        return 'closure'
+    return 'mis'
+
+
+# Crossover points of choose_engine, measured with benchmark.booldim_engines
+CLOSURE_MAX_SIDE = 16
+CLOSURE_MIN_DENSITY = 0.25
+
+ENGINES = {
+    'mis': mis_booldim,
+    'closure': closure_booldim,
+}
+
 
+def compute_booldim(graph, subset, bound=-1, engine='auto'):
+    """
+    Return the booldim of the cut (subset, V - subset), computed by the engine with given name,
+    or by the one choose_engine picks if engine is 'auto'. If bound is not negative and the
+    booldim exceeds it, return bound + 1 instead.
+    """
+    if engine != 'auto':
+        return ENGINES[engine](graph, subset, bound)
+    # The neighborhoods of the smaller side both pick the engine and feed the closure
+    small, large = cut_sides(graph, subset)
+    neighborhoods = cut_neighborhoods(graph, small, large)
+    if engine_for(neighborhoods, large) == 'closure':
+        return closure_size_of(graph, subset, neighborhoods, bound)
+    return mis_booldim(graph, subset, bound)
 
-def booldimtable(graph):
+
+def booldimtable(graph, processes=1):
+    """
+    Compute the booldims of all cuts of graph. Return them in a BooldimTable, or in a dict if
+    the vertices don't fit in a single word. With more than one process, the table is filled
+    by a pool of worker processes (see parallel.py).
+    """
+    if bitset.domain(graph.vertices) > WORDSIZE:
+        return booldimdict(graph)
+    return BooldimTable(graph, processes)
+
+
+def booldimdict(graph):
     """Compute booldim function."""
     booldim = {}
     #for subset in subsets(V, 1, -2):
@@ -48,6 +188,144 @@ def booldimtable(graph):
     return booldim
 
 
+def table_size(graph):
+    """Return the number of values in the BooldimTable of graph."""
+    return 1 << max(bitset.size(graph.vertices) - 1, 0)
+
+
+cdef inline unsigned int table_value(long long booldim) except? 0:
+    """Return booldim as a value of a BooldimTable, which has 32 bits per cut."""
+    if booldim > UINT_MAX:
+        raise OverflowError('Booldim {} does not fit in a BooldimTable'.format(booldim))
+    return <unsigned int>booldim
+
+
+def fill_booldims(graph, unsigned int[::1] values, Py_ssize_t start, Py_ssize_t stop):
+    """
+    Store the booldims of the subsets number start to stop (exclusive) of the Gray code walk
+    of BooldimTable in values, at their positions in the table.
+    The walk can start anywhere, so disjoint ranges can be filled independently.
+    """
+    cdef uint128 V = graph.vertices, A = 0, v, rest
+    cdef uint128 N[WORDSIZE]
+    cdef uint128 cutN[WORDSIZE]
+    cdef int order[WORDSIZE]
+    cdef int j, p, n = 0
+    cdef Py_ssize_t gray
+
+    if start >= stop:
+        return
+    rest = V
+    while rest:
+        p = __builtin_ctzll(rest)
+        order[n] = p
+        N[p] = graph.neighborhoods[(<uint128>1) << p] & V
+        rest &= rest - 1
+        n += 1
+
+    # Set up the cut of the first subset
+    gray = start ^ (start >> 1)
+    for j in range(n):
+        if gray >> j & 1:
+            A |= (<uint128>1) << order[j]
+    rest = V
+    while rest:
+        p = __builtin_ctzll(rest)
+        cutN[p] = N[p] & (V - A) if A >> p & 1 else N[p] & A
+        rest &= rest - 1
+    values[gray] = table_value(recursion_array(cutN, V, 0L))
+
+    for gray in range(start + 1, stop):
+        j = __builtin_ctzll(gray)
+        p = order[j]
+        v = (<uint128>1) << p
+        A ^= v
+        cutN[p] = N[p] & (V - A) if A & v else N[p] & A
+        rest = N[p]
+        while rest:
+            cutN[__builtin_ctzll(rest)] ^= v
+            rest &= rest - 1
+        values[gray ^ (gray >> 1)] = table_value(recursion_array(cutN, V, 0L))
+
+
+cdef class BooldimTable:
+
+    """
+    Dense table of the booldims of all cuts of a graph with at most 64 vertex positions,
+    indexed by vertex subset like a dict. Since booldim(A) = booldim(V - A), only the subsets
+    without the last vertex are stored, as an array indexed by their bit pattern restricted
+    to the vertices. As before, the universal cut (V, 0) has booldim 0.
+
+    The table is filled by visiting these subsets in Gray code order, such that every cut
+    differs from the previous one by moving a single vertex v to the other side. The bipartite
+    graph of the cut is kept in an array, in which only v and its neighbors change, and its
+    MIS are counted by recursion_array, which is fastest for these small graphs.
+    """
+
+    cdef unsigned int *values
+    cdef uint128 V, last
+    cdef readonly int n
+    cdef bint contiguous
+    # Index of the vertex at every position, among the vertices
+    cdef int rank[WORDSIZE]
+
+    def __cinit__(self, graph, processes=1):
+        cdef int i = 0
+        cdef uint128 rest
+        cdef Py_ssize_t length = table_size(graph)
+        self.V = graph.vertices
+        self.n = bitset.size(graph.vertices)
+        self.last = (<uint128>1) << (bitset.domain(graph.vertices) - 1) if self.n else 0
+        self.contiguous = bitset.domain(graph.vertices) == self.n
+        rest = self.V
+        while rest:
+            self.rank[__builtin_ctzll(rest)] = i
+            rest &= rest - 1
+            i += 1
+
+        self.values = <unsigned int *>malloc(length * sizeof(unsigned int))
+        if self.values == NULL:
+            raise MemoryError
+        if processes == 1:
+            fill_booldims(graph, <unsigned int[:length]>self.values, 0, length)
+        else:
+            from .parallel import parallel_fill_booldims
+            parallel_fill_booldims(graph, <unsigned int[:length]>self.values, processes)
+
+    def __dealloc__(self):
+        free(self.values)
+
+    cdef Py_ssize_t position(self, uint128 subset):
+        """Return the position in values of a subset without the last vertex."""
+        if self.contiguous:
+            return subset
+        cdef Py_ssize_t result = 0
+        while subset:
+            result |= (<Py_ssize_t>1) << self.rank[__builtin_ctzll(subset)]
+            subset &= subset - 1
+        return result
+
+    def __getitem__(self, key):
+        # The key is converted here, since Cython passes typed keys of __getitem__ as Py_ssize_t,
+        # which cannot hold the last of 64 positions
+        cdef uint128 subset
+        if key not in self:
+            raise KeyError(key)
+        subset = key
+        if subset == self.V:
+            # Don't count universal cuts
+            return 0
+        if subset & self.last:
+            subset = self.V - subset
+        return self.values[self.position(subset)]
+
+    def __contains__(self, subset):
+        return 0 <= subset and not subset >> WORDSIZE and not (<uint128>subset) & ~self.V
+
+    def __len__(self):
+        return (<Py_ssize_t>1) << self.n
+
+
 def print_decomposition(result, decomposition):
     print(result)
     for bd, (x, y) in decomposition:
@@ -12,17 +12,18 @@ import matplotlib.pyplot as plt
 
 from .. import heuristic # HACK
 
-def generate_random_graphs(graphsize, p_values, samples, outputdir):
+def generate_random_graphs(graphsize, p_values, samples, outputdir, seed=0):
     # Remove all existing graphs
-    shutil.rmtree(outputdir)
+    shutil.rmtree(outputdir, ignore_errors=True)
     if not os.path.exists(outputdir):
         os.makedirs(outputdir)
 
-    # Generate new graphs
+    # Generate new graphs, all drawn from a single seeded generator
+    rng = np.random.default_rng(seed)
     i = 0
     for p in p_values:
         for _ in range(samples):
-            graph = Graph.generate_random(graphsize, p)
+            graph = Graph.generate_random(graphsize, p, rng)
             graph.save('{}{}-{}.dgf'.format(outputdir, p, i))
             i += 1
 
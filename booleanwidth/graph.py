@@ -1,4 +1,3 @@
-from random import sample, random
 from .utils import powerlist
 from .bitset import iterate, size, contains, bit, bits, disjoint, index, domain, tolist, invert
 
@@ -137,7 +136,7 @@ class Graph:
         if w == v:
             raise ValueError('{} and {} are the same vertex.'.format(v, w))
 
-        if contains(self(v), w):
+        if not contains(self(v), w):
             raise ValueError('{} and {} are not connected.'.format(v, w))
 
         # Only support undirected edges
@@ -157,8 +156,13 @@ class Graph:
 
     def subgraph(self, vertices):
         """Return a graph which is the subgraph of self induced by given vertex subset."""
-        neighborhoods = {v: self(v) & vertices for v in self}
-        return Graph(self.vertices, neighborhoods)
+        vertices &= self.vertices
+        neighborhoods = {v: self(v) & vertices for v in iterate(vertices)}
+        return Graph(vertices, neighborhoods)
+
+    def view(self, vertices):
+        """Like subgraph, but sharing the neighborhoods of self instead of copying them."""
+        return GraphView(self, vertices)
 
     def verify_symmetry(self):
         for v in self:
@@ -193,60 +197,32 @@ class Graph:
             )
 
     @staticmethod
-    def load(filename):
-        graph = Graph()
-        with open(filename, 'r') as f:
-            while 1:
-                line = f.readline()
-                #print('Parsing `{}`'.format(line[:-1]))
-                if line == '':
-                    break
-                if line == '\n':
-                    continue
-
-                if line[0] == 'n':
-                    v = bit(int(line[1:]))
-                    graph.add(v)
-                elif line[0] == 'e':
-                    edge = line[1:].split()
-                    v, w = bit(int(edge[0])), bit(int(edge[1]))
-                    if v not in graph:
-                        graph.add(v)
-                    if w not in graph:
-                        graph.add(w)
-                    graph.connect(v, w)
-        print('Graph loaded')
+    def load(filename, cache=True, relabel=None):
+        """
+        Load a graph from a DGF file, using a binary cache file (see dgf.py).
+        If relabel is given, the vertices are renumbered in that order (see relabel.py).
+        """
+        from .dgf import load
+        graph = load(filename, cache)
+        if relabel:
+            from .relabel import relabel as relabel_graph
+            graph = relabel_graph(graph, relabel)
         return graph
 
     @staticmethod
-    def generate_random(nr_vertices, nr_edges=0):
+    def generate_random(nr_vertices, nr_edges=0, seed=None):
+        """
+        Return a random graph with each edge present with probability nr_edges if nr_edges < 1,
+        or else with exactly nr_edges edges. Reproducible for a given seed (see randomgraph.py).
+        """
         if not 0 <= nr_edges <= nr_vertices * (nr_vertices - 1) / 2:
             raise ValueError
 
         if not nr_edges:
             nr_edges = 0.5
 
-        graph = Graph()
-        graph.add(bits(*range(nr_vertices)))
-
-        if nr_edges < 1:
-            # Add random edges between groups
-            for v in graph:
-                for w in graph:
-                    if v < w and random() < nr_edges:
-                        graph.connect(v, w)
-            return graph
-        else:
-            vertex_list = list(iterate(graph.vertices))
-            for _ in range(nr_edges):
-                while 1:
-                    v, w = sample(vertex_list, 2)
-                    # Don't connect vertices twice
-                    if not w in graph[v]:
-                        break
-                graph.connect(v, w)
-
-            return graph
+        from .randomgraph import random_graph
+        return random_graph(nr_vertices, nr_edges, seed)
 
     @staticmethod
     def enumerate(nr_vertices):
@@ -260,3 +236,56 @@ class Graph:
             for v, w in edge_set:
                 graph.connect(v, w)
             yield graph
+
+
+class NeighborhoodView:
+
+    """Read-only mapping of the vertices in mask to their neighborhoods intersected with mask."""
+
+    def __init__(self, neighborhoods, mask):
+        self.neighborhoods = neighborhoods
+        self.mask = mask
+
+    def __getitem__(self, v):
+        if not v or not contains(self.mask, v):
+            raise KeyError(v)
+        return self.neighborhoods[v] & self.mask
+
+    def __contains__(self, v):
+        return v and contains(self.mask, v)
+
+    def __iter__(self):
+        return iterate(self.mask)
+
+    def __len__(self):
+        return size(self.mask)
+
+
+class GraphView(Graph):
+
+    """
+    The subgraph of a graph induced by a vertex subset, without copying any neighborhoods.
+    If the subset is closed under taking neighbors, e.g. a component, the neighborhoods of the
+    graph are shared as is. Otherwise every lookup is masked by the subset.
+    """
+
+    def __init__(self, graph, vertices):
+        vertices &= graph.vertices
+        N = graph.neighborhoods
+        if all(contains(vertices, N[v]) for v in iterate(vertices)):
+            Graph.__init__(self, vertices, N)
+        else:
+            Graph.__init__(self, vertices, NeighborhoodView(N, vertices))
+        self.graph = graph
+
+    def add(self, vertices):
+        raise TypeError('Graph views are read-only')
+
+    def remove(self, vertices):
+        raise TypeError('Graph views are read-only')
+
+    def connect(self, v, w):
+        raise TypeError('Graph views are read-only')
+
+    def disconnect(self, v, w):
+        raise TypeError('Graph views are read-only')
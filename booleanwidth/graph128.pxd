@@ -0,0 +1,10 @@
+from .bitset128 cimport uint128
+
+
+cdef class Neighborhoods:
+
+    cdef uint128 *N
+    cdef readonly int length
+
+    cdef int position(self, v) except -1
+    cpdef uint128 union(self, uint128 subset)
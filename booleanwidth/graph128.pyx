@@ -1,11 +1,20 @@
+from collections import OrderedDict
 from random import sample
+from libc.stdlib cimport calloc, free
 from .bitset128 import iterate, domain, index
 from .bitset128 cimport uint128
+from .bitset512 cimport WORDSIZE
+from .graph512 import Graph512, to512
+from . import bitset
 #from libcpp.unordered_map cimport unordered_map
-from cpython cimport array
-from array import array
+
+cdef extern int __builtin_ctzll(unsigned long long x)
+cdef extern int __builtin_popcountll(unsigned long long x)
 
 cpdef to128(graph):
+    if bitset.domain(graph.vertices) > WORDSIZE:
+        return to512(graph)
+
     vertices = <uint128>graph.vertices
     neighborhoods = {}
     for key in graph:
@@ -22,49 +31,116 @@ class Graph:
 
 
 cpdef to128_2(graph):
-    vertices = <uint128>graph.vertices
+    """Like to128, but store the neighborhoods in an array indexed by vertex position."""
+    if bitset.domain(graph.vertices) > WORDSIZE:
+        return to512(graph)
 
-    cdef array.array neighborhoods = array('L', domain(vertices) * [0L])
-    for key in graph.vertices:
-        neighborhoods[index(<int>key)] = <uint128>graph.neighborhoods[key]
+    cdef Neighborhoods neighborhoods = Neighborhoods(bitset.domain(graph.vertices))
+    for v in iterate(graph.vertices):
+        neighborhoods[v] = graph.neighborhoods[v]
 
-    return Graph2(vertices, neighborhoods)
+    return Graph2(graph.vertices, neighborhoods)
 
 
-cdef class Graph2:
+# Maximum number of converted copies, see converted
+MAXCONVERTED = 16
 
-    cdef public uint128 vertices
-    cdef public array.array neighborhoods
+# Converted copies by id of their graph and the conversion, least recently used first
+converted_graphs = OrderedDict()
 
-    def __cinit__(self, uint128 vertices, array.array neighborhoods):
-        self.vertices = vertices
-        self.neighborhoods = neighborhoods
+
+def converted(graph, conversion):
+    """
+    Return conversion(graph), converting every graph only once, for computing the booldims
+    of many of its cuts. Graphs must not be modified while they have a converted copy, see
+    clear_converted.
+    """
+    key = id(graph), conversion
+    entry = converted_graphs.get(key)
+    if entry is None or entry[0] is not graph:
+        entry = converted_graphs[key] = (graph, conversion(graph))
+        if len(converted_graphs) > MAXCONVERTED:
+            converted_graphs.popitem(last=False)
+    converted_graphs.move_to_end(key)
+    return entry[1]
+
+
+def clear_converted():
+    converted_graphs.clear()
+
+
+def packed(graph):
+    """Return the Graph512 of graph, see converted."""
+    if isinstance(graph, Graph512):
+        return graph
+    return converted(graph, to512)
 
 
-#
-# TESTING
-#
+def neighborhood_array(graph):
+    """Return the neighborhoods of graph as Neighborhoods, see converted."""
+    if isinstance(graph.neighborhoods, Neighborhoods):
+        return graph.neighborhoods
+    return converted(graph, to128_2).neighborhoods
 
 
-#import cProfile
+cdef class Neighborhoods:
 
-#graph = Graph.generate_random(15)
-#graph1 = to128(graph)
-#graph2 = to128_2(graph)
+    """
+    Neighborhoods stored in a contiguous array, indexed by the position of the vertex.
+    Cython code can look up N[v] with a single ctz, without hashing or boxing.
+    Python code can still use it as if it were a dict.
+    """
 
-#cdef c1 = 2**10
-#cpdef run1():
-    #cdef uint128 x
-    #for i in range(9999999):
-        #x = graph1.N[c1]
-    #return x
+    def __cinit__(self, int length):
+        self.length = length
+        self.N = <uint128 *>calloc(max(length, 1), sizeof(uint128))
+        if self.N == NULL:
+            raise MemoryError
 
-#cdef c2 = 10
-#cpdef run2():
-    #cdef uint128 x
-    #for i in range(9999999):
-        #x = graph2.N[index(c1)]
-    #return x
+    def __dealloc__(self):
+        free(self.N)
+
+    cdef int position(self, v) except -1:
+        # Keys are converted here, since Cython passes typed keys of __getitem__ and
+        # __setitem__ as Py_ssize_t, which cannot hold the last of 64 positions
+        cdef int i
+        if v <= 0 or v >> WORDSIZE or v & (v - 1):
+            raise KeyError(v)
+        i = __builtin_ctzll(<uint128>v)
+        if i >= self.length:
+            raise KeyError(v)
+        return i
+
+    def __getitem__(self, v):
+        return self.N[self.position(v)]
+
+    def __setitem__(self, v, uint128 neighborhood):
+        self.N[self.position(v)] = neighborhood
+
+    cpdef uint128 union(self, uint128 subset):
+        """Return the union of the neighborhoods of the vertices in subset."""
+        cdef uint128 result = 0
+        while subset:
+            result |= self.N[__builtin_ctzll(subset)]
+            subset &= subset - 1
+        return result
+
+
+cdef class Graph2:
+
+    cdef public uint128 vertices
+    cdef public Neighborhoods neighborhoods
+
+    def __cinit__(self, uint128 vertices, Neighborhoods neighborhoods):
+        self.vertices = vertices
+        self.neighborhoods = neighborhoods
 
-#cProfile.runctx('run1()', globals(), locals())
-#cProfile.runctx('run2()', globals(), locals())
+    @property
+    def density(self):
+        cdef int n = __builtin_popcountll(self.vertices)
+        cdef long m = 0
+        cdef uint128 rest = self.vertices
+        while rest:
+            m += __builtin_popcountll(self.neighborhoods.N[__builtin_ctzll(rest)])
+            rest &= rest - 1
+        return float(m) / float(n * (n - 1))
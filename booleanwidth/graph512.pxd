@@ -0,0 +1,11 @@
+from .bitset512 cimport bitset512
+
+
+cdef class Graph512:
+
+    cdef public object vertices
+    cdef public dict neighborhoods
+    cdef readonly int nwords
+    cdef readonly int length
+    cdef bitset512 V
+    cdef bitset512 *N
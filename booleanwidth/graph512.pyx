@@ -0,0 +1,34 @@
+"""
+Graphs with up to 512 vertices, with neighborhoods stored as multi-word bitsets.
+The python ints in vertices and neighborhoods are kept for code that doesn't know about
+the packed representation.
+"""
+from libc.stdlib cimport calloc, free
+from .bitset512 cimport bitset512, nwords_for, from_int, WORDSIZE
+from .bitset import iterate, index, domain
+
+
+cpdef to512(graph):
+    vertices = graph.vertices
+    neighborhoods = {v: graph.neighborhoods[v] for v in iterate(vertices)}
+    return Graph512(vertices, neighborhoods)
+
+
+
+cdef class Graph512:
+
+    def __cinit__(self, vertices, dict neighborhoods):
+        self.vertices = vertices
+        self.neighborhoods = neighborhoods
+        self.length = domain(vertices)
+        self.nwords = nwords_for(self.length)
+        self.N = <bitset512 *>calloc(max(self.length, 1), sizeof(bitset512))
+        if self.N == NULL:
+            raise MemoryError
+
+        from_int(&self.V, vertices, self.nwords)
+        for v in iterate(vertices):
+            from_int(&self.N[index(v)], neighborhoods[v], self.nwords)
+
+    def __dealloc__(self):
+        free(self.N)
@@ -1,26 +1,26 @@
 from .graph import Graph
-from .bitset import BitSet
+from .bitset import bit, bits
 
 
 def squares(width, height):
     """The numbering is from left to right, from top to bottom."""
     graph = Graph()
-    graph.add(BitSet.from_identifier(*range(width * height)))
+    graph.add(bits(*range(width * height)))
 
     # Connect horizontal edges
     for row in range(height):
         for column in range(width - 1):
             i = row * width + column
-            v = BitSet.from_identifier(i)
-            w = BitSet.from_identifier(i + 1)
+            v = bit(i)
+            w = bit(i + 1)
             graph.connect(v, w)
 
     # Connect vertical edges
     for column in range(width):
         for row in range(height - 1):
             i = row * width + column
-            v = BitSet.from_identifier(i)
-            w = BitSet.from_identifier(i + width)
+            v = bit(i)
+            w = bit(i + width)
             graph.connect(v, w)
 
     return graph
@@ -29,14 +29,14 @@ def squares(width, height):
 def semisquares(width, height):
     """The numbering is from left to right, from top to bottom."""
     graph = Graph()
-    graph.add(BitSet.from_identifier(*range(width * height)))
+    graph.add(bits(*range(width * height)))
 
     # Connect horizontal edges
     for row in range(height):
         for column in range(width - 1):
             i = row * width + column
-            v = BitSet.from_identifier(i)
-            w = BitSet.from_identifier(i + 1)
+            v = bit(i)
+            w = bit(i + 1)
             graph.connect(v, w)
             graph.split(v, w)
 
@@ -44,8 +44,8 @@ def semisquares(width, height):
     for column in range(width):
         for row in range(height - 1):
             i = row * width + column
-            v = BitSet.from_identifier(i)
-            w = BitSet.from_identifier(i + width)
+            v = bit(i)
+            w = bit(i + width)
             graph.connect(v, w)
             graph.split(v, w)
 
@@ -55,7 +55,7 @@ def semisquares(width, height):
 def cliques(width, height):
     """The numbering is from left to right, from top to bottom."""
     graph = Graph()
-    graph.add(BitSet.from_identifier(*range(width * height)))
+    graph.add(bits(*range(width * height)))
 
     # Connect horizontal cliques
     for row in range(height):
@@ -63,16 +63,16 @@ def cliques(width, height):
             i = row * width + column
             for column2 in range(column + 1, width):
                 j = row * width + column2
-                v = BitSet.from_identifier(i)
-                w = BitSet.from_identifier(j)
+                v = bit(i)
+                w = bit(j)
                 graph.connect(v, w)
 
     # Connect vertical edges
     for column in range(width):
         for row in range(height - 1):
             i = row * width + column
-            v = BitSet.from_identifier(i)
-            w = BitSet.from_identifier(i + width)
+            v = bit(i)
+            w = bit(i + width)
             graph.connect(v, w)
 
     return graph
@@ -81,7 +81,7 @@ def cliques(width, height):
 def semicliques(width, height):
     """The numbering is from left to right, from top to bottom."""
     graph = Graph()
-    graph.add(BitSet.from_identifier(*range(width * height)))
+    graph.add(bits(*range(width * height)))
 
     # Connect horizontal cliques
     for row in range(height):
@@ -89,8 +89,8 @@ def semicliques(width, height):
             i = row * width + column
             for column2 in range(column + 1, width):
                 j = row * width + column2
-                v = BitSet.from_identifier(i)
-                w = BitSet.from_identifier(j)
+                v = bit(i)
+                w = bit(j)
                 graph.connect(v, w)
                 graph.split(v, w)
 
@@ -98,8 +98,8 @@ def semicliques(width, height):
     for column in range(width):
         for row in range(height - 1):
             i = row * width + column
-            v = BitSet.from_identifier(i)
-            w = BitSet.from_identifier(i + width)
+            v = bit(i)
+            w = bit(i + width)
             graph.connect(v, w)
 
     return graph
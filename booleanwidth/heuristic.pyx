@@ -1,19 +1,26 @@
 # cython: profile=False
-from .bitset import (iterate, subsets, subsets_of_size, size, invert, tostring, subtract,
-                     index, domain, contains, first)
-#from .bitset128 import (iterate, subsets, subsets_of_size, size, invert, tostring, subtract,
-                        #index, domain, contains)
+from .backend import (iterate, subsets, subsets_of_size, size, invert, tostring, subtract,
+                      index, domain, contains, first)
 from .bitset128 cimport uint128
+from .graph128 cimport Neighborhoods
 import math
-from .components import components, bfs
+from .components import components, layers
+from .unions import next_unions, initial_unions
 from .utils import shuffled
+from .mis512 import estimate_cut_mis_count
 
 Infinity = float('inf')
 
+# Density of the graph of the running greedy_light_single_start, for relative_neighborhood5.
+# It is kept here rather than in the neighborhoods, which may be an array.
+light_density = None
+
 # NOTE: we leave out the leaf cases, because they are annoying and don't mean anything
 
 
 def get_neighborhood(N, subset):
+    if isinstance(N, Neighborhoods):
+        return (<Neighborhoods>N).union(subset)
     result = 0L
     for v in iterate(subset):
         result |= N[v]
@@ -28,8 +35,9 @@ def get_neighborhood_2(N, subset):
 
 
 def find_startvertex(graph, start):
-    v = list(bfs(graph, start))[-1]
-    return list(bfs(graph, v))[-1]
+    """Return a vertex in the last bfs layer from a vertex in the last bfs layer from start."""
+    v = first(layers(graph, start)[-1])
+    return first(layers(graph, v)[-1])
 
 
 #
@@ -73,7 +81,7 @@ def relative_neighborhood5(N, left, right, v):
     numerator1 = size(N[v] - (n_left & N[v]))
     numerator2 = size(N[v] & right - (n_left & N[v]))
     denominator = size(N[v] & n_left)
-    p = N[0]
+    p = light_density
     #numerator = p * numerator1 + (1 - p) * numerator2
     #numerator = numerator1 ** p + numerator2 ** (1 - p)
     numerator = numerator1 if p > 0.2 else numerator2
@@ -123,6 +131,22 @@ def neighborhood_size(N, left, right, v):
     return size(N[v])
 
 
+def estimated_booldim_score(epsilon=0.2, delta=0.1, maxsamples=1000):
+    """
+    Return a score function giving an estimate of log2 of the booldim of the cut
+    (left | v, right - v), which is within a factor 1 + epsilon with confidence 1 - delta
+    (see mis512.estimate_cut_mis_count). Much faster than exact counting on large graphs.
+    """
+    def estimated_booldim(N, left, right, v):
+        estimate = estimate_cut_mis_count(N, left | v, subtract(right, v), epsilon, delta,
+                                          maxsamples)
+        return math.log(max(estimate, 1), 2)
+    return estimated_booldim
+
+
+estimated_booldim = estimated_booldim_score()
+
+
 def minfront(N, left, right, v):
     new_n_left = get_neighborhood(N, left | v) & (right - v)
     new_n_right = get_neighborhood(N, right - v) & (left | v)
@@ -186,11 +210,8 @@ def lun_mincover(N, left, right, v):
 
 
 def next_un(N, un_left, left, right, v):
-    U = set()
-    for S in un_left:
-        U.add(S - (v & S))
-        U.add(S - (v & S) | (N[v] & (right - (v & right))))
-    return U
+    N_v = N[v] & (right - (v & right))
+    return next_unions(un_left, v, N_v)
 
 
 # Lets introduce UND: unions of neighborhoods by degree
@@ -222,7 +243,7 @@ def random_decomposition(graph):
 #
 
 def check_decomposition(G, decomposition):
-    un = {0L}
+    un = initial_unions()
     lboolw = 1
     left = 0L
     right = G.vertices
@@ -238,7 +259,19 @@ def check_decomposition(G, decomposition):
     return lboolw
 
 
-def greedy(G, depth=0):
+def greedy(G, depth=0, estimator=None, relabel=None):
+    """
+    Greedily build a linear decomposition from every starting vertex, each time adding the
+    vertex giving the smallest booldim. If estimator is given, booldims are not computed
+    exactly but estimated as 2 ** estimator(N, left, right, v), for a score function like
+    estimated_booldim. The starting vertex is then chosen by estimated width, but the returned
+    width is the exact width of the final decomposition.
+    If relabel, an ordering of relabel.py, is given, G is relabeled by it first, and the
+    decomposition is mapped back to the vertices of G.
+    """
+    if relabel:
+        from .relabel import solve_relabeled
+        return solve_relabeled(G, relabel, lambda H: greedy(H, depth, estimator))
     lboolw_components = []
     decomposition_components = []
 
@@ -249,17 +282,21 @@ def greedy(G, depth=0):
             print('{}th starting vertex'.format(i))
             right = subtract(component, start)
             left = start
-            un_left = next_un(G.neighborhoods, {0L}, 0L, component, start)
+            if estimator is None:
+                un_left = next_un(G.neighborhoods, initial_unions(), 0L, component, start)
+                lboolw = len(un_left)
+            else:
+                un_left = None
+                lboolw = 2 ** estimator(G.neighborhoods, 0L, component, start)
             booldim_left = 1
 
             decomposition = [start]
-            lboolw = len(un_left)
 
             for _ in range(size(component) - 1):
                 #print('next vertex')
-                best_vertex, best_un, _ = greedy_step(G, left, right, un_left, booldim_left,
-                        depth, {}, Infinity)
-                booldim_left = len(best_un)
+                best_vertex, best_un, best_booldim = greedy_step(G, left, right, un_left,
+                        booldim_left, depth, {}, Infinity, estimator)
+                booldim_left = len(best_un) if estimator is None else best_booldim
                 lboolw = max(lboolw, booldim_left)
                 un_left = best_un
 
@@ -277,17 +314,19 @@ def greedy(G, depth=0):
 
     total_lboolw = max(lboolw_components)
     total_decomposition = [v for part in decomposition_components for v in part]
+    if estimator is not None:
+        total_lboolw = check_decomposition(G, total_decomposition)
 
     return total_lboolw, total_decomposition
 
 
-def greedy_step(G, left, right, un_left, booldim_left, depth, un_table, bound):
+def greedy_step(G, left, right, un_left, booldim_left, depth, un_table, bound, estimator=None):
     best_vertex = None
     best_booldim = Infinity
     best_un = None
 
     if size(right) == 1:
-        return right, {0L}, 1
+        return right, initial_unions(), 1
 
     assert size(right) > 1
 
@@ -296,6 +335,8 @@ def greedy_step(G, left, right, un_left, booldim_left, depth, un_table, bound):
     # Trivial cases are slow
     for v in iterate(candidates):
         if trivial_case(G.neighborhoods, left, right, v):
+            if estimator is not None:
+                return v, None, 2 ** estimator(G.neighborhoods, left, right, v)
             new_un = next_un(G.neighborhoods, un_left, left, right, v)
             new_booldim = len(new_un)
             return v, new_un, new_booldim
@@ -303,10 +344,14 @@ def greedy_step(G, left, right, un_left, booldim_left, depth, un_table, bound):
     ties = 0 # TEST
 
     for v in iterate(candidates):
-        if left | v not in un_table:
-            un_table[left | v] = next_un(G.neighborhoods, un_left, left, right, v)
-        new_un = un_table[left | v]
-        new_booldim = len(new_un)
+        if estimator is not None:
+            new_un = None
+            new_booldim = 2 ** estimator(G.neighborhoods, left, right, v)
+        else:
+            if left | v not in un_table:
+                un_table[left | v] = next_un(G.neighborhoods, un_left, left, right, v)
+            new_un = un_table[left | v]
+            new_booldim = len(new_un)
 
         # Apply pruning
         if new_booldim >= bound:
@@ -315,7 +360,7 @@ def greedy_step(G, left, right, un_left, booldim_left, depth, un_table, bound):
 
         if depth > 0:
             _, _, recursive_booldim = greedy_step(G, left | v, subtract(right, v), new_un,
-                    new_booldim, depth - 1, un_table, best_booldim)
+                    new_booldim, depth - 1, un_table, best_booldim, estimator)
             new_booldim = max(new_booldim, recursive_booldim)
 
         if new_booldim == best_booldim:
@@ -341,8 +386,11 @@ def greedy_step(G, left, right, un_left, booldim_left, depth, un_table, bound):
 
     # If nothing found
     if best_vertex == None:
-        best_un = next_un(G.neighborhoods, un_left, left, right, v)
-        best_booldim = len(best_un)
+        if estimator is not None:
+            best_booldim = 2 ** estimator(G.neighborhoods, left, right, v)
+        else:
+            best_un = next_un(G.neighborhoods, un_left, left, right, v)
+            best_booldim = len(best_un)
         best_vertex = v
 
     #print('Ties: {}'.format(ties))
@@ -399,15 +447,23 @@ def greedy_light(G, score_function, depth=0):
 
     return total_score, total_decomposition
 
-def greedy_light_single_start(G, score_function, depth=0):
+def greedy_light_single_start(G, score_function, depth=0, relabel=None):
+    """
+    Return a linear decomposition of G built greedily by score_function from a peripheral
+    vertex of every component. With relabel, G is relabeled first like in greedy.
+    """
+    if relabel:
+        from .relabel import solve_relabeled
+        return solve_relabeled(G, relabel,
+                               lambda H: greedy_light_single_start(H, score_function, depth))
     component_decompositions = []
 
     # HACK
     #print(len(list(G.edges)))
     #print((len(G) ** 2))
-    p = G.density
+    global light_density
+    light_density = G.density
     #print(p)
-    G.neighborhoods[0] = p
 
     for component in components(G):
         start = find_startvertex(G, first(component))
@@ -485,7 +541,7 @@ def greedy_cost(G, depth=0):
             print('{}th starting vertex'.format(i))
             right = subtract(component, start)
             left = start
-            un_left = next_un(G.neighborhoods, {0L}, 0L, component, start)
+            un_left = next_un(G.neighborhoods, initial_unions(), 0L, component, start)
             booldim_left = 2
 
             decomposition = [start]
@@ -519,7 +575,7 @@ def greedy_cost(G, depth=0):
 
 def greedy_cost_step(G, left, right, un_left, booldim_left, depth, un_table):
     if size(right) == 1:
-        return right, {0L}, 1
+        return right, initial_unions(), 1
 
     assert size(right) > 1
 
@@ -558,14 +614,14 @@ def greedy_cost_step(G, left, right, un_left, booldim_left, depth, un_table):
 
 def check_decomposition_cost(G, decomposition):
     assert len(decomposition) == size(G.vertices)
-    un = {0L}
+    un = initial_unions()
     lboolc = 0
     left = 0L
     right = G.vertices
 
     for v in decomposition:
         un = next_un(G.neighborhoods, un, left, right, v)
-        #un_leaf = next_un(G.neighborhoods, {0L}, 0L, G.vertices, v)
+        #un_leaf = next_un(G.neighborhoods, initial_unions(), 0L, G.vertices, v)
         #print(len(un))
         #print_un(un)
         #lboolc += len(un) + len(un_leaf)
@@ -591,7 +647,7 @@ def greedy_cost_ties(G, depth=0):
             print('{}th starting vertex'.format(i))
             right = component - (start & component)
             left = start
-            un_left = next_un(G.neighborhoods, {0L}, 0L, component, start)
+            un_left = next_un(G.neighborhoods, initial_unions(), 0L, component, start)
             booldim_left = 2
 
             decomposition = [start]
@@ -627,7 +683,7 @@ def greedy_cost_ties_step(G, left, right, un_left, booldim_left, depth, un_table
     Return the best vertex, along with its score and un.
     """
     if size(right) == 1:
-        return right, {0}, 1
+        return right, initial_unions(), 1
 
     assert size(right) > 1
 
@@ -696,7 +752,7 @@ def first_improvement(G, depth=0):
         print('{}th starting vertex'.format(i))
         right = subtract(V, start)
         left = start
-        un_left = next_un(G.neighborhoods, {0L}, 0L, V, start)
+        un_left = next_un(G.neighborhoods, initial_unions(), 0L, V, start)
 
         decomposition = [start]
         lboolw = len(un_left)
@@ -719,7 +775,7 @@ def first_improvement(G, depth=0):
 
 def first_improvement_step(G, left, right, un_left, depth=0):
     if size(right) == 1:
-        return right, {0L}, 1
+        return right, initial_unions(), 1
     assert size(right) > 1
 
     current_booldim = len(un_left)
@@ -0,0 +1,170 @@
+"""
+Loading graphs from edge lists, METIS files, Matrix Market files and DGF files.
+Files are read in a single pass, line by line. Only the ids of the vertices and the edges
+(as two arrays of machine integers) are kept in memory until the graph is constructed.
+
+Vertex ids can be arbitrary tokens. When they are not non-negative integers, when distinct ids
+denote the same integer (like 1 and 01), or when they are sparse (the largest id is at least twice
+the number of vertices), they are remapped to dense positions 0..n-1 in increasing order, so a
+sparse id like 10^6 doesn't produce a gigantic bitset.
+Self loops are dropped and duplicate edges are merged.
+"""
+
+import os
+from array import array
+
+import numpy as np
+
+from .dgf import towords, fromwords
+from .bitset import bit
+
+
+def read_dgf(f):
+    for line in f:
+        if line[:1] == 'e':
+            yield tuple(line.split()[1:3])
+        elif line[:1] == 'n':
+            yield (line.split()[1],)
+
+
+def read_edgelist(f):
+    """Read lines containing one or two vertex ids. Further tokens (weights) are ignored."""
+    for line in f:
+        if line[:1] in '#%':
+            continue
+        tokens = line.split()
+        if tokens:
+            yield tuple(tokens[:2])
+
+
+def read_metis(f):
+    """Read a METIS graph file, in which line i lists the neighbors of vertex i."""
+    nr_vertices = None
+    v = 0
+    for line in f:
+        if line[:1] == '%':
+            continue
+        tokens = line.split()
+        if nr_vertices is None:
+            if not tokens:
+                continue
+            nr_vertices = int(tokens[0])
+            fmt = tokens[2].zfill(3) if len(tokens) > 2 else '000'
+            ncon = int(tokens[3]) if len(tokens) > 3 else 1
+            skip = (fmt[0] == '1') + (ncon if fmt[1] == '1' else 0)
+            step = 2 if fmt[2] == '1' else 1
+            continue
+
+        v += 1
+        if v > nr_vertices:
+            if tokens:
+                raise ValueError('METIS file contains more than {} vertices'.format(nr_vertices))
+            continue
+        yield (str(v),)
+        for w in tokens[skip::step]:
+            yield str(v), w
+
+    if nr_vertices is None:
+        raise ValueError('METIS file has no header')
+    for i in range(v + 1, nr_vertices + 1):
+        yield (str(i),)
+
+
+def read_matrixmarket(f):
+    """Read the nonzero pattern of a square Matrix Market coordinate matrix."""
+    header = f.readline().lower().split()
+    if header[:3] != ['%%matrixmarket', 'matrix', 'coordinate']:
+        raise ValueError('Only Matrix Market coordinate matrices are supported')
+
+    dimensions = None
+    for line in f:
+        if line[:1] == '%':
+            continue
+        tokens = line.split()
+        if not tokens:
+            continue
+        if dimensions is None:
+            dimensions = int(tokens[0]), int(tokens[1])
+            if dimensions[0] != dimensions[1]:
+                raise ValueError('Matrix of size {}x{} is not square'.format(*dimensions))
+            for i in range(1, dimensions[0] + 1):
+                yield (str(i),)
+            continue
+        yield tokens[0], tokens[1]
+
+
+FORMATS = {
+    'dgf': read_dgf,
+    'edgelist': read_edgelist,
+    'metis': read_metis,
+    'mtx': read_matrixmarket,
+}
+
+EXTENSIONS = {
+    '.dgf': 'dgf',
+    '.graph': 'metis',
+    '.metis': 'metis',
+    '.mtx': 'mtx',
+}
+
+
+def guess_format(filename):
+    return EXTENSIONS.get(os.path.splitext(filename)[1].lower(), 'edgelist')
+
+
+def ingest(entries, remap=None):
+    """
+    Construct a graph from an iterable of vertex ids (1-tuples) and edges (2-tuples).
+    Return the graph and a dict mapping each vertex to its id.
+    If remap is None, ids are only remapped if needed (see module docstring). If remap is
+    False, all ids must be distinct integers.
+    """
+    ids = {}
+    sources = array('q')
+    targets = array('q')
+    for entry in entries:
+        u = ids.setdefault(entry[0], len(ids))
+        if len(entry) > 1:
+            sources.append(u)
+            targets.append(ids.setdefault(entry[1], len(ids)))
+
+    labels = list(ids)
+    try:
+        numbers = np.array([int(label) for label in labels], dtype=np.int64)
+    except ValueError:
+        numbers = None
+
+    duplicates = numbers is not None and len(np.unique(numbers)) < len(numbers)
+    if remap is None:
+        remap = (numbers is None or duplicates or
+                 len(numbers) and (numbers.min() < 0 or numbers.max() >= 2 * len(numbers)))
+    if remap:
+        order = np.argsort(numbers if numbers is not None else np.array(labels), kind='stable')
+        positions = np.empty(len(labels), dtype=np.int64)
+        positions[order] = np.arange(len(labels))
+    elif numbers is None:
+        raise ValueError('Vertex ids must be integers if they are not remapped')
+    elif duplicates:
+        raise ValueError('Distinct vertex ids denote the same integer, they must be remapped')
+    else:
+        positions = numbers
+
+    edges = positions[np.stack([np.frombuffer(sources, dtype=np.int64),
+                                np.frombuffer(targets, dtype=np.int64)], axis=1)]
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    graph = fromwords(towords(positions, edges))
+    return graph, {bit(int(p)): label for p, label in zip(positions, labels)}
+
+
+def load(filename, format=None, remap=None):
+    """
+    Load a graph from filename, in the given format or else the one guessed from its extension.
+    Return the graph and a dict mapping each vertex to its id in the file.
+    Like Graph.load, DGF files keep their ids unless remap is set.
+    """
+    format = format or guess_format(filename)
+    if remap is None and format == 'dgf':
+        remap = False
+    with open(filename, 'r') as f:
+        return ingest(FORMATS[format](f), remap)
@@ -1,70 +1,72 @@
-from .bitset128 import (iterate, subsets, size, invert, tostring, subtract, subsets_of_size,
-                        subsets_by_size)
-from .dynamicprogramming import booldimtable, compute_booldim
-from .lboolw import compute_next_un
+from .backend import iterate, subsets, size, invert, tostring, subtract, subsets_of_size
+from .dynamicprogramming import booldimtable
+from .booldimcache import cached_booldim, booldim_cache
+from .lboolw import (compute_next_un, BoundedTables, stream_layers, stream_search_attempt,
+                     stored_tables)
+from .unions import initial_unions
+from .ranktable import rank_table
+from .bounds import lboolc_lower_bound, lboolc_upper_bound, grow_bound
 
 
 # New fast exact algos
 
 # NOTE: lbc(X) does not take booldim(X) into account
 
-def compute_lboolc_with_upperbound(G, k):
+def compute_lboolc_with_upperbound(G, k, tables=None):
+    """
+    Return the lboolc and booldim tables if some order of V has all its prefixes of lboolc at
+    most k, and False otherwise. If tables from a call with a smaller k are given, they are
+    extended.
+    """
     print('Upperbound: {}'.format(k))
-    V = G.vertices
+    if tables is None:
+        tables = BoundedTables(G, cost=True)
 
-    lboolc = {}
-    lboolc[0L] = 0
-
-    booldim = {}
-    un = {}
-    #for v in iterate(G.vertices):
-        #if G.neighborhoods[v]:
-            #un[v] = {G.neighborhoods[v], 0L}
-            #booldim[v] = 2
-        #else:
-            #un[v] = {0L}
-            #booldim[v] = 1
-    booldim[0L] = 1 # NOTE THIS!!!!
-    un[0L] = {0L}
-    booldim[G.vertices] = 0
-    un[G.vertices] = {0L}
-
-
-    ss = subsets_by_size(V)
-    for i in range(1, size(V) + 1):
-        #for X in subsets(V, i, i): # Improve filtering
-        #for X in subsets_of_size(V, i):
-        for X in ss[i]:
-            for v in iterate(X):
-                X_v = subtract(X, v)
-                if X_v in lboolc and lboolc[X_v] <= k:
-                    if X not in booldim:
-                        un[X] = compute_next_un(G, un, X, v)
-                        booldim[X] = len(un[X])
-
-                    # What if X == v?
-                    #new_lboolc = booldim[X] + booldim[v] + lboolc[X_v]
-                    #new_lboolc = booldim[v] + booldim[X_v] + lboolc[X_v]
-                    new_lboolc = booldim[X_v] + lboolc[X_v]
-                    if X not in lboolc:
-                        lboolc[X] = new_lboolc
-                    else:
-                        lboolc[X] = min(lboolc[X], new_lboolc)
-
-    if V in lboolc:
-        return lboolc, booldim
+    if tables.raise_bound(k):
+        return tables.value, tables.booldim
     else:
         return False
 
 
-def compute_lboolc(G):
-    k = 1
+def compute_lboolc(G, store=None):
+    """
+    The bound is raised until the lboolc of V is at most k + 1. The last prefix of an order
+    costs at least 1, so then all prefixes of an optimal order fit within the bound.
+    If store, a DPStore or the name of its directory, is given, the tables are computed by
+    stream_layers into memory-mapped files, resuming the run of an earlier call which was
+    interrupted.
+    """
+    V = G.vertices
+    if store is not None:
+        return stored_tables(G, True, store, lboolc_lower_bound(G), lboolc_upper_bound(G)[0])
+    tables = BoundedTables(G, cost=True)
+    k = lboolc_lower_bound(G) - 1
     while 1:
-        result = compute_lboolc_with_upperbound(G, k)
-        if result == False:
-            k *= 2
-        else:
+        result = compute_lboolc_with_upperbound(G, k, tables)
+        if result != False and result[0][V] <= k + 1:
             return result
+        k = tables.next_bound()
+        if k is None:
+            return tables.value, tables.booldim
+
+
+def compute_lboolc_streaming(G, k=None, backpointers=None, processes=1, relabel=None):
+    """
+    Return the linear boolean-cost of G and an optimal linear decomposition (a vertex order),
+    keeping only two layers of the dynamic programming in memory, see stream_layers.
+    As in compute_lboolc, the result is exact if it is at most k + 1. Without k, the cost is
+    searched from the lower bound of bounds.py.
+    With relabel, G is relabeled first like in compute_lboolw_decomposition.
+    """
+    if relabel:
+        from .relabel import solve_relabeled
+        return solve_relabeled(G, relabel, lambda H: compute_lboolc_streaming(
+            H, k, backpointers, processes))
+    if k is not None:
+        return stream_layers(G, k, True, backpointers, None, processes)
+    return grow_bound(lambda cost: stream_search_attempt(G, cost, True, backpointers, None,
+                                                         processes),
+                      lboolc_lower_bound(G), lboolc_upper_bound(G)[0])
 
 
 def construct_lboolc_decomposition(lboolc, booldim, subset, bound=None):
@@ -77,7 +79,8 @@ def construct_lboolc_decomposition(lboolc, booldim, subset, bound=None):
         #print(lboolc[v])
         #print(lboolc[subtract(subset, v)])
         #if booldim[v] + lboolc[subtract(subset, v)] + booldim[subset] <= bound:
-        if lboolc[subtract(subset, v)] + booldim[subtract(subset, v)] <= bound:
+        if (subtract(subset, v) in lboolc and
+                lboolc[subtract(subset, v)] + booldim[subtract(subset, v)] <= bound):
             #yield booldim[subset - v], (v, subset - v)
             yield v
             yield from construct_lboolc_decomposition(lboolc, booldim, subset - v,
@@ -100,16 +103,17 @@ def print_un(un):
 # Old algos
 #
 
-def linearboolcosttable(graph):
+def linearboolcosttable(graph, processes=1):
     """
     bctable[A] contains the booleancost of the subgraph induced by A
     """
-    booldim = booldimtable(graph)
+    booldim = booldimtable(graph, processes)
 
     cdef long v, A, B
 
     # Init table
-    bctable = {}
+    n = size(graph.vertices)
+    bctable = rank_table(graph.vertices, n * (2 ** (n // 2) + 2))
     for v in iterate(graph.vertices):
         if graph.neighborhoods[v] == 0L:
             bctable[v] = 1
@@ -135,20 +139,34 @@ def linear_decomposition(table, booldim, long A):
                 break
 
 
-def linearbooleancost(graph):
-    bctable, booldim = linearboolcosttable(graph)
+def linearbooleancost(graph, processes=1):
+    bctable, booldim = linearboolcosttable(graph, processes)
     return (bctable[graph.vertices],
             list(linear_decomposition(bctable, booldim, graph.vertices)))
 
 
-def greedy_lbc(graph, depth=1):
-    """Assumption: no islets"""
+def greedy_lbc(graph, depth=1, processes=1):
+    """
+    Assumption: no islets
+    With several processes, the booldims of all candidate cuts todo - v of a step are computed
+    in one batch by a BooldimPool, before the candidates are compared.
+    """
+    if processes != 1:
+        from .parallel import BooldimPool
+        with BooldimPool(graph, processes) as pool:
+            return greedy_lbc_steps(graph, depth, pool)
+    return greedy_lbc_steps(graph, depth)
+
+
+def greedy_lbc_steps(graph, depth, pool=None):
     todo = graph.vertices
     cost = 0
     decomposition = []
     while size(todo) > 1:
-        _, x = min((compute_booldim(graph, todo - v) + greedy_lookahead(graph, todo - v, depth - 1), v) for v in iterate(todo))
-        bd = compute_booldim(graph, todo - x)
+        if pool is not None:
+            booldim_cache(graph).prefetch([todo - v for v in iterate(todo)], pool)
+        _, x = greedy_step(graph, todo, depth)
+        bd = cached_booldim(graph, todo - x)
         decomposition.append((bd, (x, todo - x)))
         cost += bd + 2
         todo -= x
@@ -156,14 +174,34 @@ def greedy_lbc(graph, depth=1):
     return cost, decomposition
 
 
-def greedy_lookahead(graph, todo, depth):
+def greedy_step(graph, todo, depth, bound=-1):
+    """
+    Return (cost, v) with the smallest v in todo minimizing the sum of the booldim of
+    todo - v and the lookahead of depth - 1.
+    Costs larger than the best one so far (or than bound, if not negative) are not counted
+    exactly, so if no cost is at most bound, some cost larger than bound is returned.
+    """
+    best = None
+    for v in iterate(todo):
+        limit = bound if best is None else best[0]
+        cost = cached_booldim(graph, todo - v, limit)
+        if limit < 0:
+            cost += greedy_lookahead(graph, todo - v, depth - 1)
+        elif cost <= limit:
+            cost += greedy_lookahead(graph, todo - v, depth - 1, limit - cost)
+        if best is None or cost < best[0]:
+            best = cost, v
+    return best
+
+
+def greedy_lookahead(graph, todo, depth, bound=-1):
     if size(todo) < 2 or depth < 1:
         return 0
 
-    return min(compute_booldim(graph, todo - v) + greedy_lookahead(graph, todo - v, depth - 1) for v in iterate(todo))
+    return greedy_step(graph, todo, depth, bound)[0]
 
 
-from lboolw import neighborhood_ratio
+from .lboolw import neighborhood_ratio
 
 def relative_neighborhood_lbc(graph, depth=1):
     """Assumption: no islets"""
@@ -180,7 +218,7 @@ def relative_neighborhood_lbc(graph, depth=1):
         _, x = min((neighborhood_ratio(graph, N_left, v)
                     + relative_neighborhood_lookahead(graph, todo - v, depth - 1), v)
                     for v in iterate(todo))
-        bd = compute_booldim(graph, todo - x)
+        bd = cached_booldim(graph, todo - x)
         decomposition.append((bd, (x, todo - x)))
         cost += bd + 2
         todo -= x
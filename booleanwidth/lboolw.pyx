@@ -1,39 +1,96 @@
-from .bitset import (iterate, subsets, subsets_of_size, size, invert, tostring, subtract,
-                        index, domain, contains)
+import tempfile
+from heapq import heappush, heappop
+
+import numpy as np
+from .bitset128 cimport uint128
+
+from .backend import (iterate, subsets, subsets_of_size, size, invert, tostring, subtract,
+                      index, domain, contains)
 from .dynamicprogramming import booldimtable, compute_booldim
+from .booldimcache import cached_booldim, booldim_cache
+from .components import components
+from .unions import next_unions, initial_unions
+from .ranktable import RankTable, rank_table, smallest_dtype
+from .dpstore import DPStore
+from .bounds import lboolw_lower_bound, lboolw_upper_bound, search_bound, grow_bound
 
 # New fast exact algos
 
-def compute_lboolw_decomposition(G):
+# Back-pointer of sets without a value
+NO_VERTEX = 255
+
+def compute_lboolw_decomposition(G, relabel=None):
+    """
+    Return the lboolw of G, an optimal decomposition as (booldim, cut) pairs and the booldim
+    table. If relabel, an ordering of relabel.py, is given, G is relabeled by it first, and
+    the decomposition and booldim table are mapped back to the vertices of G.
+    """
+    if relabel:
+        from .relabel import relabel as relabel_graph
+        H = relabel_graph(G, relabel)
+        lboolw, decomposition, booldim = compute_lboolw_decomposition(H)
+        return (lboolw, H.relabeling.restore_decomposition(decomposition),
+                H.relabeling.restore_table(booldim))
     lboolw, booldim = compute_lboolw_space(G)
     decomposition = construct_lboolw_decomposition(lboolw, booldim, G.vertices)
     return lboolw[G.vertices], decomposition, booldim
 
 def compute_lboolw_space(G):
-    k = 1
-    while 1:
-        result = compute_lboolw_with_upperbound_space(G, k)
-        if result == False:
-            k *= 2
-        else:
-            return result
-
-def compute_lboolw(G):
-    k = 1
-    while 1:
-        result = compute_lboolw_with_upperbound(G, k)
-        if result == False:
-            k *= 2
-        else:
-            return result
+    booldim = {0L: 1}
+    frontier = {0L: initial_unions()}
+    return search_bound(lambda k: compute_lboolw_with_upperbound_space(G, k, booldim, frontier),
+                        *lboolw_bounds(G))
 
-def compute_lboolw_with_upperbound_space(G, k):
+def compute_lboolw(G, store=None):
+    """
+    Return the lboolw and booldim tables of G. If store, a DPStore or the name of its
+    directory, is given, the tables are computed by stream_layers into memory-mapped files,
+    resuming the run of an earlier call which was interrupted.
+    """
+    if store is not None:
+        return stored_tables(G, False, store, *lboolw_bounds(G))
+    tables = BoundedTables(G)
+    k = lboolw_lower_bound(G)
+    while not compute_lboolw_with_upperbound(G, k, tables):
+        k = tables.next_bound()
+    return tables.value, tables.booldim
+
+def lboolw_bounds(G):
+    """Return a lower bound and an upper bound on the linear boolean-width of G."""
+    return lboolw_lower_bound(G), lboolw_upper_bound(G)[0]
+
+def compute_lboolw_by_components(G):
+    """
+    Return the linear boolean-width of G and a linear decomposition (a vertex order).
+    Every connected component is solved separately, on a view of G.
+    """
+    width = 1
+    decomposition = []
+    for component in components(G):
+        lboolw, booldim = compute_lboolw(G.view(component))
+        width = max(width, lboolw[component])
+        order = []
+        rest = component
+        for _, (v, rest) in construct_lboolw_decomposition(lboolw, booldim, component):
+            order.append(v)
+        decomposition.append(rest)
+        decomposition.extend(reversed(order))
+    return width, decomposition
+
+def compute_lboolw_with_upperbound_space(G, k, booldim=None, frontier=None):
+    """
+    If booldim and frontier are given, they are the tables of an earlier call with a smaller k,
+    which are extended instead of recomputed. frontier holds the UN of the sets whose booldim
+    exceeded that k, so only those need to be expanded.
+    """
     #print('Upperbound: {}'.format(k))
     V = G.vertices
 
-    booldim = {}
-    booldim[0L] = 1
-    compute_booldim_space(G, k, booldim, 0, set([0]))
+    if booldim is None:
+        booldim = {0L: 1}
+        frontier = {0L: initial_unions()}
+    for X in [X for X in frontier if booldim[X] <= k]:
+        compute_booldim_space(G, k, booldim, X, frontier.pop(X), frontier)
 
     lboolw = {}
     lboolw[0L] = 0
@@ -53,60 +110,322 @@ def compute_lboolw_with_upperbound_space(G, k):
     else:
         return False
 
-def compute_booldim_space(G, k, booldim, X, UN_X):
+def compute_booldim_space(G, k, booldim, X, UN_X, frontier=None):
     for v in iterate(G.vertices - X):
         Y = X | v
         if Y not in booldim:
             UN_Y = compute_next_un(G, Y, v, UN_X)
             booldim[Y] = len(UN_Y)
             if booldim[Y] <= k:
-                compute_booldim_space(G, k, booldim, Y, UN_Y)
+                compute_booldim_space(G, k, booldim, Y, UN_Y, frontier)
+            elif frontier is not None:
+                frontier[Y] = UN_Y
 
 def compute_next_un(G, X, v, UN_X_v):
     """Compute UN of X, based on the UN of X-v"""
-    U = set()
-    for S in UN_X_v:
-        U.add(subtract(S, v))
-        #U.add(subtract(S, v) | (G.neighborhoods[v] & invert(subtract(X, v), domain(G.vertices))))
-        U.add(subtract(S, v) | (G.neighborhoods[v] & (G.vertices - subtract(X, v))))
-    return U
-
+    N_v = G.neighborhoods[v] & (G.vertices - subtract(X, v))
+    return next_unions(UN_X_v, v, N_v)
 
-# NOTE: lbw(X) also takes booldim(X) into account
 
-def compute_lboolw_with_upperbound(G, k):
-    print('Upperbound: {}'.format(k))
-    V = G.vertices
+class BoundedTables:
 
-    lboolw = {}
-    lboolw[0L] = 0
-    booldim = {}
-    booldim[0L] = 1
-    un = {}
-    un[0L] = {0L}
+    """
+    Tables of the exact algorithms under an upper bound, which can be raised without starting
+    over. value[X] is the minimum over all orders of X, through sets whose value is at most
+    the bound, of lboolw(X) (or lboolc(X) if cost is set), and booldim and un are known for
+    every set that has a value.
+    value and booldim are RankTables, unless G has more than 64 vertex positions.
+    Sets whose value exceeds the bound are pruned, that is, kept on a heap without adding
+    their vertices. Raising the bound only adds the vertices of the pruned sets that fit
+    within the new bound, and of the sets whose value decreased as a result.
+    """
 
-    for i in range(1, size(V) + 1):
-        #for X in subsets(V, i, i): # Improve filtering
-        for X in subsets_of_size(V, i):
-            for v in iterate(X):
-                X_v = subtract(X, v)
-                if X_v in lboolw and lboolw[X_v] <= k:
+    def __init__(self, G, cost=False):
+        self.G = G
+        self.cost = cost
+        self.bound = 0
+        n = size(G.vertices)
+        maxbooldim = 2 ** (n // 2)
+        self.value = rank_table(G.vertices, n * maxbooldim if cost else maxbooldim)
+        self.value[0L] = 0
+        self.booldim = rank_table(G.vertices, maxbooldim)
+        self.booldim[0L] = 1
+        self.un = {0L: initial_unions()}
+        if cost:
+            self.booldim[G.vertices] = 0 # The cut (V, 0) costs nothing
+            self.un[G.vertices] = initial_unions()
+        self.pruned = [(0, 0L)]
+
+    def raise_bound(self, k):
+        """Expand the tables to the upper bound k, and return whether V has a value."""
+        if k < self.bound:
+            raise ValueError('Bound {} is below the bound {} of the tables'.format(k, self.bound))
+        G = self.G
+        V = G.vertices
+        value = self.value
+        booldim = self.booldim
+        un = self.un
+
+        # Sets to add vertices to, by size
+        layers = [set() for _ in range(size(V) + 1)]
+        while self.pruned and self.pruned[0][0] <= k:
+            old_value, X = heappop(self.pruned)
+            if value[X] == old_value:
+                layers[size(X)].add(X)
+
+        for i in range(size(V)):
+            for X_v in layers[i]:
+                for v in iterate(V - X_v):
+                    X = X_v | v
                     if X not in booldim:
                         un[X] = compute_next_un(G, X, v, un[X_v])
                         booldim[X] = len(un[X])
 
-                    if X not in lboolw:
-                        lboolw[X] = max(booldim[X], lboolw[X_v])
+                    if self.cost:
+                        new_value = booldim[X_v] + value[X_v]
                     else:
-                        lboolw[X] = min(lboolw[X], max(booldim[X], lboolw[X_v]))
+                        new_value = max(booldim[X], value[X_v])
+                    old_value = value.get(X)
+                    if old_value is None or new_value < old_value:
+                        value[X] = new_value
+                        if new_value <= k:
+                            layers[i + 1].add(X)
+                        else:
+                            heappush(self.pruned, (new_value, X))
 
+        self.bound = k
+        return V in value
 
-    if V in lboolw:
-        return lboolw, booldim
+    def next_bound(self):
+        """Return the smallest bound at which more sets would be expanded, or None."""
+        while self.pruned and self.value[self.pruned[0][1]] != self.pruned[0][0]:
+            heappop(self.pruned)
+        return self.pruned[0][0] if self.pruned else None
+
+
+# NOTE: lbw(X) also takes booldim(X) into account
+
+def compute_lboolw_with_upperbound(G, k, tables=None):
+    """
+    Return the lboolw and booldim tables if the linear boolean-width of G is at most k,
+    and False otherwise. If tables from a call with a smaller k are given, they are extended.
+    """
+    print('Upperbound: {}'.format(k))
+    if tables is None:
+        tables = BoundedTables(G)
+
+    if tables.raise_bound(k):
+        return tables.value, tables.booldim
     else:
         return False
 
 
+def stored_tables(G, cost, store, lower, upper):
+    """
+    Search the bound for stream_layers with grow_bound from lower, or from the bound of a
+    checkpointed run in store, and return the tables in store.
+    """
+    if isinstance(store, str):
+        store = DPStore(store)
+    if domain(G.vertices) > size(G.vertices):
+        # Like stream_layers, solve G on positions 0..n-1
+        from .relabel import relabel
+        H = relabel(G, list(iterate(G.vertices)))
+        value, booldim = stored_tables(H, cost, store, lower, upper)
+        return H.relabeling.restore_table(value), H.relabeling.restore_table(booldim)
+    bound = store.bound(G, cost)
+    if bound is not None:
+        lower = bound + cost
+    grow_bound(lambda k: stream_search_attempt(G, k, cost, None, store), lower, upper)
+    return store.tables()
+
+
+def stream_search_attempt(G, k, cost, backpointers=None, store=None, processes=1):
+    """
+    Run stream_layers for width k, or for cost k with bound k - 1, see compute_lboolc.
+    Return its result if the width or cost of G is at most k, and False otherwise.
+    """
+    result = stream_layers(G, k - 1 if cost else k, cost, backpointers, store, processes)
+    if result == False or result[0] > k:
+        return False
+    return result
+
+
+def compute_lboolw_streaming(G, k=None, backpointers=None, processes=1, relabel=None):
+    """
+    Return the linear boolean-width of G and an optimal linear decomposition (a vertex order),
+    keeping only two layers of the dynamic programming in memory, see stream_layers.
+    Without an upper bound k, it is grown from the lower bound of bounds.py, since a run with
+    a bound far above the width keeps many more sets.
+    With relabel, G is relabeled first like in compute_lboolw_decomposition.
+    """
+    if relabel:
+        from .relabel import solve_relabeled
+        return solve_relabeled(G, relabel, lambda H: compute_lboolw_streaming(
+            H, k, backpointers, processes))
+    if k is None:
+        return grow_bound(lambda k: stream_search_attempt(G, k, False, backpointers, None,
+                                                          processes),
+                          *lboolw_bounds(G))
+    return stream_layers(G, k, False, backpointers, None, processes)
+
+
+def stream_layers(G, k, cost, backpointers=None, store=None, processes=1):
+    """
+    Solve the recurrence of BoundedTables for upper bound k one layer of sets of equal size at a
+    time, and return the value of V and an optimal order, or False if V has no value.
+    Only the values and UN of the current and the previous layer are kept. For every set, the
+    position among the vertices of the vertex added last on an optimal order is written to
+    backpointers, a binary file opened for writing and reading (by default a temporary file),
+    as one byte per set, layer after layer in colex order. The order is read back from it
+    at the end.
+
+    If store, a DPStore, is given, the values and booldims of all layers and the back-pointers
+    are kept in its files instead, every completed layer is checkpointed, and a run with the
+    same graph and bound continues after its last checkpoint.
+    With several processes, every layer is solved in parallel, see parallel_stream_layers,
+    unless the layers are too small for this to pay off (see use_layer_pool in parallel.py).
+
+    The RankTables index vertex positions, so a graph with gaps between its positions is
+    solved on positions 0..n-1 in the same order, and the order is mapped back.
+    """
+    if domain(G.vertices) > size(G.vertices):
+        from .relabel import solve_relabeled
+        return solve_relabeled(G, list(iterate(G.vertices)), lambda H: stream_layers(
+            H, k, cost, backpointers, store, processes))
+    if processes != 1:
+        if store is not None:
+            raise ValueError('Checkpoints are not supported with several processes')
+        from .parallel import parallel_stream_layers, use_layer_pool
+        if use_layer_pool(size(G.vertices), processes):
+            return parallel_stream_layers(G, k, cost, backpointers, processes)
+
+    V = G.vertices
+    n = size(V)
+    position = {v: p for p, v in enumerate(iterate(V))}
+    dtype = layer_dtypes(n, cost)[0]
+    booldim = None
+    checkpoint = None
+    if store is not None:
+        checkpoint = store.start(G, k, cost, dtype)
+        value = store.value
+        booldim = store.booldim
+        backpointers = store.backpointers
+        start = 0
+    else:
+        value = RankTable(V, dtype)
+        if backpointers is None:
+            backpointers = tempfile.TemporaryFile()
+        start = backpointers.tell()
+
+    if checkpoint is None:
+        first = 0
+        value[0L] = 0
+        un_previous = {0L: initial_unions()}
+        if booldim is not None:
+            booldim[0L] = 1
+        np.full(1, NO_VERTEX, dtype=np.uint8).tofile(backpointers)
+        if store is not None:
+            store.checkpoint(0, un_previous)
+    else:
+        first, un_previous = checkpoint
+    expand = [X for X in un_previous if value[X] <= k]
+
+    for i in range(first + 1, n + 1):
+        pointers = np.full(value.layer_size(i), NO_VERTEX, dtype=np.uint8)
+        un = {}
+        for X_v in expand:
+            for v in iterate(V - X_v):
+                X = X_v | v
+                if X not in un:
+                    un[X] = compute_next_un(G, X, v, un_previous[X_v])
+                    if booldim is not None:
+                        booldim[X] = len(un[X])
+
+                if cost:
+                    new_value = len(un_previous[X_v]) + value[X_v]
+                else:
+                    new_value = max(len(un[X]), value[X_v])
+                old_value = value.get(X)
+                if old_value is None or new_value < old_value:
+                    value[X] = new_value
+                    pointers[value.rank(X)] = position[v]
+
+        pointers.tofile(backpointers)
+        if store is not None:
+            store.checkpoint(i, un)
+        value.free_layer(i - 1)
+        un_previous = un
+        expand = [X for X in un if value[X] <= k]
+
+    if V not in value:
+        return False
+    return value[V], backtrack(backpointers, start, value)
+
+
+def backtrack(backpointers, start, ranks):
+    """
+    Return the optimal order of the vertices of ranks, a RankTable, from the back-pointers of
+    all layers, written to backpointers from position start on.
+    """
+    vertices = list(iterate(ranks.vertices))
+    n = len(vertices)
+    order = []
+    X = ranks.vertices
+    offset = start + sum(ranks.layer_size(i) for i in range(n))
+    for i in range(n, 0, -1):
+        backpointers.seek(offset + ranks.rank(X))
+        v = vertices[backpointers.read(1)[0]]
+        order.append(v)
+        X = subtract(X, v)
+        offset -= ranks.layer_size(i - 1)
+    return order[::-1]
+
+
+def layer_dtypes(n, cost):
+    """Return the dtypes of the values and the booldims of stream_layers on n vertices."""
+    maxbooldim = 2 ** (n // 2)
+    return smallest_dtype(n * maxbooldim if cost else maxbooldim), smallest_dtype(maxbooldim)
+
+
+def fill_layer(G, value, booldim, pointers, int i, k, cost, start, stop):
+    """
+    Fill the values, booldims and back-pointers of the sets of size i with colex ranks in
+    [start, stop) from layer i - 1 of the RankTables value and booldim, by the recurrence of
+    stream_layers. Unlike stream_layers, every set pulls from its subsets, so that it is
+    written only once, and its booldim is counted from scratch.
+    The count stops above the bound: a larger booldim only gives values above k, or above
+    k + 1 for the cost, which are not exact in stream_layers either.
+    """
+    position = {v: p for p, v in enumerate(iterate(G.vertices))}
+    bound = k + 1 if cost else k
+    cdef uint128 X, X_v, v, rest
+    for r in range(start, stop):
+        X = value.unrank(i, r)
+        best = None
+        rest = X
+        while rest:
+            v = rest & (~rest + 1)
+            rest ^= v
+            X_v = X ^ v
+            previous = value.get(X_v)
+            if previous is None or previous > k:
+                continue
+            if best is None:
+                booldim_X = compute_booldim(G, X, bound)
+            if cost:
+                new_value = booldim[X_v] + previous
+            else:
+                new_value = max(booldim_X, previous)
+            if best is None or new_value < best:
+                best = new_value
+                best_position = position[v]
+        if best is not None:
+            value[X] = best
+            booldim[X] = booldim_X
+            pointers[r] = best_position
+
+
 def construct_lboolw_decomposition(lboolw, booldim, subset, bound=None):
     if bound == None:
         bound = lboolw[subset]
@@ -126,17 +445,17 @@ def print_un(un):
 
 # Old algos
 
-def linearboolwidthtable(graph):
+def linearboolwidthtable(graph, processes=1):
     """
     bwtable[A] contains the booleanwidth of the subtree of all cuts inside A.
     The cut which produced A itself is thus not included.
     """
-    booldim = booldimtable(graph)
+    booldim = booldimtable(graph, processes)
 
     cdef long v, A, B
 
     # Init table
-    bwtable = {}
+    bwtable = rank_table(graph.vertices, 2 ** (size(graph.vertices) // 2))
     for v in iterate(graph.vertices):
         if graph.neighborhoods[v] == 0L:
             bwtable[v] = 1
@@ -165,8 +484,8 @@ def linear_decomposition(table, booldim, long A):
                 break
 
 
-def linearbooleanwidth(graph):
-    bwtable, booldim = linearboolwidthtable(graph)
+def linearbooleanwidth(graph, processes=1):
+    bwtable, booldim = linearboolwidthtable(graph, processes)
     return (bwtable[graph.vertices],
             #booldim,
             list(linear_decomposition(bwtable, booldim, graph.vertices)))
@@ -204,17 +523,28 @@ def dp_greedy_lbw(bwtable, booldim, long A, int universe):
                 return
 
 
-def greedy_lbw(graph, depth=1):
-    """Assumption: no islets"""
+def greedy_lbw(graph, depth=1, processes=1):
+    """
+    Assumption: no islets
+    With several processes, the booldims of all candidate cuts todo - v of a step are computed
+    in one batch by a BooldimPool, before the candidates are compared.
+    """
+    if processes != 1:
+        from .parallel import BooldimPool
+        with BooldimPool(graph, processes) as pool:
+            return greedy_lbw_steps(graph, depth, pool)
+    return greedy_lbw_steps(graph, depth)
+
+
+def greedy_lbw_steps(graph, depth, pool=None):
     todo = graph.vertices
     width = 0
     decomposition = []
     while size(todo) > 1:
-        _, x = min(
-                (max(compute_booldim(graph, todo - v), greedy_lookahead(graph, todo - v, depth - 1)), v)
-                for v in iterate(todo)
-            )
-        bd = compute_booldim(graph, todo - x)
+        if pool is not None:
+            booldim_cache(graph).prefetch([todo - v for v in iterate(todo)], pool)
+        _, x = greedy_step(graph, todo, depth)
+        bd = cached_booldim(graph, todo - x)
         decomposition.append((bd, (x, todo - x)))
         width = max(bd, width)
         todo -= x
@@ -222,12 +552,29 @@ def greedy_lbw(graph, depth=1):
     return width, decomposition
 
 
-def greedy_lookahead(graph, todo, depth):
+def greedy_step(graph, todo, depth, bound=-1):
+    """
+    Return (width, v) with the smallest v in todo minimizing the maximum of the booldim of
+    todo - v and the lookahead of depth - 1.
+    Widths larger than the best one so far (or than bound, if not negative) are not counted
+    exactly, so if no width is at most bound, some width larger than bound is returned.
+    """
+    best = None
+    for v in iterate(todo):
+        limit = bound if best is None else best[0]
+        width = cached_booldim(graph, todo - v, limit)
+        if limit < 0 or width <= limit:
+            width = max(width, greedy_lookahead(graph, todo - v, depth - 1, limit))
+        if best is None or width < best[0]:
+            best = width, v
+    return best
+
+
+def greedy_lookahead(graph, todo, depth, bound=-1):
     if size(todo) < 2 or depth < 1:
         return 0
 
-    return min(max(compute_booldim(graph, todo - v), greedy_lookahead(graph, todo - v, depth - 1))
-                   for v in iterate(todo))
+    return greedy_step(graph, todo, depth, bound)[0]
 
 
 def relative_neighborhood_lbw(graph, depth=1):
@@ -245,7 +592,7 @@ def relative_neighborhood_lbw(graph, depth=1):
         _, x = min((min(neighborhood_ratio(graph, N_left, v),
                     relative_neighborhood_lookahead(graph, todo - v, depth - 1)), v)
                     for v in iterate(todo))
-        bd = compute_booldim(graph, todo - x)
+        bd = cached_booldim(graph, todo - x)
         decomposition.append((bd, (x, todo - x)))
         width = max(bd, width)
         todo -= x
@@ -1,9 +1,9 @@
 """
 This module contains algorithms for computing the maximal independent sets.
-Note that this code still uses the slow OO Bitset implementation.
+See mis128.pyx for a faster version of mis_count.
 """
 
-from .bitset import BitSet
+from .bitset import iterate, size, subtract
 
 def mis_count_recursion(graph, include, rest, exclude):
     assert include or exclude or rest
@@ -15,15 +15,16 @@ def mis_count_recursion(graph, include, rest, exclude):
         return 1
 
     minsize = float('inf')
-    for u in rest | exclude:
-        size = len(rest & graph(u))
-        if size < minsize:
+    for u in iterate(rest | exclude):
+        s = size(rest & graph(u))
+        if s < minsize:
             pivot = u
-            minsize = size
+            minsize = s
 
     count = 0
-    for v in rest & (graph[pivot]):
-        count += mis_count_recursion(graph, include | v, rest - (graph[v]), exclude - graph(v))
+    for v in iterate(rest & (graph[pivot])):
+        count += mis_count_recursion(graph, include | v, subtract(rest, graph[v]),
+                                     subtract(exclude, graph(v)))
         rest -= v
         exclude |= v
 
@@ -31,7 +32,7 @@ def mis_count_recursion(graph, include, rest, exclude):
 
 def mis_count(graph):
     """Compute all maximal independent sets."""
-    return mis_count_recursion(graph, BitSet(), graph.vertices, BitSet())
+    return mis_count_recursion(graph, 0, graph.vertices, 0)
 
 
 def bron_kerbosch_mc(graph):
@@ -46,12 +47,12 @@ def bron_kerbosch_mc(graph):
             yield include
             return
 
-        for v in rest:
+        for v in iterate(rest):
             yield from recursion(include | v, rest & graph(v), exclude & graph(v))
             rest -= v
             exclude |= v
 
-    yield from recursion(BitSet(), graph.vertices, BitSet())
+    yield from recursion(0, graph.vertices, 0)
 
 
 def bron_kerbosch_mis(graph):
@@ -67,18 +68,18 @@ def bron_kerbosch_mis(graph):
             return
 
         minsize = float('inf')
-        for u in rest | exclude:
-            size = len(rest & graph(u))
-            if size < minsize:
+        for u in iterate(rest | exclude):
+            s = size(rest & graph(u))
+            if s < minsize:
                 pivot = u
-                minsize = size
+                minsize = s
 
-        for v in rest & (graph[pivot]):
-            yield from recursion(include | v, rest - (graph[v]), exclude - graph(v))
+        for v in iterate(rest & (graph[pivot])):
+            yield from recursion(include | v, subtract(rest, graph[v]), subtract(exclude, graph(v)))
             rest -= v
             exclude |= v
 
-    yield from recursion(BitSet(), graph.vertices, BitSet())
+    yield from recursion(0, graph.vertices, 0)
 
 
 #
@@ -87,8 +88,8 @@ def bron_kerbosch_mis(graph):
 
 
 from random import randint
-from graph import Graph
-from bipartite import Bipartite
+from .graph import Graph
+from .bipartite import Bipartite
 
 
 def mul_abs(x):
@@ -132,9 +133,7 @@ def mis_bipartite_complement():
         nr_mis = len(mis)
         # print(mis)
 
-        vertices = set(graph.vertices)
-        edges = set((v, w) for v in graph.vertices for w in graph.vertices)
-        compl_mis = [vertices.difference(s) for s in mis]
+        compl_mis = [subtract(graph.vertices, s) for s in mis]
         # print(compl_mis)
 
         mis_compl = list(bron_kerbosch_mis(bipartite_compl))
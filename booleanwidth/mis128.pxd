@@ -0,0 +1,4 @@
+from .bitset128 cimport uint128
+
+
+cdef long long recursion_array(uint128 *N, uint128 rest, uint128 excludes)
@@ -1,9 +1,19 @@
-"""This module contains algorithms for computing the maximal independent sets."""
+"""
+This module contains algorithms for computing the maximal independent sets.
+
+mis_count_bounded counts them without enumerating all of them one by one: it splits the
+remaining graph into connected components and multiplies their counts, memoizes the counts
+of subproblems, and stops as soon as the count exceeds a given bound.
+"""
 
 from .bitset128 import iterate, size
 from .bitset128 cimport uint128
+from .graph128 cimport Neighborhoods
+
+cdef extern int __builtin_popcountll(unsigned long long x)
+cdef extern int __builtin_ctzll(unsigned long long x)
 
-cpdef int recursion(N, uint128 includes, uint128 rest, uint128 excludes):
+cpdef long long recursion(N, uint128 includes, uint128 rest, uint128 excludes):
     if not excludes and not rest:
         return 1
 
@@ -15,7 +25,7 @@ cpdef int recursion(N, uint128 includes, uint128 rest, uint128 excludes):
             pivot = u
             minsize = s
 
-    cdef int count = 0
+    cdef long long count = 0
     for v in iterate(rest & (N[pivot] | pivot)):
         count += recursion(N,
                 includes | v,
@@ -27,8 +37,161 @@ cpdef int recursion(N, uint128 includes, uint128 rest, uint128 excludes):
 
     return count
 
+
+cdef long long recursion_array(uint128 *N, uint128 rest, uint128 excludes):
+    """Same as recursion, but with neighborhoods indexed by vertex position."""
+    if not excludes and not rest:
+        return 1
+
+    cdef uint128 u, v, candidates, pivot = 0
+    cdef int s, minsize = 999999
+
+    candidates = rest | excludes
+    while candidates:
+        u = candidates & (~candidates + 1)
+        s = __builtin_popcountll(rest & N[__builtin_ctzll(u)])
+        if s < minsize:
+            pivot = u
+            minsize = s
+        candidates ^= u
+
+    cdef long long count = 0
+    candidates = rest & (N[__builtin_ctzll(pivot)] | pivot)
+    while candidates:
+        v = candidates & (~candidates + 1)
+        count += recursion_array(N,
+                rest - (rest & (N[__builtin_ctzll(v)] | v)),
+                excludes - (excludes & N[__builtin_ctzll(v)])
+                )
+        rest -= v
+        excludes |= v
+        candidates ^= v
+
+    return count
+
 cpdef mis_count(N, uint128 vertices):
     """Compute all maximal independent sets."""
+    if isinstance(N, Neighborhoods):
+        return recursion_array((<Neighborhoods>N).N, vertices, 0L)
     return recursion(N, 0L, vertices, 0L)
 
 
+# Bound which is never exceeded, leaving room for bound + 1
+UNBOUNDED = 1LL << 62
+
+
+cdef uint128 component_of(uint128 *N, uint128 vertices, uint128 root):
+    """Return the component containing root of the subgraph induced by vertices."""
+    cdef uint128 done = root, front = root, reached
+    while front:
+        reached = 0
+        while front:
+            reached |= N[__builtin_ctzll(front)]
+            front &= front - 1
+        front = reached & vertices & ~done
+        done |= front
+    return done
+
+
+cdef long long count_bounded(uint128 *N, uint128 rest, uint128 excludes, long long bound,
+                             dict memo) except -1:
+    """
+    Count the maximal independent sets which extend the current one by vertices of rest and
+    dominate excludes. Return bound + 1 if there are more than bound.
+    The memo maps (rest, excludes) to the count, or to -L if the count is known to be >= L.
+    """
+    if not rest:
+        return 0 if excludes else 1
+
+    key = (rest, excludes)
+    known = memo.get(key)
+    if known is not None:
+        if known >= 0:
+            return known if known <= bound else bound + 1
+        if bound < -known:
+            return bound + 1
+
+    cdef uint128 vertices = rest | excludes
+    cdef long long result
+    if component_of(N, vertices, vertices & (~vertices + 1)) != vertices:
+        result = count_components(N, rest, excludes, bound, memo)
+    else:
+        result = count_branches(N, rest, excludes, bound, memo)
+
+    memo[key] = result if result <= bound else -(bound + 1)
+    return result
+
+
+cdef long long count_components(uint128 *N, uint128 rest, uint128 excludes, long long bound,
+                                dict memo) except -1:
+    """Multiply the counts of the components, see count_bounded."""
+    cdef uint128 vertices = rest | excludes, component
+    cdef long long count, product = 1
+    cdef bint exceeded = False
+
+    while vertices:
+        component = component_of(N, vertices, vertices & (~vertices + 1))
+        vertices &= ~component
+        if exceeded:
+            # The product is too large, unless some component has no solutions at all
+            count = count_bounded(N, rest & component, excludes & component, 0, memo)
+        else:
+            count = count_bounded(N, rest & component, excludes & component, bound // product,
+                                  memo)
+            if count > bound // product:
+                exceeded = True
+            else:
+                product *= count
+        if count == 0:
+            return 0
+
+    return bound + 1 if exceeded else product
+
+
+cdef long long count_branches(uint128 *N, uint128 rest, uint128 excludes, long long bound,
+                              dict memo) except -1:
+    """Branch on the vertices around a pivot, like recursion_array, see count_bounded."""
+    cdef uint128 u, v, candidates, pivot = 0
+    cdef int s, minsize = 999999
+
+    candidates = rest | excludes
+    while candidates:
+        u = candidates & (~candidates + 1)
+        s = __builtin_popcountll(rest & N[__builtin_ctzll(u)])
+        if s < minsize:
+            pivot = u
+            minsize = s
+        candidates ^= u
+
+    cdef long long total = 0
+    candidates = rest & (N[__builtin_ctzll(pivot)] | pivot)
+    while candidates:
+        v = candidates & (~candidates + 1)
+        total += count_bounded(N,
+                rest & ~(N[__builtin_ctzll(v)] | v),
+                excludes & ~N[__builtin_ctzll(v)],
+                bound - total, memo)
+        if total > bound:
+            return bound + 1
+        rest -= v
+        excludes |= v
+        candidates ^= v
+
+    return total
+
+
+cpdef long long mis_count_bounded(N, uint128 vertices, long long bound=-1) except -1:
+    """
+    Count the maximal independent sets of the subgraph induced by vertices.
+    If bound is not negative and the count exceeds it, return bound + 1 instead.
+    """
+    cdef Neighborhoods array
+    if isinstance(N, Neighborhoods):
+        array = N
+    else:
+        array = Neighborhoods(int(vertices).bit_length())
+        for v in iterate(vertices):
+            array[v] = N[v] & vertices
+    if bound < 0 or bound >= UNBOUNDED:
+        bound = UNBOUNDED
+    return count_bounded(array.N, vertices, 0L, bound, {})
@@ -0,0 +1,325 @@
+"""This module contains algorithms for counting maximal independent sets of graphs with up to
+512 vertices."""
+
+from libc.stdlib cimport malloc, calloc, free
+from libc.math cimport sqrt
+from statistics import NormalDist
+from .bitset512 cimport (bitset512, word, from_int, clear, is_empty, next_index, set_bit,
+                         clear_bit, test_bit, intersect, join, subtract, intersection_size,
+                         index, equal, size, nwords_for, WORDSIZE)
+from .graph512 cimport Graph512
+from . import bitset
+
+
+cdef long long recursion(bitset512 *N, bitset512 rest, bitset512 excludes, int nwords):
+    if is_empty(&excludes, nwords) and is_empty(&rest, nwords):
+        return 1
+
+    cdef int end = nwords * WORDSIZE
+    cdef int u, v, s, pivot = 0, minsize = 999999
+    cdef bitset512 candidates, closed, newrest, newexcludes
+
+    join(&candidates, &rest, &excludes, nwords)
+    u = next_index(&candidates, 0, nwords)
+    while u < end:
+        s = intersection_size(&rest, &N[u], nwords)
+        if s < minsize:
+            pivot = u
+            minsize = s
+        u = next_index(&candidates, u + 1, nwords)
+
+    closed = N[pivot]
+    set_bit(&closed, pivot)
+    intersect(&candidates, &rest, &closed, nwords)
+
+    cdef long long count = 0
+    v = next_index(&candidates, 0, nwords)
+    while v < end:
+        closed = N[v]
+        set_bit(&closed, v)
+        subtract(&newrest, &rest, &closed, nwords)
+        subtract(&newexcludes, &excludes, &N[v], nwords)
+        count += recursion(N, newrest, newexcludes, nwords)
+        clear_bit(&rest, v)
+        set_bit(&excludes, v)
+        v = next_index(&candidates, v + 1, nwords)
+
+    return count
+
+
+cpdef long long mis_count(Graph512 graph, vertices):
+    """Count the maximal independent sets of the subgraph induced by vertices."""
+    cdef bitset512 rest, excludes
+    from_int(&rest, vertices, graph.nwords)
+    clear(&excludes, graph.nwords)
+    return recursion(graph.N, rest, excludes, graph.nwords)
+
+
+# Bound which is never exceeded, leaving room for bound + 1
+UNBOUNDED = 1LL << 62
+
+
+cdef void component_of(bitset512 *result, bitset512 *N, bitset512 *vertices, int root,
+                       int nwords):
+    """Store the component containing root of the subgraph induced by vertices in result."""
+    cdef int end = nwords * WORDSIZE
+    cdef int u
+    cdef bitset512 front, reached
+    clear(result, nwords)
+    clear(&front, nwords)
+    set_bit(result, root)
+    set_bit(&front, root)
+    while not is_empty(&front, nwords):
+        clear(&reached, nwords)
+        u = next_index(&front, 0, nwords)
+        while u < end:
+            join(&reached, &reached, &N[u], nwords)
+            u = next_index(&front, u + 1, nwords)
+        intersect(&reached, &reached, vertices, nwords)
+        subtract(&front, &reached, result, nwords)
+        join(result, result, &front, nwords)
+
+
+cdef long long count_bounded(bitset512 *N, bitset512 rest, bitset512 excludes, long long bound,
+                             dict memo, int nwords) except -1:
+    """
+    Count the maximal independent sets which extend the current one by vertices of rest and
+    dominate excludes. Return bound + 1 if there are more than bound.
+    The memo maps (rest, excludes) to the count, or to -L if the count is known to be >= L.
+    """
+    if is_empty(&rest, nwords):
+        return 0 if not is_empty(&excludes, nwords) else 1
+
+    key = ((<char *>rest.words)[:nwords * sizeof(word)]
+           + (<char *>excludes.words)[:nwords * sizeof(word)])
+    known = memo.get(key)
+    if known is not None:
+        if known >= 0:
+            return known if known <= bound else bound + 1
+        if bound < -known:
+            return bound + 1
+
+    cdef bitset512 vertices, component
+    cdef long long result
+    join(&vertices, &rest, &excludes, nwords)
+    component_of(&component, N, &vertices, index(&vertices, nwords), nwords)
+    if not equal(&component, &vertices, nwords):
+        result = count_components(N, rest, excludes, vertices, bound, memo, nwords)
+    else:
+        result = count_branches(N, rest, excludes, vertices, bound, memo, nwords)
+
+    memo[key] = result if result <= bound else -(bound + 1)
+    return result
+
+
+cdef long long count_components(bitset512 *N, bitset512 rest, bitset512 excludes,
+                                bitset512 vertices, long long bound, dict memo,
+                                int nwords) except -1:
+    """Multiply the counts of the components, see count_bounded."""
+    cdef bitset512 component, subrest, subexcludes
+    cdef long long count, product = 1
+    cdef bint exceeded = False
+
+    while not is_empty(&vertices, nwords):
+        component_of(&component, N, &vertices, index(&vertices, nwords), nwords)
+        subtract(&vertices, &vertices, &component, nwords)
+        intersect(&subrest, &rest, &component, nwords)
+        intersect(&subexcludes, &excludes, &component, nwords)
+        if exceeded:
+            # The product is too large, unless some component has no solutions at all
+            count = count_bounded(N, subrest, subexcludes, 0, memo, nwords)
+        else:
+            count = count_bounded(N, subrest, subexcludes, bound // product, memo, nwords)
+            if count > bound // product:
+                exceeded = True
+            else:
+                product *= count
+        if count == 0:
+            return 0
+
+    return bound + 1 if exceeded else product
+
+
+cdef long long count_branches(bitset512 *N, bitset512 rest, bitset512 excludes,
+                              bitset512 vertices, long long bound, dict memo,
+                              int nwords) except -1:
+    """Branch on the vertices around a pivot, like recursion, see count_bounded."""
+    cdef int end = nwords * WORDSIZE
+    cdef int u, v, s, pivot = 0, minsize = 999999
+    cdef bitset512 candidates, closed, newrest, newexcludes
+
+    u = next_index(&vertices, 0, nwords)
+    while u < end:
+        s = intersection_size(&rest, &N[u], nwords)
+        if s < minsize:
+            pivot = u
+            minsize = s
+        u = next_index(&vertices, u + 1, nwords)
+
+    closed = N[pivot]
+    set_bit(&closed, pivot)
+    intersect(&candidates, &rest, &closed, nwords)
+
+    cdef long long total = 0
+    v = next_index(&candidates, 0, nwords)
+    while v < end:
+        closed = N[v]
+        set_bit(&closed, v)
+        subtract(&newrest, &rest, &closed, nwords)
+        subtract(&newexcludes, &excludes, &N[v], nwords)
+        total += count_bounded(N, newrest, newexcludes, bound - total, memo, nwords)
+        if total > bound:
+            return bound + 1
+        clear_bit(&rest, v)
+        set_bit(&excludes, v)
+        v = next_index(&candidates, v + 1, nwords)
+
+    return total
+
+
+cpdef long long mis_count_bounded(Graph512 graph, vertices, long long bound=-1) except -1:
+    """
+    Count the maximal independent sets of the subgraph induced by vertices.
+    If bound is not negative and the count exceeds it, return bound + 1 instead.
+    """
+    cdef bitset512 rest, excludes
+    from_int(&rest, vertices, graph.nwords)
+    clear(&excludes, graph.nwords)
+    if bound < 0 or bound >= UNBOUNDED:
+        bound = UNBOUNDED
+    return count_bounded(graph.N, rest, excludes, bound, {}, graph.nwords)
+
+
+cpdef long long cut_mis_count(Graph512 graph, subset, long long bound=-1) except -1:
+    """
+    Count the maximal independent sets of the bipartite graph of the cut (subset, V - subset).
+    If bound is not negative and the count exceeds it, return bound + 1 instead.
+    """
+    cdef int nwords = graph.nwords
+    cdef int end = nwords * WORDSIZE
+    cdef int v
+    cdef bitset512 A, complement, excludes
+    cdef bitset512 *N = <bitset512 *>malloc(max(graph.length, 1) * sizeof(bitset512))
+    if N == NULL:
+        raise MemoryError
+
+    try:
+        from_int(&A, subset, nwords)
+        subtract(&complement, &graph.V, &A, nwords)
+
+        v = next_index(&graph.V, 0, nwords)
+        while v < end:
+            if test_bit(&A, v):
+                intersect(&N[v], &graph.N[v], &complement, nwords)
+            else:
+                intersect(&N[v], &graph.N[v], &A, nwords)
+            v = next_index(&graph.V, v + 1, nwords)
+
+        clear(&excludes, nwords)
+        if bound < 0 or bound >= UNBOUNDED:
+            bound = UNBOUNDED
+        return count_bounded(N, graph.V, excludes, bound, {}, nwords)
+    finally:
+        free(N)
+
+
+# Number of samples before the error of an estimate is judged
+MINSAMPLES = 30
+
+
+cdef inline unsigned long long next_random(unsigned long long *state):
+    """Return the next number of a xorshift64* generator."""
+    state[0] ^= state[0] >> 12
+    state[0] ^= state[0] << 25
+    state[0] ^= state[0] >> 27
+    return state[0] * 2685821657736338717ULL
+
+
+cdef double sample_leaf(bitset512 *N, bitset512 rest, bitset512 excludes, int nwords,
+                        unsigned long long *state):
+    """
+    Follow a random path in the branching tree of recursion, choosing uniformly among the
+    branches at every node. Return the product of the numbers of branches along the path if it
+    ends in a maximal independent set, and 0 otherwise. This is an unbiased estimate of the
+    number of maximal independent sets (Knuth's estimator).
+    """
+    cdef int end = nwords * WORDSIZE
+    cdef int u, v, s, k, i, pivot, minsize
+    cdef double weight = 1
+    cdef bitset512 candidates, closed
+
+    while not is_empty(&rest, nwords):
+        pivot = 0
+        minsize = 999999
+        join(&candidates, &rest, &excludes, nwords)
+        u = next_index(&candidates, 0, nwords)
+        while u < end:
+            s = intersection_size(&rest, &N[u], nwords)
+            if s < minsize:
+                pivot = u
+                minsize = s
+            u = next_index(&candidates, u + 1, nwords)
+
+        closed = N[pivot]
+        set_bit(&closed, pivot)
+        intersect(&candidates, &rest, &closed, nwords)
+        k = size(&candidates, nwords)
+        if k == 0:
+            return 0
+
+        # In the i-th branch, the earlier candidates are excluded
+        i = next_random(state) % k
+        v = next_index(&candidates, 0, nwords)
+        while i > 0:
+            clear_bit(&rest, v)
+            set_bit(&excludes, v)
+            v = next_index(&candidates, v + 1, nwords)
+            i -= 1
+        closed = N[v]
+        set_bit(&closed, v)
+        subtract(&rest, &rest, &closed, nwords)
+        subtract(&excludes, &excludes, &N[v], nwords)
+        weight *= k
+
+    return weight if is_empty(&excludes, nwords) else 0
+
+
+def estimate_cut_mis_count(neighborhoods, left, right, double epsilon=0.1, double delta=0.05,
+                           int maxsamples=10000, unsigned long long seed=1):
+    """
+    Estimate the number of maximal independent sets of the bipartite graph of the cut
+    (left, right), i.e. its booldim, by averaging samples of sample_leaf.
+    Sampling stops as soon as the relative error is at most epsilon with confidence 1 - delta,
+    judged from the sample variance, or after maxsamples samples.
+    Works for up to 512 vertex positions, without counting all sets.
+    """
+    cdef int length = bitset.domain(left | right)
+    cdef int nwords = nwords_for(length)
+    cdef int m = 0
+    cdef double x, mean = 0, squares = 0, delta_mean
+    cdef double z = NormalDist().inv_cdf(1 - delta / 2)
+    cdef unsigned long long state = seed if seed else 1
+    cdef bitset512 rest, excludes
+    cdef bitset512 *N = <bitset512 *>calloc(max(length, 1), sizeof(bitset512))
+    if N == NULL:
+        raise MemoryError
+
+    try:
+        for v in bitset.iterate(left):
+            from_int(&N[bitset.index(v)], neighborhoods[v] & right, nwords)
+        for v in bitset.iterate(right):
+            from_int(&N[bitset.index(v)], neighborhoods[v] & left, nwords)
+        from_int(&rest, left | right, nwords)
+        clear(&excludes, nwords)
+
+        while m < maxsamples:
+            x = sample_leaf(N, rest, excludes, nwords, &state)
+            m += 1
+            delta_mean = x - mean
+            mean += delta_mean / m
+            squares += delta_mean * (x - mean)
+            if m >= MINSAMPLES and z * sqrt(squares / (m - 1) / m) <= epsilon * mean:
+                break
+        return mean
+    finally:
+        free(N)
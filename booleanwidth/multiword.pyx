@@ -0,0 +1,21 @@
+"""
+This module exposes the multi-word kernels of bitset512.pxd on python ints,
+such that they can be used as a bitset backend (see backend.py).
+Converting a python int to words costs more than a single int operation, so only iterate
+converts, once per bitset, and then walks the words. The other functions, which python ints
+already do in one call, are shared with bitset.py.
+"""
+from .bitset512 cimport bitset512, nwords_for, from_int, next_index, WORDSIZE
+from .bitset import (index, domain, size, bit, bits, universe, subtract, contains, disjoint,
+                     invert, join, first, subsets, subsets_of_size, subsets_by_size, tostring)
+
+
+def iterate(x):
+    cdef bitset512 b
+    cdef int nwords = nwords_for(int.bit_length(x))
+    cdef int i
+    from_int(&b, x, nwords)
+    i = next_index(&b, 0, nwords)
+    while i < nwords * WORDSIZE:
+        yield (<object>1) << i
+        i = next_index(&b, i + 1, nwords)
@@ -0,0 +1,259 @@
+"""
+Computing the booldims of many cuts with a pool of worker processes.
+The graph is copied once into shared memory, as the neighborhood words of dgf.py, from which
+every worker rebuilds it when it starts. Tasks then only contain cut bitsets, or ranges of the
+Gray code walk of a BooldimTable, whose values the workers write into shared memory.
+
+A LayerPool solves the layers of the exact linear dynamic programming of stream_layers in the
+same way: every layer is split into ranges of colex ranks, filled from the previous layer in
+shared memory.
+"""
+
+import os
+import tempfile
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from . import dgf
+from .backend import domain, iterate, size
+from .dynamicprogramming import compute_booldim, fill_booldims
+from .lboolw import NO_VERTEX, fill_layer, backtrack, layer_dtypes
+from .ranktable import RankTable, binomial
+from .relabel import solve_relabeled
+
+
+# Number of tasks per worker process, to balance the load
+TASKS_PER_PROCESS = 8
+
+# Layers with fewer sets are filled by the main process, which is faster than handing them out
+PARALLEL_MIN_LAYER = 1000
+
+# stream_layers only uses a LayerPool if its widest layer has at least this many sets. A set
+# costs two to three times as much in fill_layer as in the serial recurrence, so below this
+# the serial recurrence wins even with several cores, see benchmark.stream_layers_processes.
+PARALLEL_MIN_SETS = 50000
+
+# State of a worker process, set by start_worker
+worker_graph = None
+worker_values = None
+worker_block = None
+worker_blocks = None
+
+
+def start_worker(graphname, shape, valuesname, length):
+    """Rebuild the graph from shared memory, and attach to the shared values, if any."""
+    global worker_graph, worker_values, worker_block
+    block = shared_memory.SharedMemory(name=graphname)
+    worker_graph = dgf.tograph(block.buf, shape[0] - 1, shape[1])
+    block.close()
+    if valuesname is not None:
+        worker_block = shared_memory.SharedMemory(name=valuesname)
+        worker_values = np.ndarray(length, dtype=np.uint32, buffer=worker_block.buf)
+
+
+def start_layer_worker(graphname, shape, blocknames):
+    """Rebuild the graph from shared memory, and attach to the shared layers of a LayerPool."""
+    global worker_blocks
+    start_worker(graphname, shape, None, 0)
+    worker_blocks = [shared_memory.SharedMemory(name=name) for name in blocknames]
+
+
+def booldims_task(subsets):
+    return [compute_booldim(worker_graph, A) for A in subsets]
+
+
+def fill_task(start, stop):
+    fill_booldims(worker_graph, worker_values, start, stop)
+
+
+def layer_task(i, k, cost, dtypes, start, stop):
+    value, booldim, pointers = layer_tables(worker_blocks, worker_graph.vertices, i, dtypes)
+    fill_layer(worker_graph, value, booldim, pointers, i, k, cost, start, stop)
+
+
+def split(length, parts):
+    """Return the (start, stop) pairs of splitting range(length) into parts nearly equal ranges."""
+    bounds = [length * i // parts for i in range(parts + 1)]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+
+
+class BooldimPool:
+
+    """
+    Pool of worker processes holding a copy of a graph, to compute the booldims of its cuts.
+    To fill a BooldimTable, tablesize is the number of its values, which are then shared too.
+    Use it as a context manager, or call close when done.
+    """
+
+    def __init__(self, graph, processes=None, tablesize=0):
+        self.processes = processes or os.cpu_count()
+        self.tablesize = tablesize
+        words = dgf.graphwords(graph)
+        self.graphblock = shared_memory.SharedMemory(create=True, size=max(words.nbytes, 1))
+        np.ndarray(words.shape, dtype=dgf.WORD, buffer=self.graphblock.buf)[:] = words
+        self.valuesblock = None
+        valuesname = None
+        if tablesize:
+            self.valuesblock = shared_memory.SharedMemory(create=True, size=4 * tablesize)
+            valuesname = self.valuesblock.name
+        self.pool = Pool(self.processes, start_worker,
+                         (self.graphblock.name, words.shape, valuesname, tablesize))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for block in (self.graphblock, self.valuesblock):
+            if block is not None:
+                block.close()
+                block.unlink()
+
+    def booldims(self, subsets):
+        """Return the booldims of the cuts (A, V - A) for all A in subsets, in order."""
+        subsets = list(subsets)
+        chunks = [subsets[start:stop]
+                  for start, stop in split(len(subsets), self.processes * TASKS_PER_PROCESS)]
+        return [bd for chunk in self.pool.map(booldims_task, chunks) for bd in chunk]
+
+    def fill_booldims(self, values):
+        """Fill values, the array of a BooldimTable of the graph, see fill_booldims."""
+        self.pool.starmap(fill_task, split(self.tablesize, self.processes * TASKS_PER_PROCESS))
+        np.asarray(values)[:] = np.ndarray(self.tablesize, dtype=np.uint32,
+                                           buffer=self.valuesblock.buf)
+
+
+def batch_booldims(graph, subsets, processes=None, pool=None):
+    """
+    Return the booldims of the cuts (A, V - A) of graph for all A in subsets, in order.
+    If pool, a BooldimPool of graph, is given, it is used instead of starting a new one.
+    """
+    if pool is not None:
+        return pool.booldims(subsets)
+    with BooldimPool(graph, processes) as pool:
+        return pool.booldims(subsets)
+
+
+def parallel_fill_booldims(graph, values, processes=None):
+    """Fill values, the array of a BooldimTable of graph, using a pool of processes."""
+    with BooldimPool(graph, processes, len(values)) as pool:
+        pool.fill_booldims(values)
+
+
+def layer_tables(blocks, vertices, i, dtypes):
+    """
+    Return the RankTables of values and booldims of the subsets of vertices, with layers i and
+    i - 1 in their slots i % 2 and (i - 1) % 2 of the shared blocks of a LayerPool, and the
+    array of back-pointers of layer i.
+    """
+    value = RankTable(vertices, dtypes[0])
+    booldim = RankTable(vertices, dtypes[1])
+    for layer in range(max(i - 1, 0), i + 1):
+        length = value.layer_size(layer)
+        value.set_layer(layer, np.ndarray(length, dtype=value.dtype,
+                                          buffer=blocks[layer % 2].buf))
+        booldim.set_layer(layer, np.ndarray(length, dtype=booldim.dtype,
+                                            buffer=blocks[2 + layer % 2].buf))
+    pointers = np.ndarray(value.layer_size(i), dtype=np.uint8, buffer=blocks[4].buf)
+    return value, booldim, pointers
+
+
+def use_layer_pool(n, processes):
+    """Return whether stream_layers on n vertices should use a LayerPool of processes workers."""
+    return (processes or os.cpu_count()) > 1 and binomial(n, n // 2) >= PARALLEL_MIN_SETS
+
+
+class LayerPool:
+
+    """
+    Pool of worker processes holding a copy of a graph, to fill the layers of stream_layers.
+    The values and booldims of two consecutive layers, in alternating slots, and the
+    back-pointers of the current layer are shared. Every set of a layer is filled by exactly
+    one worker, from the previous layer, so no locks are needed.
+    Use it as a context manager, or call close when done.
+    """
+
+    def __init__(self, graph, dtypes, processes=None):
+        self.processes = processes or os.cpu_count()
+        self.dtypes = dtypes
+        self.graph = graph
+        self.vertices = graph.vertices
+        self.n = size(graph.vertices)
+        words = dgf.graphwords(graph)
+        self.graphblock = shared_memory.SharedMemory(create=True, size=max(words.nbytes, 1))
+        np.ndarray(words.shape, dtype=dgf.WORD, buffer=self.graphblock.buf)[:] = words
+        widest = binomial(self.n, self.n // 2)
+        itemsizes = [np.dtype(dtype).itemsize for dtype in dtypes for slot in range(2)] + [1]
+        self.blocks = [shared_memory.SharedMemory(create=True, size=widest * itemsize)
+                       for itemsize in itemsizes]
+        self.pool = Pool(self.processes, start_layer_worker,
+                         (self.graphblock.name, words.shape, [block.name for block in self.blocks]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        for block in [self.graphblock] + self.blocks:
+            block.close()
+            block.unlink()
+
+    def tables(self, i):
+        """Return layer_tables of layer i, with all its sets cleared."""
+        value, booldim, pointers = layer_tables(self.blocks, self.vertices, i, self.dtypes)
+        value.layer(i)[:] = value.missing
+        booldim.layer(i)[:] = booldim.missing
+        pointers[:] = NO_VERTEX
+        return value, booldim, pointers
+
+    def fill_layer(self, i, k, cost):
+        """
+        Fill layer i from layer i - 1, see fill_layer in lboolw.pyx. Layers smaller than
+        PARALLEL_MIN_LAYER are filled by the calling process.
+        """
+        length = binomial(self.n, i)
+        if length < PARALLEL_MIN_LAYER:
+            value, booldim, pointers = layer_tables(self.blocks, self.vertices, i, self.dtypes)
+            fill_layer(self.graph, value, booldim, pointers, i, k, cost, 0, length)
+            return
+        ranges = split(length, self.processes * TASKS_PER_PROCESS)
+        self.pool.starmap(layer_task, [(i, k, cost, self.dtypes, start, stop)
+                                       for start, stop in ranges])
+
+
+def parallel_stream_layers(graph, k, cost, backpointers=None, processes=None):
+    """
+    Return stream_layers(graph, k, cost, backpointers), filling every layer with a LayerPool.
+    Like stream_layers, a graph with gaps between its positions is solved on positions 0..n-1.
+    """
+    if domain(graph.vertices) > size(graph.vertices):
+        return solve_relabeled(graph, list(iterate(graph.vertices)), lambda H: (
+            parallel_stream_layers(H, k, cost, backpointers, processes)))
+    V = graph.vertices
+    if backpointers is None:
+        backpointers = tempfile.TemporaryFile()
+    start = backpointers.tell()
+    with LayerPool(graph, layer_dtypes(size(V), cost), processes) as pool:
+        for i in range(pool.n + 1):
+            value, booldim, pointers = pool.tables(i)
+            if i == 0:
+                value[0] = 0
+                booldim[0] = 1
+            else:
+                pool.fill_layer(i, k, cost)
+            pointers.tofile(backpointers)
+        result = value.get(V)
+        # Release the shared blocks before they are closed
+        del value, booldim, pointers
+    if result is None:
+        return False
+    return result, backtrack(backpointers, start, RankTable(V))
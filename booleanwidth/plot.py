@@ -1,6 +1,7 @@
 from PIL import Image, ImageDraw, ImageFont
 import math
-from .bitset import BitSet, index
+from .bitset import iterate, index
+from . import bitset
 
 from graphviz import Graph
 
@@ -30,18 +31,18 @@ def plot_circle(graph, im=None, color=128):
 
     radius = min(size) / 2 - margin
     vertexcoords = {}
-    nr_vertices = len(graph.vertices)
-    for i, v in enumerate(sorted(graph.vertices, key=lambda v: v.identifier)):
+    nr_vertices = bitset.size(graph.vertices)
+    for i, v in enumerate(iterate(graph.vertices)):
         r = i * 2 * math.pi / nr_vertices
-        vertexcoords[BitSet(v)] = (radius * (1 + math.cos(r)) + margin,
-                                   radius * (1 + math.sin(r)) + margin)
+        vertexcoords[v] = (radius * (1 + math.cos(r)) + margin,
+                           radius * (1 + math.sin(r)) + margin)
 
-    for b, v in graph.vertices.items():
-        coords = vertexcoords[b]
-        draw_vertex(draw, graph.vertices[b], coords, color)
+    for v in iterate(graph.vertices):
+        coords = vertexcoords[v]
+        draw_vertex(draw, v, coords, color)
 
-        for w in v.neighbors:
-            draw.line([vertexcoords[b], vertexcoords[w]],
+        for w in iterate(graph(v)):
+            draw.line([vertexcoords[v], vertexcoords[w]],
                       fill=color, width=1)
 
     return im
@@ -62,28 +63,28 @@ def plot_bipartite(graph, im=None, color=128):
     # The vertex is drawn in the center of that interval
     xcoord = margin
     vertexcoords1 = {}
-    interval_length = size[1] / len(graph.group1)
-    for i, v in enumerate(graph.group1):
+    interval_length = size[1] / bitset.size(graph.group1)
+    for i, v in enumerate(iterate(graph.group1)):
         ycoord = i * interval_length + interval_length / 2
         vertexcoords1[v] = (xcoord, ycoord)
 
     vertexcoords2 = {}
     xcoord = size[0] - margin
-    interval_length = size[1] / len(graph.group2)
-    for i, v in enumerate(graph.group2):
+    interval_length = size[1] / bitset.size(graph.group2)
+    for i, v in enumerate(iterate(graph.group2)):
         ycoord = i * interval_length + interval_length / 2
         vertexcoords2[v] = (xcoord, ycoord)
 
-    for v in graph.group1:
+    for v in iterate(graph.group1):
         coords = vertexcoords1[v]
         draw_vertex(draw, v, coords, color)
 
-    for v in graph.group2:
+    for v in iterate(graph.group2):
         coords = vertexcoords2[v]
         draw_vertex(draw, v, coords, color)
 
-    for v in graph.group1:
-        for w in graph(v):
+    for v in iterate(graph.group1):
+        for w in iterate(graph(v)):
             try:
                 draw.line([vertexcoords1[v], vertexcoords2[w]], fill=color)
             except KeyError:
@@ -101,4 +102,4 @@ def draw_vertex(draw, vertex, coords, color=128):
     draw.ellipse(box, fill=color)
 
     font = ImageFont.truetype("resources/FreeMono.ttf", 30)
-    draw.text(lowercoords, str(vertex.identifier), fill=color, font=font)
+    draw.text(lowercoords, str(index(vertex)), fill=color, font=font)
@@ -0,0 +1,79 @@
+"""
+Random graph generators built on numpy.
+Edges are drawn as indices into the list of candidate vertex pairs and the neighborhoods are
+assembled in bulk from the resulting edge array (see dgf.towords).
+All generators take a seed, which may be anything accepted by numpy.random.default_rng,
+including a Generator, so a whole corpus can be generated reproducibly from one seed.
+"""
+
+import numpy as np
+
+from .dgf import towords, fromwords
+
+# Number of pair indices drawn at once when skipping through the pairs geometrically
+CHUNKSIZE = 1 << 16
+
+
+def gnp_indices(total, p, rng):
+    """
+    Return the sorted indices of the pairs (out of total) that are chosen with probability p.
+    Instead of a coin flip per pair, we draw the geometrically distributed gaps between chosen
+    pairs, so the work is linear in the number of chosen pairs.
+    """
+    if p <= 0 or total == 0:
+        return np.zeros(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(total, dtype=np.int64)
+
+    chunks = []
+    last = -1
+    while last < total:
+        expected = int((total - last) * p * 1.1) + 16
+        indices = last + np.cumsum(rng.geometric(p, min(expected, CHUNKSIZE)))
+        chunks.append(indices[indices < total])
+        last = int(indices[-1])
+    return np.concatenate(chunks)
+
+
+def gnm_indices(total, m, rng):
+    """Return the sorted indices of m distinct pairs out of total, chosen uniformly."""
+    if not 0 <= m <= total:
+        raise ValueError('Cannot choose {} out of {} pairs'.format(m, total))
+    return np.sort(rng.choice(total, m, replace=False)).astype(np.int64)
+
+
+def pairs(indices):
+    """Return the pairs (v, w) with w < v at given indices of the lexicographic pair list."""
+    v = ((1 + np.sqrt(1 + 8 * indices.astype(np.float64))) / 2).astype(np.int64)
+    # Repair rounding errors of the square root
+    v -= v * (v - 1) // 2 > indices
+    v += (v + 1) * v // 2 <= indices
+    return np.stack([v, indices - v * (v - 1) // 2], axis=1)
+
+
+def random_edges(nr_vertices, nr_edges, rng):
+    """
+    Return the edges of a G(n, p) graph if nr_edges < 1, taking p = nr_edges,
+    or else of a G(n, m) graph, taking m = nr_edges.
+    """
+    total = nr_vertices * (nr_vertices - 1) // 2
+    if nr_edges < 1:
+        return pairs(gnp_indices(total, nr_edges, rng))
+    return pairs(gnm_indices(total, int(nr_edges), rng))
+
+
+def random_bipartite_edges(size1, size2, nr_edges, rng):
+    """Like random_edges, between the groups range(size1) and range(size1, size1 + size2)."""
+    total = size1 * size2
+    if nr_edges < 1:
+        indices = gnp_indices(total, nr_edges, rng)
+    else:
+        indices = gnm_indices(total, int(nr_edges), rng)
+    return np.stack([indices // size2, size1 + indices % size2], axis=1)
+
+
+def random_graph(nr_vertices, nr_edges=0.5, seed=None):
+    """Return a random graph on vertices 0..nr_vertices-1 (see random_edges)."""
+    rng = np.random.default_rng(seed)
+    edges = random_edges(nr_vertices, nr_edges, rng)
+    return fromwords(towords(np.arange(nr_vertices), edges))
@@ -0,0 +1,193 @@
+"""
+Dense tables of values of vertex subsets, for the dynamic programming over the subset lattice.
+A dict with arbitrary precision int keys takes 100+ bytes per entry, while a RankTable takes
+1, 2 or 4 bytes, which lets the exact algorithms reach larger graphs in the same memory.
+"""
+
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, uintptr_t
+import numpy as np
+from .bitset128 cimport uint128
+from .bitset512 cimport WORDSIZE
+from . import bitset
+
+
+cdef extern int __builtin_ctzll(unsigned long long x)
+cdef extern int __builtin_popcountll(unsigned long long x)
+
+
+# binomials[p][j] is p choose j
+cdef unsigned long long binomials[WORDSIZE + 1][WORDSIZE + 1]
+for p in range(WORDSIZE + 1):
+    binomials[p][0] = 1
+    for j in range(1, p + 1):
+        binomials[p][j] = binomials[p - 1][j - 1] + (binomials[p - 1][j] if j < p else 0)
+
+
+def binomial(int n, int k):
+    return binomials[n][k] if 0 <= k <= n else 0
+
+
+cdef class RankTable:
+
+    """
+    Table of values of the subsets of a vertex set with at most 64 vertex positions, indexed by
+    subset like a dict. The subsets of every size i form a layer, stored as an array of
+    n choose i values of a numpy dtype, indexed by colex rank: the subset with vertices
+    at positions p_1 < ... < p_i among the vertices has rank sum_j (p_j choose j).
+    Subsets without a value hold the largest value of the dtype.
+
+    Layers are allocated by allocate when they are first written, and can be replaced by
+    set_layer and dropped by free_layer, so they can live in any buffer.
+    """
+
+    cdef uint128 V
+    # The subsets not contained in V, as an arbitrary precision int
+    cdef object outside
+    cdef readonly int n
+    cdef readonly object dtype
+    cdef readonly unsigned long long missing
+    cdef int itemsize
+    # Index among the vertices of the vertex at every position, and the other way around
+    cdef int index[WORDSIZE]
+    cdef uint128 vertex[WORDSIZE]
+    cdef readonly list layers
+    cdef void *data[WORDSIZE + 1]
+
+    def __cinit__(self, uint128 vertices, dtype='uint32', *args, **kwargs):
+        cdef int i = 0
+        cdef uint128 rest = vertices
+        if bitset.domain(vertices) > WORDSIZE:
+            raise ValueError('RankTable supports at most {} vertex positions'.format(WORDSIZE))
+        self.V = vertices
+        self.outside = ~int(vertices)
+        self.n = bitset.size(vertices)
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.uint8, np.uint16, np.uint32):
+            raise ValueError('Unsupported dtype {}'.format(dtype))
+        self.itemsize = self.dtype.itemsize
+        self.missing = np.iinfo(self.dtype).max
+        while rest:
+            self.index[__builtin_ctzll(rest)] = i
+            self.vertex[i] = rest & (~rest + 1)
+            rest &= rest - 1
+            i += 1
+        self.layers = [None] * (self.n + 1)
+        for i in range(self.n + 1):
+            self.data[i] = NULL
+
+    @property
+    def vertices(self):
+        return self.V
+
+    def layer_size(self, int i):
+        return binomial(self.n, i)
+
+    def allocate(self, int i):
+        """Return a new array for layer i, in which no subset has a value."""
+        return np.full(binomial(self.n, i), self.missing, dtype=self.dtype)
+
+    def layer(self, int i):
+        """Return the array of layer i, allocating it if needed."""
+        if self.layers[i] is None:
+            self.set_layer(i, self.allocate(i))
+        return self.layers[i]
+
+    def set_layer(self, int i, array):
+        """Use array, a contiguous array of the dtype, as layer i."""
+        if array.dtype != self.dtype or len(array) != binomial(self.n, i):
+            raise ValueError('Layer {} must be {} values of {}'.format(
+                i, binomial(self.n, i), self.dtype))
+        self.layers[i] = array
+        self.data[i] = <void *><uintptr_t>array.ctypes.data
+
+    def free_layer(self, int i):
+        self.layers[i] = None
+        self.data[i] = NULL
+
+    cpdef unsigned long long rank(self, uint128 subset):
+        """Return the colex rank of subset among the subsets of its size."""
+        cdef unsigned long long result = 0
+        cdef int j = 0
+        while subset:
+            j += 1
+            result += binomials[self.index[__builtin_ctzll(subset)]][j]
+            subset &= subset - 1
+        return result
+
+    cpdef uint128 unrank(self, int i, unsigned long long r):
+        """Return the subset of size i with colex rank r."""
+        cdef uint128 result = 0
+        cdef int p = self.n
+        cdef int j
+        for j in range(i, 0, -1):
+            p -= 1
+            while binomials[p][j] > r:
+                p -= 1
+            r -= binomials[p][j]
+            result |= self.vertex[p]
+        return result
+
+    cdef inline unsigned long long load(self, void *data, unsigned long long r):
+        if self.itemsize == 1:
+            return (<uint8_t *>data)[r]
+        elif self.itemsize == 2:
+            return (<uint16_t *>data)[r]
+        return (<uint32_t *>data)[r]
+
+    cdef inline void store(self, void *data, unsigned long long r, unsigned long long value):
+        if self.itemsize == 1:
+            (<uint8_t *>data)[r] = value
+        elif self.itemsize == 2:
+            (<uint16_t *>data)[r] = value
+        else:
+            (<uint32_t *>data)[r] = value
+
+    def get(self, subset, default=None):
+        cdef unsigned long long value
+        cdef void *data
+        if subset & self.outside:
+            return default
+        data = self.data[__builtin_popcountll(subset)]
+        if data == NULL:
+            return default
+        value = self.load(data, self.rank(subset))
+        return default if value == self.missing else value
+
+    def __getitem__(self, subset):
+        value = self.get(subset)
+        if value is None:
+            raise KeyError(subset)
+        return value
+
+    def __contains__(self, subset):
+        return self.get(subset) is not None
+
+    def __setitem__(self, subset, unsigned long long value):
+        cdef int i
+        if subset & self.outside:
+            raise KeyError(subset)
+        if value >= self.missing:
+            raise OverflowError('{} does not fit in a RankTable of {}'.format(value, self.dtype))
+        i = __builtin_popcountll(subset)
+        if self.data[i] == NULL:
+            self.layer(i)
+        self.store(self.data[i], self.rank(subset), value)
+
+
+def smallest_dtype(maxvalue):
+    """Return the smallest dtype of RankTable for values up to maxvalue, or None."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if maxvalue < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return None
+
+
+def rank_table(vertices, maxvalue):
+    """
+    Return a RankTable for values up to maxvalue with the smallest fitting dtype, or a dict
+    if there are too many vertex positions.
+    """
+    dtype = smallest_dtype(maxvalue)
+    if bitset.domain(vertices) > WORDSIZE or dtype is None:
+        return {}
+    return RankTable(vertices, dtype)
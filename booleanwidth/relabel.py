@@ -0,0 +1,152 @@
+"""
+Relabeling the vertices of a graph to positions 0..n-1 in an order that improves locality,
+i.e. such that neighborhoods occupy few (and the same) words of a bitset.
+The original vertices are kept in a Relabeling, which maps results back.
+The exact solvers and heuristics which return a decomposition take an ordering as their
+relabel argument, in which case they solve the relabeled graph and map the result back.
+"""
+
+from .graph import Graph
+from .backend import iterate, index, size, first, bit
+from .components import components, layers
+from .heuristic import find_startvertex
+
+
+def bfs_order(graph):
+    """Order the vertices per component by bfs layer, starting from a peripheral vertex."""
+    order = []
+    for component in components(graph):
+        start = find_startvertex(graph, first(component))
+        for layer in layers(graph, start):
+            order.extend(iterate(layer))
+    return order
+
+
+def cuthill_mckee_order(graph):
+    """
+    Order the vertices per component by bfs from a peripheral vertex, visiting the unvisited
+    neighbors of every vertex by increasing degree.
+    """
+    N = graph.neighborhoods
+    order = []
+    for component in components(graph):
+        start = find_startvertex(graph, first(component))
+        done = start
+        queue = [start]
+        i = 0
+        while i < len(queue):
+            new = N[queue[i]] & ~done
+            queue.extend(sorted(iterate(new), key=lambda v: size(N[v])))
+            done |= new
+            i += 1
+        order.extend(queue)
+    return order
+
+
+def degree_order(graph):
+    """Order the vertices by decreasing degree."""
+    return sorted(iterate(graph.vertices), key=lambda v: -size(graph.neighborhoods[v]))
+
+
+ORDERINGS = {
+    'bfs': bfs_order,
+    'cuthill-mckee': cuthill_mckee_order,
+    'degree': degree_order,
+}
+
+
+class Relabeling:
+
+    """Maps between the vertices of a graph and those of its relabeled version."""
+
+    def __init__(self, order):
+        # Vertex i of the relabeled graph is order[i] in the original graph
+        self.order = order
+        self.positions = {v: bit(i) for i, v in enumerate(order)}
+
+    def apply(self, subset):
+        """Return the relabeled version of a vertex subset of the original graph."""
+        result = 0
+        for v in iterate(subset):
+            result |= self.positions[v]
+        return result
+
+    def restore(self, subset):
+        """Return the original version of a vertex subset of the relabeled graph."""
+        result = 0
+        for v in iterate(subset):
+            result |= self.order[index(v)]
+        return result
+
+    def restore_decomposition(self, decomposition):
+        """
+        Return the original version of a decomposition of the relabeled graph. A decomposition
+        is either a vertex order, or a sequence of (booldim, cut) pairs like the exact solvers
+        return, in which case only the cuts are mapped.
+        """
+        result = []
+        for item in decomposition:
+            if isinstance(item, tuple):
+                value, cut = item
+                result.append((value, tuple(self.restore(A) for A in cut)))
+            else:
+                result.append(self.restore(item))
+        return result
+
+    def restore_table(self, table):
+        """Return a view of a table of values of subsets of the relabeled graph, by original subsets."""
+        return RestoredTable(table, self)
+
+
+class RestoredTable:
+
+    """Read-only view of a table of values of subsets, like a booldim table, by original subsets."""
+
+    def __init__(self, table, relabeling):
+        self.table = table
+        self.relabeling = relabeling
+
+    def get(self, subset, default=None):
+        try:
+            return self.table.get(self.relabeling.apply(subset), default)
+        except KeyError:
+            return default
+
+    def __getitem__(self, subset):
+        return self.table[self.relabeling.apply(subset)]
+
+    def __contains__(self, subset):
+        return self.get(subset) is not None
+
+
+def relabel(graph, ordering):
+    """
+    Return a copy of graph with the vertices renumbered in the order given by ordering,
+    which is either a key of ORDERINGS or a list of vertices.
+    The returned graph stores the Relabeling in its relabeling attribute.
+    """
+    order = ORDERINGS[ordering](graph) if isinstance(ordering, str) else list(ordering)
+    if len(set(order)) != len(order) or len(order) != size(graph.vertices):
+        raise ValueError('Ordering does not contain every vertex exactly once')
+    relabeling = Relabeling(order)
+    neighborhoods = {relabeling.positions[v]: relabeling.apply(graph.neighborhoods[v])
+                     for v in order}
+    result = Graph(sum(neighborhoods), neighborhoods)
+    result.relabeling = relabeling
+    return result
+
+
+def solve_relabeled(graph, ordering, solve):
+    """
+    Return the result of solve on graph relabeled by ordering, with its vertex order mapped
+    back to the vertices of graph. solve returns a vertex order, a pair of a value and a
+    vertex order, or False.
+    """
+    relabeled = relabel(graph, ordering)
+    result = solve(relabeled)
+    if result is False:
+        return False
+    if isinstance(result, tuple):
+        value, order = result
+        return value, relabeled.relabeling.restore_decomposition(order)
+    return relabeled.relabeling.restore_decomposition(result)
@@ -1,5 +1,5 @@
 from .graph import Graph
-from .bitset import BitSet
+from .bitset import iterate, size, bit, subtract
 from random import choice
 
 
@@ -13,24 +13,24 @@ class Tree(Graph):
         root = root or self.root
 
         def recursion(vertex, parent):
-            if len(vertex.neighbors) < 2:
+            children = subtract(self(vertex), parent)
+            if not children:
                 return 1
-            return max(recursion(self[bchild], vertex) for bchild in vertex.neighbors
-                       if not parent or self[bchild] != parent) + 1
+            return max(recursion(child, vertex) for child in iterate(children)) + 1
 
-        return recursion(root, None)
+        return recursion(root, 0)
 
     def count_branches(self):
         """
         Count the number of branches, i.e. the sum of all branches exceeding degree 2.
         """
-        return sum(len(v.neighbors) - 2 for v in self.vertices if len(v.neighbors) > 2)
+        return sum(size(self(v)) - 2 for v in self if size(self(v)) > 2)
 
     def count_branching_nodes(self):
         """
         Count the number of branches, i.e. the sum of all branches exceeding degree 2.
         """
-        return sum(1 for v in self.vertices if len(v.neighbors) > 2)
+        return sum(1 for v in self if size(self(v)) > 2)
 
     @staticmethod
     def generate_random(nr_vertices, maxdegree=3):
@@ -38,14 +38,14 @@ class Tree(Graph):
             raise ValueError
 
         graph = Tree()
-        graph.root = BitSet.from_identifier(0)
+        graph.root = bit(0)
         graph.add(graph.root)
 
         for i in range(1, nr_vertices):
             while 1:
-                v = choice(list(graph.vertices))
-                if len(graph(v)) < maxdegree:
-                    w = BitSet.from_identifier(i)
+                v = choice(list(iterate(graph.vertices)))
+                if size(graph(v)) < maxdegree:
+                    w = bit(i)
                     graph.add(w)
                     graph.connect(v, w)
                     break
@@ -55,18 +55,18 @@ class Tree(Graph):
     @staticmethod
     def generate_random_cubic(nr_vertices):
         graph = Tree()
-        graph.root = BitSet.from_identifier(0)
+        graph.root = bit(0)
         graph.add(graph.root)
 
         leaves = [graph.root]
         for i in range(1, nr_vertices):
             v = leaves[0]
-            w = BitSet.from_identifier(i)
+            w = bit(i)
             graph.add(w)
             graph.connect(v, w)
             leaves.append(w)
 
-            if len(graph(v)) == 3:
+            if size(graph(v)) == 3:
                 leaves.pop(0)
 
         return graph
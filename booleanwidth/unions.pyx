@@ -0,0 +1,246 @@
+"""
+Containers for the unions of neighborhoods (UN) of a cut, used by next_un and compute_next_un.
+
+Every union in UN(left) is a subset of the frontier N(left) & right, so we store the unions
+projected onto the frontier: bit i of a packed union stands for the i-th frontier vertex.
+The packed unions are kept in a sorted array of 64-bit words without duplicates (Unions),
+which makes the transition from UN(X - v) to UN(X) a single pass over the array followed
+by a sort-unique, instead of building a python set of boxed ints.
+This works as long as the frontier has at most 64 vertices, regardless of the size of the
+graph. Larger frontiers fall back to python sets of full-width unions.
+
+Alternatively, the unions can be stored in a shared ZDD (see zdd.pyx), by setting the
+environment variable BOOLEANWIDTH_UNIONS to `zdd`. This pays off for cuts with a huge booldim.
+"""
+
+import os
+
+from libc.stdlib cimport malloc, realloc, free
+from libcpp.algorithm cimport sort, unique, binary_search
+from .bitset128 cimport uint128
+from .backend import iterate, size
+from .zdd import ZDDUnions
+
+cdef extern int __builtin_ctzll(unsigned long long x)
+
+
+cdef class Unions:
+
+    """Sorted array of distinct unions of neighborhoods. Behaves like a read-only set."""
+
+    cdef uint128 *data
+    cdef Py_ssize_t n
+
+    def __cinit__(self, values=()):
+        values = list(values)
+        self.data = <uint128 *>malloc(max(len(values), 1) * sizeof(uint128))
+        if self.data == NULL:
+            raise MemoryError
+        self.n = 0
+        for value in values:
+            self.data[self.n] = value
+            self.n += 1
+        self.n = unique(self.data, sort_end(self.data, self.n)) - self.data
+
+    def __dealloc__(self):
+        free(self.data)
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        cdef Py_ssize_t i
+        for i in range(self.n):
+            yield self.data[i]
+
+    def __contains__(self, uint128 value):
+        return binary_search(self.data, self.data + self.n, value)
+
+    def __repr__(self):
+        return 'Unions({})'.format(list(self))
+
+    cpdef Unions next(self, uint128 remove, uint128 add):
+        """Return the unions {S - remove, (S - remove) | add} for all unions S."""
+        cdef Unions result = Unions.__new__(Unions)
+        cdef Py_ssize_t i
+        cdef uint128 S
+        free(result.data)
+        result.data = <uint128 *>malloc(max(2 * self.n, 1) * sizeof(uint128))
+        if result.data == NULL:
+            raise MemoryError
+
+        for i in range(self.n):
+            S = self.data[i] & ~remove
+            result.data[2 * i] = S
+            result.data[2 * i + 1] = S | add
+        result.n = unique(result.data, sort_end(result.data, 2 * self.n)) - result.data
+        return result
+
+
+cdef inline uint128 *sort_end(uint128 *data, Py_ssize_t n):
+    sort(data, data + n)
+    return data + n
+
+
+cpdef long long closure_size(neighborhoods, long long bound=-1) except -1:
+    """
+    Return the number of distinct unions of subsets of given neighborhoods (words), the empty
+    union included. The unions are grown one neighborhood at a time, like next_un.
+    If bound is not negative and there are more than bound, return bound + 1 as soon as
+    that is certain.
+    """
+    cdef Py_ssize_t i, n = 1, capacity = 1
+    cdef uint128 N
+    cdef uint128 *grown
+    cdef uint128 *data = <uint128 *>malloc(sizeof(uint128))
+    if data == NULL:
+        raise MemoryError
+    data[0] = 0
+
+    try:
+        for N in neighborhoods:
+            if capacity < 2 * n:
+                capacity = 2 * n
+                grown = <uint128 *>realloc(data, capacity * sizeof(uint128))
+                if grown == NULL:
+                    raise MemoryError
+                data = grown
+            for i in range(n):
+                data[n + i] = data[i] | N
+            n = unique(data, sort_end(data, 2 * n)) - data
+            if 0 <= bound < n:
+                return bound + 1
+        return n
+    finally:
+        free(data)
+
+
+cdef class FrontierUnions:
+
+    """
+    Unions of neighborhoods packed to the bit positions of their frontier.
+    Behaves like a read-only set of full-width unions.
+    """
+
+    cdef readonly Unions packed
+    cdef readonly tuple frontier
+    cdef readonly object support
+    cdef dict positions
+
+    def __init__(self, values=(), frontier=None):
+        values = list(values)
+        if frontier is None:
+            frontier = 0L
+            for S in values:
+                frontier |= S
+        self.set_frontier(tuple(iterate(frontier)))
+        self.packed = Unions([self.pack(S) for S in values])
+
+    cdef set_frontier(self, tuple frontier):
+        if len(frontier) > 64:
+            raise ValueError('Frontier of {} vertices does not fit in a word'.format(
+                len(frontier)))
+        self.frontier = frontier
+        self.support = sum(frontier)
+        self.positions = {v: i for i, v in enumerate(frontier)}
+
+    cdef uint128 pack(self, S) except? 0:
+        cdef uint128 result = 0
+        for v in iterate(S):
+            result |= (<uint128>1) << <int>self.positions[v]
+        return result
+
+    cdef object unpack(self, uint128 S):
+        result = 0L
+        while S:
+            result |= self.frontier[__builtin_ctzll(S)]
+            S &= S - 1
+        return result
+
+    def __len__(self):
+        return self.packed.n
+
+    def __iter__(self):
+        cdef Py_ssize_t i
+        for i in range(self.packed.n):
+            yield self.unpack(self.packed.data[i])
+
+    def __contains__(self, S):
+        return not S & ~self.support and self.pack(S) in self.packed
+
+    def __repr__(self):
+        return 'FrontierUnions({})'.format(list(self))
+
+    def next(self, remove, add):
+        """
+        Return the unions {S - remove, (S - remove) | add} for all unions S, where remove is a
+        single vertex. The frontier loses remove and gains add. If it grows beyond a single
+        word, a python set is returned instead.
+        """
+        cdef FrontierUnions result = FrontierUnions.__new__(FrontierUnions)
+        cdef Unions packed = Unions.__new__(Unions)
+        cdef Py_ssize_t i, n = self.packed.n
+        cdef int k = self.positions.get(remove, -1)
+        cdef uint128 S, low, packed_add
+        cdef uint128 *data = self.packed.data
+
+        frontier = self.frontier
+        if k >= 0:
+            frontier = frontier[:k] + frontier[k + 1:]
+        frontier += tuple(iterate(add & ~self.support))
+        if len(frontier) > 64:
+            return set_next(self, remove, add)
+        result.set_frontier(frontier)
+        packed_add = result.pack(add)
+
+        free(packed.data)
+        packed.data = <uint128 *>malloc(max(2 * n, 1) * sizeof(uint128))
+        if packed.data == NULL:
+            raise MemoryError
+
+        # Delete bit k, which moves all higher bits down by one
+        low = ((<uint128>1) << k) - 1 if k >= 0 else ~(<uint128>0)
+        for i in range(n):
+            S = data[i]
+            S = (S & low) | ((S >> 1) & ~low)
+            packed.data[2 * i] = S
+            packed.data[2 * i + 1] = S | packed_add
+        packed.n = unique(packed.data, sort_end(packed.data, 2 * n)) - packed.data
+        result.packed = packed
+        return result
+
+
+cdef set_next(un, remove, add):
+    U = set()
+    for S in un:
+        U.add(S - (remove & S))
+        U.add(S - (remove & S) | add)
+    return U
+
+
+# Representation of the families returned by initial_unions: 'array' or 'zdd'
+REPRESENTATION = os.environ.get('BOOLEANWIDTH_UNIONS', 'array')
+
+
+def initial_unions():
+    """Return the unions of neighborhoods of the empty set, {0}, in the chosen representation."""
+    if REPRESENTATION == 'zdd':
+        return ZDDUnions()
+    return {0L}
+
+
+def next_unions(un, remove, add):
+    """
+    Return the unions {S - remove, (S - remove) | add} for all unions S in un,
+    where remove is a single vertex. Sets of unions whose frontier fits in a single word
+    are converted to FrontierUnions.
+    """
+    if isinstance(un, (FrontierUnions, ZDDUnions)):
+        return un.next(remove, add)
+
+    frontier = 0L
+    for S in un:
+        frontier |= S
+    if size(frontier) <= 64:
+        return FrontierUnions(un, frontier).next(remove, add)
+    return set_next(un, remove, add)
@@ -0,0 +1,250 @@
+"""
+Zero-suppressed decision diagrams (ZDDs) representing families of unions of neighborhoods.
+A family is a node of a shared ZDD, in which the variables are vertex positions, ordered
+from low to high. Families of different cuts share their common subdiagrams in one node table,
+so cuts with a huge booldim still take little memory, and their size is counted on the diagram.
+
+Node 0 is the empty family, node 1 is the family containing only the empty set.
+The children of a node always come before it in the node table.
+
+Families are only kept alive by their ZDDUnions. Once the node table has doubled since the
+last collection, collect keeps only the nodes of live ZDDUnions and renumbers them, so the
+diagram does not grow across cuts and runs.
+"""
+
+from weakref import WeakSet
+from .backend import index
+
+cdef int TERMINAL = 1 << 30
+
+
+cdef class ZDD:
+
+    """Node table and operation caches of a shared ZDD."""
+
+    cdef list var, lo, hi
+    cdef dict unique
+    cdef dict union_cache, remove_cache, join_cache, count_cache
+
+    def __init__(self):
+        self.var = [TERMINAL, TERMINAL]
+        self.lo = [0, 0]
+        self.hi = [0, 0]
+        self.unique = {}
+        self.clear_caches()
+
+    def clear_caches(self):
+        """Forget the results of operations, but keep all nodes."""
+        self.union_cache = {}
+        self.remove_cache = {}
+        self.join_cache = {}
+        self.count_cache = {0: 0, 1: 1}
+
+    def __len__(self):
+        """Return the number of nodes."""
+        return len(self.var)
+
+    def compact(self, roots):
+        """
+        Drop all nodes not reachable from roots, and clear the caches. Return a dict mapping
+        the old number of every kept node to its new number.
+        """
+        cdef int F
+        reachable = {0, 1}
+        todo = [F for F in roots if F > 1]
+        while todo:
+            F = todo.pop()
+            if F not in reachable:
+                reachable.add(F)
+                todo.append(self.lo[F])
+                todo.append(self.hi[F])
+
+        # Keeping the order of the nodes keeps children before their parents
+        renumber = {0: 0, 1: 1}
+        var, lo, hi = [TERMINAL, TERMINAL], [0, 0], [0, 0]
+        for F in sorted(reachable):
+            if F > 1:
+                renumber[F] = len(var)
+                var.append(self.var[F])
+                lo.append(renumber[self.lo[F]])
+                hi.append(renumber[self.hi[F]])
+        self.var, self.lo, self.hi = var, lo, hi
+        self.unique = {(var[F], lo[F], hi[F]): F for F in range(2, len(var))}
+        self.clear_caches()
+        return renumber
+
+    cdef int node(self, int v, int lo, int hi) except -1:
+        """Return the node with given variable and children, applying zero-suppression."""
+        if hi == 0:
+            return lo
+        key = (v, lo, hi)
+        result = self.unique.get(key)
+        if result is None:
+            result = len(self.var)
+            self.var.append(v)
+            self.lo.append(lo)
+            self.hi.append(hi)
+            self.unique[key] = result
+        return result
+
+    cpdef int union(self, int F, int G) except -1:
+        """Return the family F | G."""
+        if F == 0 or F == G:
+            return G
+        if G == 0:
+            return F
+        if F > G:
+            F, G = G, F
+        key = (F, G)
+        result = self.union_cache.get(key)
+        if result is not None:
+            return result
+
+        cdef int v = self.var[F], w = self.var[G]
+        if v < w:
+            result = self.node(v, self.union(self.lo[F], G), self.hi[F])
+        elif v > w:
+            result = self.node(w, self.union(F, self.lo[G]), self.hi[G])
+        else:
+            result = self.node(v, self.union(self.lo[F], self.lo[G]),
+                               self.union(self.hi[F], self.hi[G]))
+        self.union_cache[key] = result
+        return result
+
+    cpdef int remove(self, int F, int v) except -1:
+        """Return the family {S - v for S in F}, where v is a vertex position."""
+        if self.var[F] > v:
+            return F
+        key = (F, v)
+        result = self.remove_cache.get(key)
+        if result is not None:
+            return result
+
+        if self.var[F] == v:
+            result = self.union(self.lo[F], self.hi[F])
+        else:
+            result = self.node(self.var[F], self.remove(self.lo[F], v), self.remove(self.hi[F], v))
+        self.remove_cache[key] = result
+        return result
+
+    cpdef int join(self, int F, N) except -1:
+        """Return the family {S | N for S in F}, where N is a bitset."""
+        if N == 0 or F == 0:
+            return F
+        key = (F, N)
+        result = self.join_cache.get(key)
+        if result is not None:
+            return result
+
+        cdef int v = self.var[F]
+        cdef int w = index(N)
+        rest = N & (N - 1)
+        if v < w:
+            result = self.node(v, self.join(self.lo[F], N), self.join(self.hi[F], N))
+        elif v == w:
+            result = self.node(w, 0, self.join(self.union(self.lo[F], self.hi[F]), rest))
+        else:
+            result = self.node(w, 0, self.join(F, rest))
+        self.join_cache[key] = result
+        return result
+
+    cpdef object count(self, int F):
+        """Return the number of sets in family F."""
+        result = self.count_cache.get(F)
+        if result is None:
+            result = self.count(self.lo[F]) + self.count(self.hi[F])
+            self.count_cache[F] = result
+        return result
+
+    def family(self, sets):
+        """Return the family containing given bitsets."""
+        cdef int F = 0
+        for S in sets:
+            F = self.union(F, self.join(1, S))
+        return F
+
+    def members(self, int F, prefix=0L):
+        """Iterate over the bitsets in family F."""
+        if F == 1:
+            yield prefix
+        elif F > 1:
+            yield from self.members(self.lo[F], prefix)
+            yield from self.members(self.hi[F], prefix | (1 << self.var[F]))
+
+    def contains(self, int F, S):
+        """Test if family F contains the bitset S."""
+        while F > 1:
+            v = self.var[F]
+            if S >> v & 1:
+                F = self.hi[F]
+                S ^= 1 << v
+            elif S & ((1 << v) - 1):
+                return False
+            else:
+                F = self.lo[F]
+        return F == 1 and S == 0
+
+
+# All families share this diagram
+cdef ZDD diagram = ZDD()
+
+# The ZDDUnions whose roots are kept by collect
+live = WeakSet()
+
+# Smallest number of nodes at which collect runs, and the number it waits for
+MIN_NODES = 1 << 16
+threshold = MIN_NODES
+
+
+def shared():
+    """Return the diagram shared by all ZDDUnions."""
+    return diagram
+
+
+def collect(force=False):
+    """
+    Remove the nodes of the shared diagram which no live ZDDUnions uses, if the diagram has
+    grown to twice its size after the last collection, or if force is set.
+    """
+    global threshold
+    if not force and len(diagram) < threshold:
+        return
+    families = list(live)
+    renumber = diagram.compact([(<ZDDUnions>family).root for family in families])
+    for family in families:
+        (<ZDDUnions>family).root = renumber[(<ZDDUnions>family).root]
+    threshold = max(MIN_NODES, 2 * len(diagram))
+
+
+cdef class ZDDUnions:
+
+    """Unions of neighborhoods stored as a node of the shared ZDD. Behaves like a set."""
+
+    cdef readonly int root
+    cdef object __weakref__
+
+    def __init__(self, values=None, int root=1):
+        self.root = root if values is None else diagram.family(values)
+        live.add(self)
+
+    def __len__(self):
+        return diagram.count(self.root)
+
+    def __iter__(self):
+        return diagram.members(self.root)
+
+    def __contains__(self, S):
+        return diagram.contains(self.root, S)
+
+    def __repr__(self):
+        return 'ZDDUnions({})'.format(list(self))
+
+    def next(self, remove, add):
+        """
+        Return the unions {S - remove, (S - remove) | add} for all unions S,
+        where remove is a single vertex.
+        """
+        cdef int F = diagram.remove(self.root, index(remove))
+        result = ZDDUnions(root=diagram.union(F, diagram.join(F, add)))
+        collect()
+        return result
@@ -0,0 +1,60 @@
+from random import Random
+
+import pytest
+
+from booleanwidth import backend
+
+LENGTHS = (1, 8, 10, 63, 64, 65, 127, 128, 300, 512)
+
+reference = backend.load('python')
+
+
+def bitset_pairs(length, samples=200):
+    rng = Random(length)
+    for _ in range(samples):
+        yield rng.getrandbits(length) | 1, rng.getrandbits(length), rng.randrange(length)
+
+
+@pytest.mark.parametrize('name', sorted(backend.BACKENDS))
+def test_backend_provides_all_functions(name):
+    implementation = backend.load(name)
+    assert [f for f in backend.FUNCTIONS if not hasattr(implementation, f)] == []
+
+
+@pytest.mark.parametrize('name', sorted(backend.BACKENDS))
+@pytest.mark.parametrize('length', LENGTHS)
+def test_backend_agrees_with_python(name, length):
+    if length > backend.CAPACITIES[name]:
+        pytest.skip('{} supports at most {} vertices'.format(name, backend.CAPACITIES[name]))
+    implementation = backend.load(name)
+    for x, y, p in bitset_pairs(length):
+        cases = [
+            ('index', (x,)), ('domain', (x,)), ('size', (x,)), ('first', (x,)),
+            ('domain', (0,)), ('size', (0,)), ('index', (0,)),
+            ('bit', (p,)), ('bits', (0, p)), ('universe', (length,)),
+            ('subtract', (x, y)), ('contains', (x, y)), ('contains', (x, x & y)),
+            ('disjoint', (x, y)), ('invert', (x, length)), ('join', ([x, y],)),
+            ('tostring', (x,)),
+        ]
+        for function, args in cases:
+            expected = getattr(reference, function)(*args)
+            assert getattr(implementation, function)(*args) == expected, (function, args)
+        assert list(implementation.iterate(x)) == list(reference.iterate(x))
+
+
+@pytest.mark.parametrize('name', sorted(backend.BACKENDS))
+@pytest.mark.parametrize('length', LENGTHS)
+def test_backend_subsets_agree_with_python(name, length):
+    if length > backend.CAPACITIES[name]:
+        pytest.skip('{} supports at most {} vertices'.format(name, backend.CAPACITIES[name]))
+    implementation = backend.load(name)
+    rng = Random(length)
+    for _ in range(20):
+        small = rng.getrandbits(min(length, 10)) << (length - min(length, 10))
+        for function, args in [('subsets', (small,)), ('subsets', (small, 2, -2)),
+                               ('subsets_of_size', (small, 3))]:
+            expected = getattr(reference, function)(*args)
+            assert sorted(getattr(implementation, function)(*args)) == sorted(expected)
+        expected = reference.subsets_by_size(small)
+        result = implementation.subsets_by_size(small)
+        assert [sorted(layer) for layer in result] == [sorted(layer) for layer in expected]
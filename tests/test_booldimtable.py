@@ -0,0 +1,36 @@
+import pytest
+
+from booleanwidth.bitset import subsets
+from booleanwidth.dynamicprogramming import BooldimTable, booldimtable, compute_booldim
+from booleanwidth.graph import Graph
+
+
+def spread(graph, positions):
+    """Return graph with vertex i moved to the given position i."""
+    moved = {v: 1 << p for v, p in zip(graph, positions)}
+    result = Graph()
+    result.add(sum(moved.values()))
+    for v, w in graph.edges:
+        result.connect(moved[v], moved[w])
+    return result
+
+
+GRAPH = Graph.generate_random(12, 0.35, seed=11)
+SPREAD = spread(GRAPH, [1, 4, 5, 9, 20, 21, 22, 33, 40, 51, 60, 63])
+
+
+@pytest.mark.parametrize('graph', [GRAPH, SPREAD], ids=['contiguous', 'spread'])
+@pytest.mark.parametrize('processes', [1, 2])
+def test_booldimtable_matches_compute_booldim(graph, processes):
+    table = booldimtable(graph, processes)
+    assert isinstance(table, BooldimTable)
+    assert len(table) == 2 ** 12
+    for subset in subsets(graph.vertices):
+        assert subset in table
+        expected = 0 if subset == graph.vertices else compute_booldim(graph, subset)
+        assert table[subset] == expected, subset
+    outside = 1 << 2 if graph is SPREAD else 1 << 12
+    for subset in (outside, 1 << 70, graph.vertices | 1 << 64):
+        assert subset not in table
+        with pytest.raises(KeyError):
+            table[subset]
@@ -0,0 +1,54 @@
+import pytest
+
+from booleanwidth.backend import subsets
+from booleanwidth.graph import Graph
+from booleanwidth.lboolw import BoundedTables
+
+GRAPHS = [Graph.generate_random(n, p, seed=seed)
+          for seed, (n, p) in enumerate([(7, 0.4), (9, 0.3), (10, 0.5)])]
+
+
+def values(tables):
+    return {X: tables.value.get(X) for X in subsets(tables.G.vertices)}
+
+
+def bounds(cost):
+    return [(1, 3), (2, 4), (3, 3), (1, 8)] if not cost else [(3, 10), (10, 20), (5, 40)]
+
+
+@pytest.mark.parametrize('cost', [False, True], ids=['lboolw', 'lboolc'])
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_raised_bound_matches_fresh_tables(graph, cost):
+    for k1, k2 in bounds(cost):
+        raised = BoundedTables(graph, cost)
+        raised.raise_bound(k1)
+        found = raised.raise_bound(k2)
+        fresh = BoundedTables(graph, cost)
+        assert fresh.raise_bound(k2) == found
+        assert values(raised) == values(fresh)
+        assert raised.next_bound() == fresh.next_bound()
+
+
+@pytest.mark.parametrize('cost', [False, True], ids=['lboolw', 'lboolc'])
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_next_bound_is_smallest_pruned_value(graph, cost):
+    tables = BoundedTables(graph, cost)
+    k = 0
+    steps = 0
+    while k is not None:
+        tables.raise_bound(k)
+        # Every set with a value within the bound has been expanded, the others are pruned
+        pruned = [value for value in values(tables).values() if value is not None and value > k]
+        expected = min(pruned) if pruned else None
+        assert tables.next_bound() == expected
+        k = tables.next_bound()
+        steps += 1
+    assert graph.vertices in tables.value
+    assert steps > 1
+
+
+def test_bound_cannot_decrease():
+    tables = BoundedTables(GRAPHS[0])
+    tables.raise_bound(3)
+    with pytest.raises(ValueError):
+        tables.raise_bound(2)
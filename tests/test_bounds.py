@@ -0,0 +1,85 @@
+from functools import lru_cache
+from itertools import permutations
+
+import pytest
+
+from booleanwidth.bounds import (grow_bound, lboolc_lower_bound, lboolc_upper_bound,
+                                 lboolw_lower_bound, lboolw_upper_bound, search_bound)
+from booleanwidth.graph import Graph
+from booleanwidth.heuristic import check_decomposition, check_decomposition_cost
+from booleanwidth.lboolc import compute_lboolc
+from booleanwidth.lboolw import (compute_lboolw, compute_lboolw_with_upperbound,
+                                 stream_search_attempt)
+
+GRAPHS = [Graph.generate_random(n, p, seed=seed)
+          for seed, (n, p) in enumerate([(5, 0.5), (6, 0.5), (7, 0.3), (7, 0.5), (7, 0.2)])]
+
+SEARCHES = [search_bound, grow_bound]
+
+
+@lru_cache(maxsize=None)
+def brute_force(graph):
+    """Return the linear boolean-width and -cost of graph, over all vertex orders."""
+    orders = list(permutations(graph))
+    return (min(check_decomposition(graph, order) for order in orders),
+            min(check_decomposition_cost(graph, order) for order in orders))
+
+
+def counting(attempt, attempts):
+    def counted(k):
+        attempts.append(k)
+        return attempt(k)
+    return counted
+
+
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_lboolw_bounds(graph):
+    exact = brute_force(graph)[0]
+    upper, order = lboolw_upper_bound(graph)
+    assert lboolw_lower_bound(graph) <= exact <= upper
+    assert check_decomposition(graph, order) == upper
+    assert compute_lboolw(graph)[0][graph.vertices] == exact
+
+
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_lboolc_bounds(graph):
+    exact = brute_force(graph)[1]
+    upper, order = lboolc_upper_bound(graph)
+    assert lboolc_lower_bound(graph) <= exact <= upper
+    assert check_decomposition_cost(graph, order) == upper
+    assert compute_lboolc(graph)[0][graph.vertices] == exact
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_search_finds_exact_width(search, graph):
+    exact = brute_force(graph)[0]
+    lower, upper = lboolw_lower_bound(graph), lboolw_upper_bound(graph)[0]
+    attempts = []
+    tables = search(counting(lambda k: compute_lboolw_with_upperbound(graph, k), attempts),
+                    lower, upper)
+    assert tables[0][graph.vertices] == exact
+    assert all(lower <= k <= upper for k in attempts)
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_search_finds_exact_cost(search, graph):
+    exact = brute_force(graph)[1]
+    lower, upper = lboolc_lower_bound(graph), lboolc_upper_bound(graph)[0]
+    attempts = []
+    value, order = search(counting(lambda k: stream_search_attempt(graph, k, True), attempts),
+                          lower, upper)
+    assert value == exact
+    assert check_decomposition_cost(graph, order) == exact
+    assert all(lower <= k <= upper for k in attempts)
+
+
+@pytest.mark.parametrize('search', SEARCHES)
+def test_search_stops_at_first_success(search):
+    for exact in range(3, 40):
+        attempts = []
+        result = search(counting(lambda k: exact if k >= exact else False, attempts), 3, 40)
+        assert result == exact
+        assert attempts[-1] >= exact
+        assert all(k < exact for k in attempts[:-1])
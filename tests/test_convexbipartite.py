@@ -0,0 +1,17 @@
+import random
+
+from booleanwidth.convexbipartite import ConvexBipartite
+
+
+def test_generated_graphs_are_convex():
+    for seed in range(5):
+        random.seed(seed)
+        graph = ConvexBipartite.generate_random(10, 12)
+        assert graph.verify_convexity()
+
+
+def test_gap_is_not_convex():
+    graph = ConvexBipartite(0b111, 0b1000)
+    graph.connect(0b1, 0b1000)
+    graph.connect(0b100, 0b1000)
+    assert not graph.verify_convexity()
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from booleanwidth import dgf
+from booleanwidth.graph import Graph
+
+
+def same_graph(graph, other):
+    return (graph.vertices == other.vertices and
+            all(graph.neighborhoods[v] == other.neighborhoods[v] for v in graph))
+
+
+@pytest.fixture
+def graph():
+    """A random graph on positions 0 and 70..99, which span two words."""
+    random = Graph.generate_random(30, 0.2, seed=1)
+    graph = Graph()
+    graph.add(1 | random.vertices << 70)
+    for v, w in random.edges:
+        graph.connect(v << 70, w << 70)
+    return graph
+
+
+def test_cache_round_trip(graph, tmp_path, monkeypatch):
+    filename = str(tmp_path / 'g.dgf')
+    graph.save(filename)
+    assert same_graph(graph, dgf.load(filename))
+    assert os.path.exists(dgf.cachename(filename))
+
+    def parse(filename):
+        raise AssertionError('the cache was not used')
+    monkeypatch.setattr(dgf, 'parse', parse)
+    assert same_graph(graph, dgf.load(filename))
+    assert same_graph(graph, Graph.load(filename))
+
+
+def test_cache_is_rewritten_when_file_changes(graph, tmp_path):
+    filename = str(tmp_path / 'g.dgf')
+    graph.save(filename)
+    dgf.load(filename)
+    cache_stat = os.stat(dgf.cachename(filename))
+
+    other = Graph.generate_random(12, 0.5, seed=2)
+    other.save(filename)
+    assert same_graph(other, dgf.load(filename))
+    assert same_graph(other, dgf.load(filename))
+    assert os.stat(dgf.cachename(filename)).st_mtime_ns >= cache_stat.st_mtime_ns
+
+    # Same size, different modification time
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert dgf.read_cache(filename, os.stat(filename)) is None
+    assert same_graph(other, dgf.load(filename))
+    assert dgf.read_cache(filename, os.stat(filename)) is not None
+
+
+def test_truncated_cache_is_ignored(graph, tmp_path):
+    filename = str(tmp_path / 'g.dgf')
+    graph.save(filename)
+    dgf.load(filename)
+    with open(dgf.cachename(filename), 'r+b') as f:
+        f.truncate(dgf.HEADER.size + 8)
+    assert dgf.read_cache(filename, os.stat(filename)) is None
+    assert same_graph(graph, dgf.load(filename))
+
+
+def test_without_cache(graph, tmp_path):
+    filename = str(tmp_path / 'g.dgf')
+    graph.save(filename)
+    assert same_graph(graph, dgf.load(filename, cache=False))
+    assert not os.path.exists(dgf.cachename(filename))
@@ -0,0 +1,88 @@
+import pytest
+
+from booleanwidth.dpstore import DPStore
+from booleanwidth.graph import Graph
+from booleanwidth.heuristic import check_decomposition
+from booleanwidth.lboolc import compute_lboolc
+from booleanwidth.lboolw import compute_lboolw, stream_layers
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_after(store, layer):
+    """Make store raise Crash once layer has been checkpointed."""
+    checkpoint = store.checkpoint
+
+    def crashing_checkpoint(i, un):
+        checkpoint(i, un)
+        if i == layer:
+            raise Crash()
+    store.checkpoint = crashing_checkpoint
+
+
+def count_checkpoints(store):
+    layers = []
+    checkpoint = store.checkpoint
+
+    def counting_checkpoint(i, un):
+        layers.append(i)
+        checkpoint(i, un)
+    store.checkpoint = counting_checkpoint
+    return layers
+
+
+@pytest.fixture(scope='module')
+def graph():
+    return Graph.generate_random(10, 0.4, seed=3)
+
+
+@pytest.fixture(scope='module')
+def expected(graph):
+    lboolw, booldim = compute_lboolw(graph)
+    return lboolw[graph.vertices]
+
+
+@pytest.mark.parametrize('layer', [0, 1, 5, 9, 10])
+def test_resume_after_crash(graph, expected, layer, tmp_path):
+    uninterrupted = stream_layers(graph, expected, False, store=DPStore(str(tmp_path / 'a')))
+    assert uninterrupted[0] == expected
+    assert check_decomposition(graph, uninterrupted[1]) == expected
+
+    store = DPStore(str(tmp_path / 'b'))
+    crash_after(store, layer)
+    with pytest.raises(Crash):
+        stream_layers(graph, expected, False, store=store)
+    store.close()
+    assert store.progress()['layer'] == layer
+
+    store = DPStore(str(tmp_path / 'b'))
+    layers = count_checkpoints(store)
+    assert stream_layers(graph, expected, False, store=store) == uninterrupted
+    assert layers == list(range(layer + 1, len(graph) + 1))
+    store.close()
+
+
+def test_compute_lboolw_resumes(graph, expected, tmp_path):
+    store = DPStore(str(tmp_path))
+    crash_after(store, 4)
+    with pytest.raises(Crash):
+        compute_lboolw(graph, store)
+    store.close()
+    lboolw, booldim = compute_lboolw(graph, str(tmp_path))
+    assert lboolw[graph.vertices] == expected
+
+
+def test_store_on_sparse_positions(tmp_path):
+    graph = Graph()
+    graph.add(sum(1 << p for p in (2, 40, 64, 65, 90, 100)))
+    for v, w in [(2, 40), (40, 64), (64, 65), (65, 90), (90, 100), (100, 2), (40, 90)]:
+        graph.connect(1 << v, 1 << w)
+    lboolw, booldim = compute_lboolw(graph)
+    lboolw_stored, booldim_stored = compute_lboolw(graph, str(tmp_path / 'w'))
+    assert lboolw_stored[graph.vertices] == lboolw[graph.vertices]
+    assert booldim_stored[(1 << 2) | (1 << 90)] == booldim[(1 << 2) | (1 << 90)]
+    lboolc, booldim = compute_lboolc(graph)
+    lboolc_stored, booldim = compute_lboolc(graph, str(tmp_path / 'c'))
+    assert lboolc_stored[graph.vertices] == lboolc[graph.vertices]
@@ -0,0 +1,19 @@
+import pytest
+
+from booleanwidth.dynamicprogramming import mis_booldim
+from booleanwidth.graph import Graph
+from booleanwidth.graph128 import to128_2
+
+
+def test_neighborhoods_up_to_position_63():
+    graph = Graph()
+    graph.add(1 | 1 << 5 | 1 << 63)
+    graph.connect(1, 1 << 63)
+    graph.connect(1 << 5, 1 << 63)
+    neighborhoods = to128_2(graph).neighborhoods
+    for v in graph:
+        assert neighborhoods[v] == graph.neighborhoods[v]
+    for v in (0, 3, 1 << 64, -1):
+        with pytest.raises(KeyError):
+            neighborhoods[v]
+    assert mis_booldim(graph, 1 << 63) == 2
@@ -0,0 +1,11 @@
+from booleanwidth.graph import Graph
+from booleanwidth.heuristic import check_decomposition, estimated_booldim, greedy
+
+
+def test_greedy_estimator_returns_exact_width():
+    for seed in range(3):
+        graph = Graph.generate_random(14, 0.3, seed=seed)
+        width, decomposition = greedy(graph, estimator=estimated_booldim)
+        assert sorted(decomposition) == sorted(graph)
+        assert width == check_decomposition(graph, decomposition)
+        assert isinstance(width, int)
@@ -0,0 +1,85 @@
+import io
+
+import pytest
+
+from booleanwidth.bitset import bit
+from booleanwidth.ingest import ingest, load, read_edgelist, read_matrixmarket, read_metis
+
+
+def labeled_edges(graph, ids):
+    return {frozenset((ids[v], ids[w])) for v, w in graph.edges}
+
+
+def test_integer_ids_are_kept():
+    graph, ids = ingest(read_edgelist(io.StringIO('0 1\n1 2\n% comment\n2 0 5.0\n')))
+    assert graph.vertices == 0b111
+    assert ids == {bit(0): '0', bit(1): '1', bit(2): '2'}
+    assert labeled_edges(graph, ids) == {frozenset('01'), frozenset('12'), frozenset('02')}
+
+
+def test_tokens_are_remapped_in_order():
+    graph, ids = ingest(read_edgelist(io.StringIO('b c\na b\nd\n')))
+    assert graph.vertices == 0b1111
+    assert ids == {bit(0): 'a', bit(1): 'b', bit(2): 'c', bit(3): 'd'}
+    assert labeled_edges(graph, ids) == {frozenset('ab'), frozenset('bc')}
+
+
+def test_sparse_ids_are_remapped():
+    graph, ids = ingest(read_edgelist(io.StringIO('1000000 7\n7 3\n')))
+    assert graph.vertices == 0b111
+    assert ids == {bit(0): '3', bit(1): '7', bit(2): '1000000'}
+    graph, ids = ingest(read_edgelist(io.StringIO('100 7\n7 3\n')), remap=False)
+    assert graph.vertices == bit(3) | bit(7) | bit(100)
+
+
+def test_equal_integer_ids_are_remapped():
+    graph, ids = ingest(read_edgelist(io.StringIO('1 01\n01 2\n')))
+    assert len(graph) == 3
+    assert sorted(ids.values()) == ['01', '1', '2']
+    assert labeled_edges(graph, ids) == {frozenset(('1', '01')), frozenset(('01', '2'))}
+    with pytest.raises(ValueError):
+        ingest(read_edgelist(io.StringIO('1 01\n01 2\n')), remap=False)
+
+
+def test_self_loops_and_duplicate_edges():
+    graph, ids = ingest(read_edgelist(io.StringIO('0 0\n0 1\n1 0\n0 1\n')))
+    assert graph.vertices == 0b11
+    assert list(graph.edges) == [(bit(0), bit(1))] or list(graph.edges) == [(bit(1), bit(0))]
+
+
+def test_empty_input():
+    graph, ids = ingest(read_edgelist(io.StringIO('')))
+    assert graph.vertices == 0
+    assert ids == {}
+
+
+def test_metis():
+    text = '% triangle and an isolated vertex\n4 3\n2 3\n1 3\n1 2\n\n'
+    graph, ids = ingest(read_metis(io.StringIO(text)))
+    assert len(graph) == 4
+    assert labeled_edges(graph, ids) == {frozenset('12'), frozenset('13'), frozenset('23')}
+
+
+def test_metis_weights():
+    # Vertex weights, followed by neighbor and edge weight pairs
+    text = '3 2 011\n5 2 7\n1 1 7 3 4\n1 2 4\n'
+    graph, ids = ingest(read_metis(io.StringIO(text)))
+    assert labeled_edges(graph, ids) == {frozenset('12'), frozenset('23')}
+
+
+def test_matrixmarket():
+    text = ('%%MatrixMarket matrix coordinate real symmetric\n% comment\n4 4 4\n'
+            '1 1 2.0\n2 1 -1.0\n3 2 -1.0\n4 4 1.0\n')
+    graph, ids = ingest(read_matrixmarket(io.StringIO(text)))
+    assert len(graph) == 4
+    assert labeled_edges(graph, ids) == {frozenset('12'), frozenset('23')}
+    with pytest.raises(ValueError):
+        list(read_matrixmarket(io.StringIO('%%MatrixMarket matrix coordinate real general\n'
+                                           '2 3 0\n')))
+
+
+def test_load_guesses_format(tmp_path):
+    path = tmp_path / 'g.mtx'
+    path.write_text('%%MatrixMarket matrix coordinate pattern general\n3 3 2\n1 2\n2 3\n')
+    graph, ids = load(str(path))
+    assert labeled_edges(graph, ids) == {frozenset('12'), frozenset('23')}
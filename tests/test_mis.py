@@ -0,0 +1,58 @@
+import math
+import random
+import statistics
+
+from booleanwidth.graph import Graph
+from booleanwidth.graph128 import to128_2
+from booleanwidth.graph512 import to512
+from booleanwidth import mis128, mis512
+from booleanwidth.mis import mis_count
+
+
+def triangles(k):
+    """Return k disjoint triangles, which have 3 ** k maximal independent sets."""
+    graph = Graph()
+    graph.add((1 << (3 * k)) - 1)
+    for i in range(k):
+        a, b, c = (1 << (3 * i + j) for j in range(3))
+        graph.connect(a, b)
+        graph.connect(b, c)
+        graph.connect(a, c)
+    return graph
+
+
+def test_counters_agree():
+    for seed in range(10):
+        graph = Graph.generate_random(16, 0.3, seed=seed)
+        expected = mis_count(graph)
+        V = graph.vertices
+        assert mis128.mis_count(graph.neighborhoods, V) == expected
+        assert mis128.mis_count(to128_2(graph).neighborhoods, V) == expected
+        assert mis128.mis_count_bounded(graph.neighborhoods, V) == expected
+        assert mis512.mis_count_bounded(to512(graph), V) == expected
+
+
+def test_counts_beyond_32_bits():
+    graph = triangles(21)
+    assert mis128.mis_count_bounded(graph.neighborhoods, graph.vertices) == 3 ** 21
+    assert mis512.mis_count_bounded(to512(graph), graph.vertices) == 3 ** 21
+
+
+def test_bound():
+    graph = triangles(10)
+    assert mis128.mis_count_bounded(graph.neighborhoods, graph.vertices, 100) == 101
+    assert mis128.mis_count_bounded(graph.neighborhoods, graph.vertices, 3 ** 10) == 3 ** 10
+
+
+def test_estimate_cut_mis_count():
+    errors = []
+    for seed in range(20):
+        graph = Graph.generate_random(40, 0.3, seed=seed)
+        rng = random.Random(seed)
+        left = sum(v for v in graph if rng.random() < 0.5)
+        exact = mis512.cut_mis_count(to512(graph), left)
+        estimate = mis512.estimate_cut_mis_count(graph.neighborhoods, left,
+                                                 graph.vertices - left, 0.1, 0.05, 10000, seed + 1)
+        errors.append(abs(math.log(estimate / exact, 2)))
+    assert statistics.median(errors) < 0.1
+    assert max(errors) < 0.5
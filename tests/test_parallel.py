@@ -0,0 +1,60 @@
+from booleanwidth.booldimcache import booldim_cache, clear_caches
+from booleanwidth.dynamicprogramming import compute_booldim
+from booleanwidth.graph import Graph
+from booleanwidth.heuristic import check_decomposition
+from booleanwidth.lboolw import compute_lboolw_streaming, greedy_lbw, stream_layers
+from booleanwidth import parallel
+from booleanwidth.parallel import BooldimPool, batch_booldims
+
+
+def test_batch_booldims_matches_compute_booldim():
+    graph = Graph.generate_random(20, 0.3, seed=4)
+    subsets = [sum(v for i, v in enumerate(graph) if (i * 7 + j) % 5 < 2) for j in range(40)]
+    subsets += [0, graph.vertices]
+    expected = [compute_booldim(graph, A) for A in subsets]
+    assert batch_booldims(graph, subsets, processes=2) == expected
+    with BooldimPool(graph, 2) as pool:
+        assert batch_booldims(graph, subsets, pool=pool) == expected
+        assert batch_booldims(graph, [], pool=pool) == []
+
+
+def test_greedy_lbw_with_processes():
+    graph = Graph.generate_random(14, 0.3, seed=5)
+    clear_caches()
+    expected = greedy_lbw(graph)
+    clear_caches()
+    assert greedy_lbw(graph, processes=2) == expected
+    assert booldim_cache(graph).misses > 0
+
+
+def test_parallel_stream_layers(monkeypatch):
+    graph = Graph.generate_random(12, 0.3, seed=6)
+    k = compute_lboolw_streaming(graph)[0]
+    value, order = stream_layers(graph, k, False)
+    for min_layer in (parallel.PARALLEL_MIN_LAYER, 0):
+        monkeypatch.setattr(parallel, 'PARALLEL_MIN_LAYER', min_layer)
+        result = parallel.parallel_stream_layers(graph, k, False, None, 2)
+        assert result[0] == value
+        assert check_decomposition(graph, result[1]) == value
+
+
+def test_small_layers_stay_serial(monkeypatch):
+    graph = Graph.generate_random(12, 0.3, seed=6)
+    assert not parallel.use_layer_pool(12, 2)
+    monkeypatch.setattr(parallel, 'parallel_stream_layers', None)
+    k = compute_lboolw_streaming(graph)[0]
+    assert stream_layers(graph, k, False, processes=2) == stream_layers(graph, k, False)
+
+
+def test_parallel_stream_layers_on_sparse_positions():
+    graph = Graph.generate_random(9, 0.4, seed=8)
+    moved = {v: v << 70 for v in graph}
+    sparse = Graph()
+    sparse.add(graph.vertices << 70 | 1)
+    for v, w in graph.edges:
+        sparse.connect(moved[v], moved[w])
+    k = compute_lboolw_streaming(sparse)[0]
+    value, order = parallel.parallel_stream_layers(sparse, k, False, None, 2)
+    assert value == k
+    assert sorted(order) == sorted(sparse)
+    assert check_decomposition(sparse, order) == k
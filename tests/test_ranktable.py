@@ -0,0 +1,58 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from booleanwidth.ranktable import RankTable, binomial
+
+# Non-contiguous vertex positions, including the highest one.
+VERTICES = [1 << p for p in (0, 2, 3, 7, 11, 12, 30, 63)]
+V = sum(VERTICES)
+
+
+def subsets_of_size(i):
+    return [sum(c) for c in combinations(VERTICES, i)]
+
+
+def test_rank_unrank_round_trip():
+    table = RankTable(V)
+    for i in range(len(VERTICES) + 1):
+        for subset in subsets_of_size(i):
+            assert table.unrank(i, table.rank(subset)) == subset
+
+
+def test_layers_are_bijections():
+    table = RankTable(V)
+    n = len(VERTICES)
+    for i in range(n + 1):
+        ranks = sorted(table.rank(subset) for subset in subsets_of_size(i))
+        assert ranks == list(range(binomial(n, i)))
+        assert table.layer_size(i) == binomial(n, i)
+
+
+@pytest.mark.parametrize('dtype', [np.uint8, np.uint16, np.uint32])
+def test_setitem_overflow(dtype):
+    table = RankTable(V, dtype)
+    subset = VERTICES[1] | VERTICES[4]
+    largest = np.iinfo(dtype).max
+    with pytest.raises(OverflowError):
+        table[subset] = largest
+    assert subset not in table
+    table[subset] = largest - 1
+    assert table[subset] == largest - 1
+
+
+def test_outside_subsets_are_absent():
+    table = RankTable(V, 'uint8')
+    inside = VERTICES[0] | VERTICES[2]
+    outside = inside | (1 << 1)
+    table[inside] = 3
+    assert inside in table
+    assert outside not in table
+    assert (1 << 1) not in table
+    assert table.get(outside) is None
+    assert table.get(outside, 7) == 7
+    with pytest.raises(KeyError):
+        table[outside]
+    with pytest.raises(KeyError):
+        table[outside] = 1
@@ -0,0 +1,81 @@
+import pytest
+
+from booleanwidth import backend
+from booleanwidth.backend import subtract
+from booleanwidth.dynamicprogramming import compute_booldim
+from booleanwidth.graph import Graph
+from booleanwidth.heuristic import (check_decomposition, greedy, greedy_light_single_start,
+                                    relative_neighborhood)
+from booleanwidth.lboolc import compute_lboolc_streaming
+from booleanwidth.lboolw import (compute_lboolw, compute_lboolw_decomposition,
+                                 compute_lboolw_streaming)
+from booleanwidth.relabel import ORDERINGS, relabel
+
+
+def scattered(seed):
+    """A random graph on scattered positions, beyond a single word."""
+    graph = Graph.generate_random(9, 0.4, seed=seed)
+    positions = [3, 7, 20, 41, 64, 66, 80, 95, 130]
+    moved = {v: 1 << p for v, p in zip(graph, positions)}
+    result = Graph()
+    result.add(sum(moved.values()))
+    for v, w in graph.edges:
+        result.connect(moved[v], moved[w])
+    return result
+
+
+GRAPHS = [scattered(seed) for seed in range(3)]
+
+pytestmark = pytest.mark.skipif(backend.CAPACITIES[backend.name] <= 130,
+                                reason='positions beyond the capacity of the bitset backend')
+
+
+def cuts_to_order(graph, decomposition):
+    """Return the vertex order of a decomposition of (booldim, (v, rest)) pairs."""
+    rest = graph.vertices
+    peeled = []
+    for booldim, (v, remainder) in decomposition:
+        assert remainder == subtract(rest, v)
+        assert booldim == compute_booldim(graph, remainder)
+        peeled.append(v)
+        rest = remainder
+    return [rest] + peeled[::-1]
+
+
+@pytest.mark.parametrize('ordering', sorted(ORDERINGS))
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_relabeling_round_trip(graph, ordering):
+    relabeled = relabel(graph, ordering)
+    assert relabeled.vertices == (1 << len(graph)) - 1
+    for v in graph:
+        assert relabeled.relabeling.restore(relabeled.relabeling.apply(v)) == v
+        assert (relabeled.relabeling.restore(relabeled.neighborhoods[relabeled.relabeling.apply(v)])
+                == graph.neighborhoods[v])
+
+
+@pytest.mark.parametrize('ordering', sorted(ORDERINGS))
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_relabeled_exact_solvers(graph, ordering):
+    width, decomposition, booldim = compute_lboolw_decomposition(graph, relabel=ordering)
+    assert width == compute_lboolw(graph)[0][graph.vertices]
+    order = cuts_to_order(graph, list(decomposition))
+    assert sorted(order) == sorted(graph)
+    assert check_decomposition(graph, order) == width
+    some = graph.vertices & -graph.vertices
+    assert booldim[some] == compute_booldim(graph, some)
+
+    value, order = compute_lboolw_streaming(graph, relabel=ordering)
+    assert value == width
+    assert check_decomposition(graph, order) == width
+    value, order = compute_lboolc_streaming(graph, relabel=ordering)
+    assert sorted(order) == sorted(graph)
+
+
+@pytest.mark.parametrize('ordering', sorted(ORDERINGS))
+@pytest.mark.parametrize('graph', GRAPHS)
+def test_relabeled_heuristics(graph, ordering):
+    width, order = greedy(graph, relabel=ordering)
+    assert sorted(order) == sorted(graph)
+    assert check_decomposition(graph, order) == width
+    order = greedy_light_single_start(graph, relative_neighborhood, relabel=ordering)
+    assert sorted(order) == sorted(graph)
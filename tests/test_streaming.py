@@ -0,0 +1,49 @@
+import pytest
+
+from booleanwidth.graph import Graph
+from booleanwidth.heuristic import check_decomposition
+from booleanwidth.lboolc import compute_lboolc, compute_lboolc_streaming
+from booleanwidth.lboolw import compute_lboolw, compute_lboolw_streaming, stream_layers
+
+
+def spread(graph, positions):
+    """Return graph with vertex i moved to the given position i."""
+    moved = {bit: 1 << p for bit, p in zip(graph, positions)}
+    result = Graph()
+    result.add(sum(moved.values()))
+    for v, w in graph.edges:
+        result.connect(moved[v], moved[w])
+    return result
+
+
+@pytest.fixture(scope='module')
+def graphs():
+    dense = Graph.generate_random(10, 0.4, seed=7)
+    sparse = spread(dense, [3, 9, 17, 30, 42, 55, 63, 64, 70, 81])
+    return dense, sparse
+
+
+def test_streaming_on_sparse_positions(graphs):
+    dense, sparse = graphs
+    lboolw, booldim = compute_lboolw(dense)
+    width = lboolw[dense.vertices]
+    assert compute_lboolw(sparse)[0][sparse.vertices] == width
+
+    value, order = compute_lboolw_streaming(sparse)
+    assert value == width
+    assert sorted(order) == sorted(sparse)
+    assert check_decomposition(sparse, order) == width
+    value, order = stream_layers(sparse, width, False)
+    assert value == width
+    assert check_decomposition(sparse, order) == width
+    assert stream_layers(sparse, width - 1, False) is False
+
+
+def test_cost_streaming_on_sparse_positions(graphs):
+    dense, sparse = graphs
+    lboolc, booldim = compute_lboolc(dense)
+    cost = lboolc[dense.vertices]
+    value, order = compute_lboolc_streaming(sparse)
+    assert value == cost
+    assert sorted(order) == sorted(sparse)
+    assert compute_lboolc(sparse)[0][sparse.vertices] == cost
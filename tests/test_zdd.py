@@ -0,0 +1,67 @@
+import random
+
+from booleanwidth import zdd
+from booleanwidth.graph import Graph
+from booleanwidth.unions import FrontierUnions
+from booleanwidth.zdd import ZDDUnions, collect, shared
+
+
+def run_cuts(graph, seed):
+    """Yield the unions of every prefix of a random order of graph, as ZDD and as array."""
+    order = list(graph)
+    random.Random(seed).shuffle(order)
+    N = graph.neighborhoods
+    families = ZDDUnions(), FrontierUnions([0])
+    right = graph.vertices
+    for v in order:
+        right -= v
+        families = tuple(un.next(v, N[v] & right) for un in families)
+        yield families
+
+
+def test_next_matches_frontier_unions():
+    for seed in range(5):
+        graph = Graph.generate_random(14, 0.3, seed=seed)
+        for zdd_un, array_un in run_cuts(graph, seed):
+            assert len(zdd_un) == len(array_un)
+            assert set(zdd_un) == set(array_un)
+            assert all(S in zdd_un for S in array_un)
+
+
+def test_family_members_and_contains():
+    sets = [0b1011, 0b110, 0, 0b1011, 0b10000]
+    family = ZDDUnions(sets)
+    assert sorted(family) == sorted(set(sets))
+    assert len(family) == 4
+    assert 0b110 in family and 0 in family
+    assert 0b111 not in family and 0b10 not in family
+
+
+def test_collect_keeps_live_families(monkeypatch):
+    monkeypatch.setattr(zdd, 'MIN_NODES', 64)
+    monkeypatch.setattr(zdd, 'threshold', 64)
+    graph = Graph.generate_random(16, 0.3, seed=1)
+    kept = []
+    for i, (zdd_un, array_un) in enumerate(run_cuts(graph, 1)):
+        if i % 5 == 0:
+            kept.append((zdd_un, set(array_un)))
+    for zdd_un, expected in kept:
+        assert set(zdd_un) == expected
+
+    collect(force=True)
+    for zdd_un, expected in kept:
+        assert set(zdd_un) == expected
+
+
+def test_diagram_does_not_grow_across_runs(monkeypatch):
+    monkeypatch.setattr(zdd, 'MIN_NODES', 256)
+    monkeypatch.setattr(zdd, 'threshold', 256)
+    graph = Graph.generate_random(16, 0.3, seed=2)
+    sizes = []
+    for run in range(6):
+        for _ in run_cuts(graph, run):
+            pass
+        collect(force=True)
+        sizes.append(len(shared()))
+    # Nothing is alive after a run, so only the terminals remain
+    assert sizes == [2] * 6